@@ -1,10 +1,23 @@
 from fastapi import APIRouter, Depends, HTTPException
 from sqlmodel import Session
 from app.core.database import get_session
-from app.api.deps import get_current_active_user
+from app.api.deps import get_current_active_user, get_current_admin_user
 from app.models.user import User
 from app.services.analytics_service import analytics_service
-from app.schemas.analytices import AnalyticsResponse, ConversationStats
+from app.core.vectorestore import vector_store
+from app.services.answer_cache import answer_cache
+from app.services.condense_service import question_condenser
+from app.services.reg_service import rag_service
+from app.schemas.analytices import (
+    AnalyticsResponse,
+    ConversationStats,
+    AnswerCacheStats,
+    CoalescingStats,
+    CondensingStats,
+    VectorStoreStats,
+    EmbeddingCacheStats,
+    UploadDedupeStats
+)
 
 router = APIRouter(prefix="/analytics", tags=["Analytics"])
 
@@ -42,4 +55,75 @@ def get_conversation_analytics(
     if not stats:
         raise HTTPException(status_code=404, detail="Conversation not found")
     
-    return stats
\ No newline at end of file
+    return stats
+
+
+@router.get("/answer-cache", response_model=AnswerCacheStats)
+def get_answer_cache_stats(
+    current_user: User = Depends(get_current_active_user)
+):
+    """
+    Company ke answer cache ke hit/miss counters return karta hai
+    """
+    return answer_cache.stats(company_id=current_user.company_id)
+
+
+@router.get("/coalescing", response_model=CoalescingStats)
+def get_coalescing_stats(
+    current_user: User = Depends(get_current_active_user)
+):
+    """
+    Company ke kitne answer calls in-flight requests mein coalesce hue
+    """
+    return rag_service.inflight.stats(company_id=current_user.company_id)
+
+
+@router.get("/condensing", response_model=CondensingStats)
+def get_condensing_stats(
+    current_user: User = Depends(get_current_active_user)
+):
+    """
+    Follow-up questions par condense LLM call kitni dafa chali ya skip hui
+    """
+    return question_condenser.stats(company_id=current_user.company_id)
+
+
+@router.get("/vector-store", response_model=VectorStoreStats)
+def get_vector_store_stats(
+    current_user: User = Depends(get_current_admin_user)
+):
+    """
+    Memory mein loaded tenant collections aur company ka andazan memory hissa
+    
+    Totals sab companies ke hain - isliye sirf admin ke liye
+    """
+    return vector_store.stats(company_id=current_user.company_id)
+
+
+@router.get("/embedding-cache", response_model=EmbeddingCacheStats)
+def get_embedding_cache_stats(
+    current_user: User = Depends(get_current_admin_user)
+):
+    """
+    Ingestion chunks aur search queries ki kitni embeddings cache se aayin
+    
+    Cache poore process ka shared hai - isliye sirf admin ke liye
+    """
+    stats_method = getattr(vector_store.embeddings, "stats", None)
+    if stats_method is None:
+        return {"enabled": False}
+    return {"enabled": True, **stats_method()}
+
+
+@router.get("/uploads", response_model=UploadDedupeStats)
+def get_upload_stats(
+    current_user: User = Depends(get_current_active_user),
+    db: Session = Depends(get_session)
+):
+    """
+    Company ke kitne uploads duplicate the aur kitni parsing/embedding bachi
+    """
+    return analytics_service.get_upload_stats(
+        db=db,
+        company_id=current_user.company_id
+    )
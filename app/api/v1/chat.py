@@ -1,6 +1,8 @@
 from fastapi import APIRouter, Depends, HTTPException
-from sqlmodel import Session, select
-from app.core.database import get_session
+from fastapi.responses import StreamingResponse
+from sqlmodel import select
+from sqlmodel.ext.asyncio.session import AsyncSession
+from app.core.database import get_async_session
 from app.api.deps import get_current_active_user
 from app.models.user import User
 from app.models.conversation import Conversation
@@ -12,23 +14,24 @@ from app.schemas.chat import (
     MessageResponse
 )
 from app.services.chat_service import chat_service
+from app.utils.helpers import format_sse
 from typing import List
 
 router = APIRouter(prefix="/chat", tags=["Chat"])
 
 
 @router.post("/message", response_model=ChatResponse)
-def send_message(
+async def send_message(
     request: ChatRequest,
     current_user: User = Depends(get_current_active_user),
-    db: Session = Depends(get_session)
+    db: AsyncSession = Depends(get_async_session)
 ):
     """
     Chat message send karta hai aur response return karta hai
     """
     
     # Get or create conversation
-    conversation = chat_service.get_or_create_conversation(
+    conversation = await chat_service.get_or_create_conversation(
         db=db,
         company_id=current_user.company_id,
         conversation_id=request.conversation_id,
@@ -38,20 +41,66 @@ def send_message(
     )
     
     # Process message
-    result = chat_service.process_message(
+    result = await chat_service.process_message(
         db=db,
         company_id=current_user.company_id,
         conversation_id=conversation.id,
-        user_message=request.message
+        user_message=request.message,
+        retrieval_mode=request.retrieval_mode
     )
     
     return result
 
 
+@router.post("/message/stream")
+async def send_message_stream(
+    request: ChatRequest,
+    current_user: User = Depends(get_current_active_user),
+    db: AsyncSession = Depends(get_async_session)
+):
+    """
+    Chat message send karta hai aur response Server-Sent Events se stream karta hai
+    
+    Events: sources (pehle), token (har token), done (message save hone ke baad)
+    """
+    
+    # Get or create conversation
+    conversation = await chat_service.get_or_create_conversation(
+        db=db,
+        company_id=current_user.company_id,
+        conversation_id=request.conversation_id,
+        user_id=current_user.id,
+        customer_name=request.customer_name,
+        customer_email=request.customer_email
+    )
+    
+    events = chat_service.stream_message(
+        db=db,
+        company_id=current_user.company_id,
+        conversation_id=conversation.id,
+        user_message=request.message,
+        retrieval_mode=request.retrieval_mode
+    )
+    
+    async def event_stream():
+        try:
+            async for event in events:
+                yield format_sse(event["event"], event["data"])
+        except Exception as e:
+            # Headers ja chuke hain - error bhi event ki shakal mein bhejo
+            yield format_sse("error", {"detail": str(e)})
+    
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+
 @router.get("/conversations", response_model=List[ConversationResponse])
-def get_conversations(
+async def get_conversations(
     current_user: User = Depends(get_current_active_user),
-    db: Session = Depends(get_session)
+    db: AsyncSession = Depends(get_async_session)
 ):
     """
     User ke saare conversations return karta hai
@@ -61,23 +110,23 @@ def get_conversations(
         Conversation.company_id == current_user.company_id
     ).order_by(Conversation.created_at.desc())
     
-    conversations = db.exec(statement).all()
+    conversations = (await db.exec(statement)).all()
     
     return conversations
 
 
 @router.get("/conversation/{conversation_id}/messages", response_model=List[MessageResponse])
-def get_conversation_messages(
+async def get_conversation_messages(
     conversation_id: int,
     current_user: User = Depends(get_current_active_user),
-    db: Session = Depends(get_session)
+    db: AsyncSession = Depends(get_async_session)
 ):
     """
     Specific conversation ke saare messages return karta hai
     """
     
     # Verify conversation belongs to user's company
-    conversation = db.get(Conversation, conversation_id)
+    conversation = await db.get(Conversation, conversation_id)
     if not conversation or conversation.company_id != current_user.company_id:
         raise HTTPException(status_code=404, detail="Conversation not found")
     
@@ -85,27 +134,27 @@ def get_conversation_messages(
         Message.conversation_id == conversation_id
     ).order_by(Message.created_at)
     
-    messages = db.exec(statement).all()
+    messages = (await db.exec(statement)).all()
     
     return messages
 
 
 @router.post("/conversation/{conversation_id}/close")
-def close_conversation(
+async def close_conversation(
     conversation_id: int,
     current_user: User = Depends(get_current_active_user),
-    db: Session = Depends(get_session)
+    db: AsyncSession = Depends(get_async_session)
 ):
     """
     Conversation ko close karta hai
     """
     
-    conversation = db.get(Conversation, conversation_id)
+    conversation = await db.get(Conversation, conversation_id)
     if not conversation or conversation.company_id != current_user.company_id:
         raise HTTPException(status_code=404, detail="Conversation not found")
     
     conversation.status = "closed"
     db.add(conversation)
-    db.commit()
+    await db.commit()
     
     return {"message": "Conversation closed successfully"}
\ No newline at end of file
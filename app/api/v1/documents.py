@@ -1,28 +1,36 @@
 from fastapi import APIRouter, Depends, HTTPException, UploadFile, File
 from sqlmodel import Session, select
 from app.core.database import get_session
+from app.core.blob_store import blob_store
 from app.api.deps import get_current_active_user
 from app.models.user import User
 from app.models.documents import Document
+from app.models.ingestion_job import IngestionJob
+from app.schemas.document import IngestionJobResponse
+from app.services.bulk_ingestion import collect_uploads
 from app.services.document_service import document_service
+from app.services.ingestion_service import ingestion_queue
 from typing import List
-import os
-import shutil
+import json
+import zipfile
 
 router = APIRouter(prefix="/documents", tags=["Documents"])
 
-UPLOAD_DIR = "uploads"
-os.makedirs(UPLOAD_DIR, exist_ok=True)
 
-
-@router.post("/upload")
+@router.post("/upload", status_code=202)
 def upload_document(
     file: UploadFile = File(...),
     current_user: User = Depends(get_current_active_user),
     db: Session = Depends(get_session)
 ):
     """
-    Document upload karta hai aur vector store mein process karta hai
+    Document upload karta hai aur processing ke liye job queue karta hai
+    
+    Parsing/embedding background workers mein hoti hai - status
+    GET /documents/jobs/{job_id} se milta hai. File chunks mein disk par
+    likhi jati hai aur sath sha256 banta hai; company pehle hi same file
+    upload kar chuki ho to existing document (chunks + vectors) wapas milta
+    hai aur koi job nahi banta.
     """
     
     # Validate file type
@@ -35,34 +43,102 @@ def upload_document(
             detail=f"File type not supported. Allowed: {', '.join(allowed_extensions)}"
         )
     
-    # Save file temporarily
-    file_path = os.path.join(UPLOAD_DIR, f"{current_user.company_id}_{file.filename}")
+    # Stream to blob store - path sha256 se, same bytes ek hi dafa disk par
+    content_hash, file_path, file_size = blob_store.save(file.file)
     
-    with open(file_path, "wb") as buffer:
-        shutil.copyfileobj(file.file, buffer)
+    # Same file pehle se indexed hai - parse/embed skip
+    duplicate = document_service.find_duplicate(db, current_user.company_id, content_hash)
+    if duplicate:
+        document_service.register_duplicate(db, duplicate)
+        return {
+            "message": "Document already uploaded",
+            "document_id": duplicate.id,
+            "status": "succeeded",
+            "deduplicated": True
+        }
     
-    try:
-        # Process and store document
-        document = document_service.process_and_store(
-            db=db,
-            company_id=current_user.company_id,
-            user_id=current_user.id,
-            file_path=file_path,
-            filename=file.filename,
-            file_type=file_extension
-        )
-        
+    # Same file abhi queue/processing mein hai - wahi job
+    pending = ingestion_queue.find_pending(db, current_user.company_id, content_hash)
+    if pending:
         return {
-            "message": "Document uploaded successfully",
-            "document_id": document.id,
-            "chunks_created": document.chunk_count
+            "message": "Document already queued for processing",
+            "job_id": pending.id,
+            "status": pending.status,
+            "deduplicated": True
         }
     
-    except Exception as e:
-        # Clean up file if processing fails
-        if os.path.exists(file_path):
-            os.remove(file_path)
-        raise HTTPException(status_code=500, detail=str(e))
+    job = ingestion_queue.submit(
+        db=db,
+        company_id=current_user.company_id,
+        user_id=current_user.id,
+        file_path=file_path,
+        filename=file.filename,
+        file_type=file_extension,
+        content_hash=content_hash,
+        file_size=file_size
+    )
+    
+    return {
+        "message": "Document queued for processing",
+        "job_id": job.id,
+        "status": job.status,
+        "deduplicated": False
+    }
+
+
+@router.post("/bulk", status_code=202)
+def bulk_upload_documents(
+    files: List[UploadFile] = File(...),
+    current_user: User = Depends(get_current_active_user),
+    db: Session = Depends(get_session)
+):
+    """
+    Bahut se documents ek request mein (multi-file ya zip archive)
+    
+    Files blob store mein likh kar ek bulk job queue hota hai - ingestion
+    worker unhein parse -> chunk -> embed -> store pipeline se guzarta hai.
+    Job ka status aur per-stage throughput report GET /documents/jobs/{job_id}
+    se milta hai. Server ke baghair bare batches ke liye CLI
+    (python -m app.services.bulk_ingestion) bhi hai.
+    """
+    
+    try:
+        stored = collect_uploads((upload.file, upload.filename) for upload in files)
+    except (ValueError, zipfile.BadZipFile) as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    
+    if not stored:
+        raise HTTPException(status_code=400, detail="No supported files found")
+    
+    job = ingestion_queue.submit_bulk(db, current_user.company_id, current_user.id, stored)
+    
+    return {
+        "message": "Documents queued for processing",
+        "job_id": job.id,
+        "status": job.status,
+        "files": len(stored)
+    }
+
+
+@router.get("/jobs/{job_id}", response_model=IngestionJobResponse)
+def get_ingestion_job(
+    job_id: int,
+    current_user: User = Depends(get_current_active_user),
+    db: Session = Depends(get_session)
+):
+    """
+    Upload job ka status aur progress
+    """
+    
+    job = db.get(IngestionJob, job_id)
+    
+    if not job or job.company_id != current_user.company_id:
+        raise HTTPException(status_code=404, detail="Job not found")
+    
+    return IngestionJobResponse(
+        **job.model_dump(exclude={"report"}),
+        report=json.loads(job.report) if job.report else None
+    )
 
 
 @router.get("/list", response_model=List[Document])
@@ -100,8 +176,6 @@ def delete_document(
         raise HTTPException(status_code=404, detail="Document not found")
     
     # Soft delete
-    document.is_active = False
-    db.add(document)
-    db.commit()
+    document_service.delete_document(db, document)
     
     return {"message": "Document deleted successfully"}
\ No newline at end of file
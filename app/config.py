@@ -18,9 +18,89 @@ class Settings(BaseSettings):
     
     # OpenAI
     OPENAI_API_KEY: str
+    OPENAI_MAX_CONNECTIONS: int = 100  # Shared HTTP pool (chat + embeddings)
+    OPENAI_TIMEOUT_SECONDS: float = 60.0
+    OPENAI_MAX_RETRIES: int = 2
+    
+    # Model Providers
+    LLM_PROVIDER: str = "openai"  # openai, fake
+    LLM_MODEL: str = "gpt-3.5-turbo"
+    LLM_TEMPERATURE: float = 0.7
+    EMBEDDING_PROVIDER: str = "openai"  # openai, hashing
+    EMBEDDING_MODEL: str = "text-embedding-ada-002"
+    EMBEDDING_DIMENSIONS: int = 1536  # Sirf hashing provider ke liye
+    FAKE_LLM_LATENCY: float = 0.0  # Pehle token tak seconds
+    FAKE_LLM_TOKENS_PER_SECOND: float = 0.0  # 0 = unlimited
+    FAKE_EMBEDDING_LATENCY: float = 0.0  # Har embedding call ke seconds
+    
+    # Embedding Ingestion
+    EMBEDDING_BATCH_SIZE: int = 100  # Ek embedding request mein chunks
+    EMBEDDING_CONCURRENCY: int = 4  # Ek document ke parallel embedding requests
+    EMBEDDING_MAX_RETRIES: int = 3  # Fail hone wale batch ki retries
+    EMBEDDING_RETRY_BACKOFF_SECONDS: float = 1.0  # Pehli retry se pehle wait (har dafa double)
+    
+    # Document Ingestion Jobs
+    INGESTION_WORKERS: int = 4  # Ek waqt mein kitne documents process hon (sab companies)
+    INGESTION_MAX_JOBS_PER_COMPANY: int = 2  # Ek company ke chalne wale jobs - baqi queue mein
+    INGESTION_MAX_ATTEMPTS: int = 3
+    INGESTION_RETRY_BACKOFF_SECONDS: float = 5.0  # Pehli retry se pehle wait (har dafa double)
+    INGESTION_LEASE_SECONDS: float = 300.0  # Running job ki heartbeat itni purani ho to resume dobara chalata hai
+    BLOB_STORE_DIRECTORY: str = "./uploads/blobs"  # Uploads sha256 ke naam se - same file ek hi dafa
+    UPLOAD_CHUNK_BYTES: int = 1024 * 1024  # Upload disk par itne bytes ke chunks mein likhi jati hai
+    PARSE_WORKERS: int = 0  # PDF/DOCX parsing ke processes (0 = CPU cores, 1 = isi process mein)
+    PARSE_PAGES_PER_TASK: int = 16  # Kam se kam itne PDF pages ek worker task mein - chhoti PDFs isi process mein
+    BULK_QUEUE_SIZE: int = 8  # Bulk ingestion stages ke darmiyan queue (items) - backpressure
+    BULK_MAX_FILES: int = 1000  # Ek bulk request/zip mein zyada se zyada files
+    BULK_MAX_EXTRACT_BYTES: int = 1024 * 1024 * 1024  # Ek bulk request ke zip archives ka kul uncompressed size
+    
+    # Embedding Cache
+    EMBEDDING_CACHE_ENABLED: bool = True  # (model, sha256(chunk)) -> vector, re-uploads free
+    EMBEDDING_CACHE_DIRECTORY: str = "./embedding_cache"
+    QUERY_EMBEDDING_CACHE_SIZE: int = 5000  # Search queries ki embeddings memory mein (0 = band), ~6 KB har ek
+    QUERY_EMBEDDING_CACHE_DISK: bool = True  # Query embeddings sqlite mein bhi - saare workers share karte hain
+    QUERY_EMBEDDING_CACHE_DISK_MAX_ROWS: int = 50000  # Disk par query vectors ki hadd - purane access wale pehle nikalte hain
+    QUERY_EMBEDDING_CACHE_DISK_TTL_SECONDS: float = 604800.0  # 7 din tak access na ho to query vector disk se nikalta hai
     
     # Vector Store
     CHROMA_PERSIST_DIRECTORY: str = "./chroma_db"
+    VECTOR_STORE_PERSISTENT: bool = True  # False = in-memory (dev/tests)
+    VECTOR_BACKEND: str = "chroma"  # chroma (HNSW) ya flat (NumPy exact search, chhote tenants)
+    VECTOR_ANN_THRESHOLD: int = 50000  # Flat backend: itne vectors se upar IVF (approximate) index
+    VECTOR_IVF_NPROBE: int = 16  # IVF lists jo har query scan kare - zyada = behtar recall, slow
+    VECTOR_IVF_LISTS: int = 0  # 0 = sqrt(vectors), growth ke sath dobara train
+    VECTOR_QUANTIZATION: str = "none"  # Flat backend: none, float16 (2x kam, numpy mein slow) ya int8 (4x kam) - naye tenants par
+    VECTOR_RERANK_FACTOR: int = 0  # >0 = quantized search ke top k*N float32 copy se dobara score
+    VECTOR_TOMBSTONE_OVERFETCH: int = 200  # Deleted ids filter karne ke liye search mein zyada se zyada itne extra results
+    VECTOR_COMPACTION_INTERVAL_SECONDS: int = 60  # Deleted vectors index se nikalne wali background job
+    VECTOR_COMPACTION_BATCH_SIZE: int = 500
+    VECTOR_COMPACTION_DEAD_RATIO: float = 0.2  # Flat backend: itne deleted rows par files dobara likhi jati hain
+    VECTOR_WARMUP_TENANTS: int = 50  # Startup par hottest tenants jo pehle load hon
+    LEXICAL_INDEX_DIRECTORY: str = "./lexical_index"  # Per-company BM25 indexes
+    LEXICAL_INDEX_COMPACT_EVERY: int = 100  # Itni delta log entries ke baad poora snapshot
+    VECTOR_MAX_LOADED_TENANTS: int = 1000  # Memory mein collection handles
+    VECTOR_IDLE_SECONDS: int = 900  # Itni der unused tenant memory se evict
+    VECTOR_MEMORY_BUDGET_BYTES: int = 2 * 1024 * 1024 * 1024  # Loaded vectors ka andazan budget
+    
+    # RAG
+    RAG_CHAIN_CACHE_SIZE: int = 256  # Kitni companies ki chains memory mein rakhni hain
+    RETRIEVAL_MODE: str = "vector"  # vector, lexical, hybrid - request mein override ho sakta hai
+    RETRIEVAL_TOP_K: int = 4
+    RETRIEVAL_HYBRID_CANDIDATES: int = 20  # Hybrid mode mein har retriever se candidates
+    CONTEXT_TOKEN_BUDGET: int = 2000  # Prompt mein retrieved context ke tokens
+    CONTEXT_DUPLICATE_THRESHOLD: float = 0.9  # Is Jaccard similarity se upar block duplicate
+    COALESCE_ENABLED: bool = True  # Identical concurrent questions ek hi LLM call share karein
+    CONDENSE_STRATEGY: str = "heuristic"  # always, heuristic, concat_previous - follow-up condensing
+    
+    # Chat History
+    HISTORY_MAX_TURNS: int = 10  # Prompt mein zyada se zyada kitne (user, assistant) turns
+    HISTORY_TOKEN_BUDGET: int = 1500  # Summary + recent turns ka token budget
+    HISTORY_FOLD_BATCH_SIZE: int = 50  # Ek baar mein summary mein fold hone wale messages
+    
+    # Answer Cache
+    ANSWER_CACHE_ENABLED: bool = True
+    ANSWER_CACHE_TTL_SECONDS: int = 3600
+    ANSWER_CACHE_MAX_BYTES: int = 64 * 1024 * 1024
+    ANSWER_CACHE_SIMILARITY_THRESHOLD: float = 0.95
     
     # CORS
     BACKEND_CORS_ORIGINS: List[str] = []
@@ -0,0 +1,70 @@
+from app.config import settings
+from typing import BinaryIO, Tuple
+import hashlib
+import os
+import uuid
+
+
+class BlobStore:
+    """
+    Uploaded files ka content-addressed store
+
+    File ka path uske sha256 se banta hai (directory/ab/abcdef...), is liye
+    same bytes disk par ek hi dafa hote hain chahe kitni dafa upload hon.
+
+    On-disk layout:
+        directory/
+            tmp/      stream hoti hui uploads - mukammal hone par rename
+            ab/       sha256 ke pehle do characters
+    """
+
+    def __init__(self, directory: str, chunk_bytes: int):
+        self.directory = directory
+        self.chunk_bytes = chunk_bytes
+        os.makedirs(os.path.join(directory, "tmp"), exist_ok=True)
+
+    def path(self, digest: str) -> str:
+        """sha256 hex digest ka blob path"""
+        return os.path.join(self.directory, digest[:2], digest)
+
+    def save(self, stream: BinaryIO) -> Tuple[str, str, int]:
+        """
+        Stream ko chunks mein disk par likhta hai aur sath sath sha256 banata hai
+
+        Poori file kabhi memory mein nahi hoti. Blob pehle se ho to nayi copy
+        hata di jati hai.
+
+        Returns:
+            (sha256 hex digest, blob path, size in bytes)
+        """
+        hasher = hashlib.sha256()
+        size = 0
+        tmp_path = os.path.join(self.directory, "tmp", uuid.uuid4().hex)
+
+        try:
+            with open(tmp_path, "wb") as f:
+                while True:
+                    chunk = stream.read(self.chunk_bytes)
+                    if not chunk:
+                        break
+                    hasher.update(chunk)
+                    f.write(chunk)
+                    size += len(chunk)
+
+            digest = hasher.hexdigest()
+            path = self.path(digest)
+            if os.path.exists(path):
+                os.remove(tmp_path)
+            else:
+                os.makedirs(os.path.dirname(path), exist_ok=True)
+                os.replace(tmp_path, path)
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+
+        return digest, path, size
+
+
+# Global instance
+blob_store = BlobStore(settings.BLOB_STORE_DIRECTORY, settings.UPLOAD_CHUNK_BYTES)
@@ -0,0 +1,151 @@
+from collections import OrderedDict
+from threading import Lock
+from typing import Any, Callable, Dict, Hashable, List, Optional, Tuple
+
+
+class LRUCache:
+    """Thread-safe LRU cache - per-company objects ko memory mein rakhne ke liye"""
+
+    def __init__(
+        self,
+        max_size: int = 128,
+        on_evict: Optional[Callable[[Hashable, Any], None]] = None
+    ):
+        if max_size < 1:
+            raise ValueError("max_size must be at least 1")
+
+        self.max_size = max_size
+        self.on_evict = on_evict  # Evicted (key, value) ke resources free karne ke liye
+        self._data: "OrderedDict[Hashable, Any]" = OrderedDict()
+        self._lock = Lock()
+        self._creating: Dict[Hashable, Lock] = {}  # get_or_create ke per-key locks
+
+        # Counters - cache sizing ke liye
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        """Key ki value return karta hai aur usay most-recent mark karta hai"""
+        with self._lock:
+            if key not in self._data:
+                self.misses += 1
+                return default
+
+            self._data.move_to_end(key)
+            self.hits += 1
+            return self._data[key]
+
+    def set(self, key: Hashable, value: Any) -> None:
+        """Value store karta hai, limit se upar ho to oldest entry evict karta hai"""
+        evicted = []
+        with self._lock:
+            self._data[key] = value
+            self._data.move_to_end(key)
+
+            while len(self._data) > self.max_size:
+                evicted.append(self._data.popitem(last=False))
+                self.evictions += 1
+
+        # Callback lock ke bahar - slow cleanup doosre callers ko block na kare
+        if self.on_evict:
+            for evicted_key, evicted_value in evicted:
+                self.on_evict(evicted_key, evicted_value)
+
+    def get_or_create(self, key: Hashable, factory: Callable[[], Any]) -> Any:
+        """
+        Cached value return karta hai, na ho to factory se bana kar store karta hai
+
+        Factory cache lock ke bahar chalti hai taake slow builds doosri
+        companies ko block na karein; ek key ke concurrent callers per-key lock
+        par intezar karte hain is liye factory ek hi dafa chalti hai. Phir bhi
+        do values ban jayen to haarne wali on_evict se free hoti hai.
+        """
+        marker = object()
+        value = self.get(key, marker)
+        if value is not marker:
+            return value
+
+        with self._lock:
+            creating = self._creating.setdefault(key, Lock())
+
+        with creating:
+            try:
+                with self._lock:
+                    # Intezar ke dauran kisi aur thread ne bana diya ho to wahi use karo
+                    if key in self._data:
+                        self._data.move_to_end(key)
+                        return self._data[key]
+
+                value = factory()
+            finally:
+                with self._lock:
+                    if self._creating.get(key) is creating:
+                        del self._creating[key]
+
+        with self._lock:
+            existing = self._data.get(key, marker)
+            if existing is not marker:
+                self._data.move_to_end(key)
+
+        if existing is marker:
+            self.set(key, value)
+            return value
+
+        if existing is not value and self.on_evict:
+            self.on_evict(key, value)
+        return existing
+
+    def pop(self, key: Hashable, default: Any = None) -> Any:
+        """Key ko cache se remove karta hai"""
+        with self._lock:
+            return self._data.pop(key, default)
+
+    def evict(self, key: Hashable) -> bool:
+        """
+        Key ko eviction ki tarah remove karta hai (counter + on_evict callback)
+
+        Returns:
+            True agar key cache mein thi
+        """
+        marker = object()
+        with self._lock:
+            value = self._data.pop(key, marker)
+            if value is marker:
+                return False
+            self.evictions += 1
+
+        if self.on_evict:
+            self.on_evict(key, value)
+        return True
+
+    def items(self) -> List[Tuple[Hashable, Any]]:
+        """Entries ki snapshot - least recently used pehle"""
+        with self._lock:
+            return list(self._data.items())
+
+    def clear(self) -> None:
+        """Saari entries remove karta hai"""
+        with self._lock:
+            self._data.clear()
+
+    def __contains__(self, key: Hashable) -> bool:
+        with self._lock:
+            return key in self._data
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._data)
+
+    def stats(self) -> dict:
+        """Hit/miss/eviction counters return karta hai"""
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                "size": len(self._data),
+                "max_size": self.max_size,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "hit_ratio": round(self.hits / total, 4) if total else 0.0
+            }
@@ -1,5 +1,13 @@
 from sqlmodel import create_engine, SQLModel, Session
+from sqlmodel.ext.asyncio.session import AsyncSession
+from sqlalchemy import inspect, text
+from sqlalchemy.engine import Engine
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import create_async_engine
 from app.config import settings
+from app.utils.logger import get_logger
+
+logger = get_logger("database")
 
 # Database engine
 engine = create_engine(
@@ -9,12 +17,104 @@ engine = create_engine(
 )
 
 
+def get_async_database_url(url: str) -> str:
+    """Sync DATABASE_URL ko async driver wale URL mein badalta hai"""
+    drivers = {
+        "postgresql": "postgresql+asyncpg",
+        "postgresql+psycopg2": "postgresql+asyncpg",
+        "sqlite": "sqlite+aiosqlite",
+    }
+    scheme, sep, rest = url.partition("://")
+    return f"{drivers.get(scheme, scheme)}{sep}{rest}"
+
+
+# Async engine - chat path ke liye, LLM ka wait threadpool thread block nahi karta
+async_engine = create_async_engine(
+    get_async_database_url(settings.DATABASE_URL),
+    echo=True,
+    pool_pre_ping=True
+)
+
+
+def _sql_literal(value) -> str:
+    """Python default ko DDL literal mein badalta hai"""
+    if isinstance(value, bool):
+        return "TRUE" if value else "FALSE"
+    if isinstance(value, str):
+        return "'" + value.replace("'", "''") + "'"
+    return str(value)
+
+
+def add_missing_columns(bind: Engine) -> list:
+    """
+    Purani tables mein models ke naye columns jodta hai (idempotent)
+    
+    create_all sirf nayi tables banata hai - pehle se bani table mein naya
+    column nahi aata. Har startup par sirf gayab columns ALTER TABLE ADD
+    COLUMN se jodte hain; NOT NULL column ke liye model ka scalar default
+    DEFAULT ban kar purani rows bharta hai. Model ke gayab indexes bhi bante
+    hain; purane duplicate rows ki wajah se unique index na ban sake to
+    warning log hoti hai aur startup nahi rukta.
+    
+    Args:
+        bind: Database engine
+    
+    Returns:
+        Jode gaye "table.column" names
+    """
+    inspector = inspect(bind)
+    quote = bind.dialect.identifier_preparer.quote
+    existing_tables = set(inspector.get_table_names())
+    added = []
+    
+    with bind.begin() as connection:
+        for table in SQLModel.metadata.sorted_tables:
+            if table.name not in existing_tables:
+                continue
+            existing = {column["name"] for column in inspector.get_columns(table.name)}
+            new_columns = [column for column in table.columns if column.name not in existing]
+            
+            for column in new_columns:
+                column_type = column.type.compile(dialect=bind.dialect)
+                ddl = f"ALTER TABLE {quote(table.name)} ADD COLUMN {quote(column.name)} {column_type}"
+                default = column.default.arg if column.default is not None and column.default.is_scalar else None
+                if default is not None:
+                    ddl += f" DEFAULT {_sql_literal(default)}"
+                    if not column.nullable:
+                        ddl += " NOT NULL"
+                connection.execute(text(ddl))
+                added.append(f"{table.name}.{column.name}")
+    
+    for table in SQLModel.metadata.sorted_tables:
+        if table.name not in existing_tables:
+            continue
+        for index in table.indexes:
+            try:
+                with bind.begin() as connection:
+                    index.create(connection, checkfirst=True)
+            except IntegrityError:
+                logger.warning("Index %s not created - existing rows violate it", index.name)
+    
+    return added
+
+
 def create_db_and_tables():
     """Database tables create karne ke liye"""
     SQLModel.metadata.create_all(engine)
+    # Pichle versions ki tables mein naye columns
+    added = add_missing_columns(engine)
+    if added:
+        print(f"✅ Columns added: {', '.join(added)}")
 
 
 def get_session():
     """Database session provide karta hai"""
     with Session(engine) as session:
-        yield session
\ No newline at end of file
+        yield session
+
+
+async def get_async_session():
+    """Async database session provide karta hai"""
+    # Commit ke baad objects expire na hon - async mein lazy load nahi ho sakta
+    async with AsyncSession(async_engine, expire_on_commit=False) as session:
+        yield session
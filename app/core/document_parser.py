@@ -0,0 +1,149 @@
+from langchain_core.documents import Document as LCDocument
+from app.config import settings
+from concurrent.futures import ProcessPoolExecutor
+from threading import Lock
+from typing import Dict, List, Optional, Tuple
+import multiprocessing
+import os
+
+# Worker se parent tak (text, metadata) - langchain Document pickle karne se sasta
+Page = Tuple[str, Dict]
+
+
+def _pdf_page_count(file_path: str) -> int:
+    import pypdf
+
+    return len(pypdf.PdfReader(file_path).pages)
+
+
+def _extract_pdf_pages(file_path: str, start: int, stop: int) -> List[Page]:
+    """
+    Worker: PDF ke [start, stop) pages ka text
+
+    Har task file khud kholta hai - PdfReader processes ke darmiyan share
+    nahi ho sakta. Metadata PyPDFLoader jaisa (source, page).
+    """
+    import pypdf
+
+    reader = pypdf.PdfReader(file_path)
+    return [
+        (reader.pages[number].extract_text(), {"source": file_path, "page": number})
+        for number in range(start, stop)
+    ]
+
+
+def _load_file(file_path: str, file_type: str) -> List[Page]:
+    """Worker: poori file ek task mein (DOCX/TXT ke pages nahi hote)"""
+    if file_type == "pdf":
+        return _extract_pdf_pages(file_path, 0, _pdf_page_count(file_path))
+
+    from langchain_community.document_loaders import Docx2txtLoader, TextLoader
+
+    if file_type == "docx":
+        loader = Docx2txtLoader(file_path)
+    elif file_type == "txt":
+        loader = TextLoader(file_path)
+    else:
+        raise ValueError(f"Unsupported file type: {file_type}")
+
+    return [(doc.page_content, doc.metadata) for doc in loader.load()]
+
+
+class DocumentParser:
+    """
+    Process pool mein document parsing
+
+    pypdf pure Python hai aur GIL pakad kar ek page ke baad doosra parhta
+    hai, is liye threads se faida nahi. Bari PDF page ranges mein baant kar
+    processes mein parhi jati hai aur results page order mein jode jate
+    hain; DOCX/TXT files ki batch file-level par parallel hoti hai.
+
+    Pool "spawn" context use karta hai - ingestion ke threads ke sath fork
+    karna locks ko child mein aadha pakra chhor sakta hai. Pool pehli
+    zaroorat par banta hai; workers == 1 ya chhoti files par parsing isi
+    process mein hoti hai.
+    """
+
+    def __init__(self, workers: int = 0, pages_per_task: int = 16):
+        self.workers = workers or os.cpu_count() or 1
+        self.pages_per_task = max(1, pages_per_task)
+        self._pool: Optional[ProcessPoolExecutor] = None
+        self._lock = Lock()
+
+    def _executor(self) -> ProcessPoolExecutor:
+        with self._lock:
+            if self._pool is None:
+                self._pool = ProcessPoolExecutor(
+                    max_workers=self.workers,
+                    mp_context=multiprocessing.get_context("spawn")
+                )
+            return self._pool
+
+    def load(self, file_path: str, file_type: str) -> List[LCDocument]:
+        """
+        Ek file ka text - PDF ho to pages parallel mein
+
+        Args:
+            file_path: File ka path
+            file_type: pdf, docx, txt
+
+        Returns:
+            Pages/sections ke langchain Documents (file order mein)
+        """
+        if file_type != "pdf":
+            return self._documents(_load_file(file_path, file_type))
+
+        page_count = _pdf_page_count(file_path)
+        if self.workers <= 1 or page_count <= self.pages_per_task:
+            return self._documents(_extract_pdf_pages(file_path, 0, page_count))
+
+        # Har task PDF dobara kholta hai (xref + page tree) - is liye har worker
+        # ko ~2 bare ranges, lekin pages_per_task se chhote nahi
+        task_pages = max(self.pages_per_task, -(-page_count // (self.workers * 2)))
+        ranges = [
+            (start, min(start + task_pages, page_count))
+            for start in range(0, page_count, task_pages)
+        ]
+        pool = self._executor()
+        futures = [pool.submit(_extract_pdf_pages, file_path, start, stop) for start, stop in ranges]
+
+        # Futures submit order mein - pages apni jagah par
+        pages: List[Page] = []
+        for future in futures:
+            pages.extend(future.result())
+        return self._documents(pages)
+
+    def load_many(self, files: List[Tuple[str, str]]) -> List[List[LCDocument]]:
+        """
+        Kai files ek sath parse karta hai (har file ek task)
+
+        Args:
+            files: [(file_path, file_type), ...]
+
+        Returns:
+            Har file ke Documents - input order mein
+        """
+        if self.workers <= 1 or len(files) <= 1:
+            return [self.load(file_path, file_type) for file_path, file_type in files]
+
+        pool = self._executor()
+        futures = [pool.submit(_load_file, file_path, file_type) for file_path, file_type in files]
+        return [self._documents(future.result()) for future in futures]
+
+    @staticmethod
+    def _documents(pages: List[Page]) -> List[LCDocument]:
+        return [LCDocument(page_content=text, metadata=metadata) for text, metadata in pages]
+
+    def shutdown(self) -> None:
+        """Worker processes band karta hai"""
+        with self._lock:
+            if self._pool is not None:
+                self._pool.shutdown(wait=False, cancel_futures=True)
+                self._pool = None
+
+
+# Global instance
+document_parser = DocumentParser(
+    workers=settings.PARSE_WORKERS,
+    pages_per_task=settings.PARSE_PAGES_PER_TASK
+)
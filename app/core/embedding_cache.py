@@ -0,0 +1,399 @@
+from langchain_core.embeddings import Embeddings
+from app.config import settings
+from app.core.cache import LRUCache
+from app.utils.helpers import normalize_question
+from threading import Lock, local
+from typing import Dict, List, Optional
+import asyncio
+import hashlib
+import os
+import sqlite3
+import time
+import numpy as np
+
+# SQLite ke "IN (...)" parameters ki hadd se neeche
+LOOKUP_BATCH_SIZE = 500
+
+# Itne naye query vectors likhne ke baad disk tier prune hota hai
+QUERY_PRUNE_INTERVAL = 100
+
+
+def content_hash(text: str) -> bytes:
+    """Chunk text ka sha256 digest - cache key"""
+    return hashlib.sha256(text.encode("utf-8")).digest()
+
+
+class EmbeddingStore:
+    """
+    Disk par embeddings ka content-addressed store
+
+    SQLite table (model, sha256) -> float32 blob. Primary key hi index hai,
+    WAL mode ki wajah se kai workers same file parh/likh sakte hain.
+    accessed_at se kisi model ki purani rows prune hoti hain.
+    """
+
+    def __init__(self, directory: str):
+        os.makedirs(directory, exist_ok=True)
+        self.path = os.path.join(directory, "embeddings.sqlite3")
+        self._local = local()
+        connection = self._connection()
+        connection.execute(
+            "CREATE TABLE IF NOT EXISTS embeddings ("
+            "model TEXT NOT NULL, hash BLOB NOT NULL, vector BLOB NOT NULL, accessed_at REAL, "
+            "PRIMARY KEY (model, hash)) WITHOUT ROWID"
+        )
+        # Pichle version ki file mein accessed_at nahi tha
+        columns = {row[1] for row in connection.execute("PRAGMA table_info(embeddings)")}
+        if "accessed_at" not in columns:
+            connection.execute("ALTER TABLE embeddings ADD COLUMN accessed_at REAL")
+        connection.execute(
+            "CREATE INDEX IF NOT EXISTS embeddings_accessed ON embeddings (model, accessed_at)"
+        )
+
+    def _connection(self) -> sqlite3.Connection:
+        """Har thread ka apna connection"""
+        connection = getattr(self._local, "connection", None)
+        if connection is None:
+            connection = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.execute("PRAGMA synchronous=NORMAL")
+            self._local.connection = connection
+        return connection
+
+    def get_many(self, model: str, hashes: List[bytes]) -> Dict[bytes, List[float]]:
+        """
+        Stored vectors return karta hai
+
+        Returns:
+            {hash: vector} - jo na milein woh shamil nahi
+        """
+        found = {}
+        connection = self._connection()
+        for start in range(0, len(hashes), LOOKUP_BATCH_SIZE):
+            batch = hashes[start:start + LOOKUP_BATCH_SIZE]
+            placeholders = ",".join("?" * len(batch))
+            rows = connection.execute(
+                f"SELECT hash, vector FROM embeddings WHERE model = ? AND hash IN ({placeholders})",
+                [model, *batch]
+            )
+            for digest, blob in rows:
+                found[digest] = np.frombuffer(blob, dtype=np.float32).tolist()
+        return found
+
+    def put_many(self, model: str, items: Dict[bytes, List[float]]) -> None:
+        """Naye vectors float32 blobs ki shakal mein store karta hai"""
+        if not items:
+            return
+
+        connection = self._connection()
+        connection.execute("BEGIN")
+        try:
+            now = time.time()
+            connection.executemany(
+                "INSERT OR IGNORE INTO embeddings (model, hash, vector, accessed_at) VALUES (?, ?, ?, ?)",
+                [
+                    (model, digest, np.asarray(vector, dtype=np.float32).tobytes(), now)
+                    for digest, vector in items.items()
+                ]
+            )
+            connection.execute("COMMIT")
+        except Exception:
+            connection.execute("ROLLBACK")
+            raise
+
+    def touch(self, model: str, digest: bytes) -> None:
+        """Hit par row ka accessed_at taaza karta hai - prune mein nayi samjhi jaye"""
+        self._connection().execute(
+            "UPDATE embeddings SET accessed_at = ? WHERE model = ? AND hash = ?",
+            (time.time(), model, digest)
+        )
+
+    def prune(self, model: str, max_rows: int, max_age_seconds: float) -> int:
+        """
+        Model ki rows ko TTL aur row cap tak kaatta hai
+
+        Args:
+            model: Kis model key ki rows (dusre models ko haath nahi lagta)
+            max_rows: Zyada se zyada rows (0 = koi cap nahi)
+            max_age_seconds: Is se purani access wali rows nikalti hain (0 = koi TTL nahi)
+
+        Returns:
+            Delete hui rows
+        """
+        connection = self._connection()
+        deleted = 0
+        if max_age_seconds > 0:
+            deleted += connection.execute(
+                "DELETE FROM embeddings WHERE model = ? AND COALESCE(accessed_at, 0) < ?",
+                (model, time.time() - max_age_seconds)
+            ).rowcount
+        if max_rows > 0:
+            deleted += connection.execute(
+                "DELETE FROM embeddings WHERE model = ? AND hash IN ("
+                "SELECT hash FROM embeddings WHERE model = ? "
+                "ORDER BY COALESCE(accessed_at, 0) DESC LIMIT -1 OFFSET ?)",
+                (model, model, max_rows)
+            ).rowcount
+        return deleted
+
+    def count(self) -> int:
+        """Stored vectors ki tadaad"""
+        return self._connection().execute("SELECT COUNT(*) FROM embeddings").fetchone()[0]
+
+    def size_bytes(self) -> int:
+        """Database file ka size (WAL ke sath)"""
+        return sum(
+            os.path.getsize(path)
+            for path in (self.path, f"{self.path}-wal")
+            if os.path.exists(path)
+        )
+
+
+class CachedEmbeddings(Embeddings):
+    """
+    Kisi bhi embedding model ke aage content-hash cache
+
+    Documents embed karne se pehle (model, sha256(text)) se store check hota
+    hai; sirf naye texts provider ko jaate hain. Same batch ke duplicate texts
+    bhi ek hi dafa embed hote hain. Query embeddings cache nahi hoti.
+    """
+
+    def __init__(self, embeddings: Embeddings, store: EmbeddingStore, model: str):
+        self.embeddings = embeddings
+        self.store = store
+        self.model = model
+
+        self.hits = 0
+        self.misses = 0
+        self._lock = Lock()
+
+    def _lookup(self, texts: List[str]) -> tuple:
+        """(hashes, cached vectors, missing texts by hash)"""
+        hashes = [content_hash(text) for text in texts]
+        cached = self.store.get_many(self.model, list(set(hashes)))
+
+        missing: Dict[bytes, str] = {}
+        for digest, text in zip(hashes, texts):
+            if digest not in cached:
+                missing.setdefault(digest, text)
+
+        with self._lock:
+            self.misses += len(missing)
+            self.hits += len(texts) - len(missing)
+        return hashes, cached, missing
+
+    def _store(self, cached: dict, missing: Dict[bytes, str], vectors: List[List[float]]) -> None:
+        # float32 par round - cache hit aur miss dono par bilkul same vector milta hai
+        rounded = np.asarray(vectors, dtype=np.float32)
+        embedded = {digest: row.tolist() for digest, row in zip(missing, rounded)}
+        self.store.put_many(self.model, embedded)
+        cached.update(embedded)
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        hashes, cached, missing = self._lookup(texts)
+        if missing:
+            vectors = self.embeddings.embed_documents(list(missing.values()))
+            self._store(cached, missing, vectors)
+        return [cached[digest] for digest in hashes]
+
+    async def aembed_documents(self, texts: List[str]) -> List[List[float]]:
+        hashes, cached, missing = self._lookup(texts)
+        if missing:
+            vectors = await self.embeddings.aembed_documents(list(missing.values()))
+            self._store(cached, missing, vectors)
+        return [cached[digest] for digest in hashes]
+
+    def embed_query(self, text: str) -> List[float]:
+        return self.embeddings.embed_query(text)
+
+    async def aembed_query(self, text: str) -> List[float]:
+        return await self.embeddings.aembed_query(text)
+
+    def stats(self) -> dict:
+        """Hit/miss counters aur store ka size"""
+        with self._lock:
+            hits, misses = self.hits, self.misses
+        total = hits + misses
+        return {
+            "model": self.model,
+            "hits": hits,
+            "misses": misses,
+            "hit_ratio": round(hits / total, 4) if total else 0.0,
+            "entries": self.store.count(),
+            "size_bytes": self.store.size_bytes()
+        }
+
+
+class QueryCachedEmbeddings(Embeddings):
+    """
+    Search queries ki embeddings ka cache
+
+    Do tiers: process ke andar LRU (normalized text -> float32 vector) aur
+    optional disk store (EmbeddingStore, "query:" model key) jo same machine
+    ke saare workers share karte hain. Document embeddings seedha andar wale
+    model ko jaati hain.
+
+    Key answer cache wali normalize_question() hai - "How do I reset my
+    password?" aur "how do i reset  my password" same key. Async path par
+    disk store (sqlite) ka kaam executor thread mein hota hai - event loop
+    block nahi hota. Disk tier bhi size-bounded hai - har QUERY_PRUNE_INTERVAL
+    writes par disk_max_rows aur disk_ttl_seconds se purani rows nikalti hain.
+    """
+
+    def __init__(
+        self,
+        embeddings: Embeddings,
+        model: str,
+        max_size: int,
+        store: Optional[EmbeddingStore] = None,
+        disk_max_rows: int = 0,
+        disk_ttl_seconds: float = 0.0
+    ):
+        self.embeddings = embeddings
+        self.model = f"query:{model}"
+        self.memory = LRUCache(max_size=max_size)
+        self.store = store
+        self.disk_max_rows = disk_max_rows
+        self.disk_ttl_seconds = disk_ttl_seconds
+
+        self.disk_hits = 0
+        self.misses = 0
+        self.disk_pruned = 0
+        self.embed_seconds = 0.0  # Misses par provider calls ka kul waqt
+        self._writes = 0
+        self._lock = Lock()
+
+        if self.store is not None:
+            self.prune()
+
+    def prune(self) -> int:
+        """Disk tier ki query rows row cap aur TTL tak kaatta hai"""
+        deleted = self.store.prune(self.model, self.disk_max_rows, self.disk_ttl_seconds)
+        with self._lock:
+            self.disk_pruned += deleted
+        return deleted
+
+    def _lookup(self, key: str) -> Optional[List[float]]:
+        vector = self.memory.get(key)
+        if vector is None and self.store is not None:
+            vector = self._disk_lookup(key)
+        return vector.tolist() if vector is not None else None
+
+    def _disk_lookup(self, key: str) -> Optional[np.ndarray]:
+        found = self.store.get_many(self.model, [content_hash(key)])
+        if not found:
+            return None
+
+        vector = np.asarray(found[content_hash(key)], dtype=np.float32)
+        self.store.touch(self.model, content_hash(key))
+        self.memory.set(key, vector)
+        with self._lock:
+            self.disk_hits += 1
+        return vector
+
+    def _remember(self, key: str, vector: List[float], seconds: float) -> List[float]:
+        # float32 par round - hit aur miss dono par bilkul same vector
+        rounded = np.asarray(vector, dtype=np.float32)
+        self.memory.set(key, rounded)
+        with self._lock:
+            self.misses += 1
+            self.embed_seconds += seconds
+        if self.store is not None:
+            self.store.put_many(self.model, {content_hash(key): rounded})
+            with self._lock:
+                self._writes += 1
+                due = self._writes % QUERY_PRUNE_INTERVAL == 0
+            if due:
+                self.prune()
+        return rounded.tolist()
+
+    def embed_query(self, text: str) -> List[float]:
+        key = normalize_question(text)
+        vector = self._lookup(key)
+        if vector is not None:
+            return vector
+
+        start = time.perf_counter()
+        vector = self.embeddings.embed_query(text)
+        return self._remember(key, vector, time.perf_counter() - start)
+
+    async def aembed_query(self, text: str) -> List[float]:
+        key = normalize_question(text)
+        loop = asyncio.get_running_loop()
+
+        vector = self.memory.get(key)
+        if vector is None and self.store is not None:
+            vector = await loop.run_in_executor(None, self._disk_lookup, key)
+        if vector is not None:
+            return vector.tolist()
+
+        start = time.perf_counter()
+        vector = await self.embeddings.aembed_query(text)
+        seconds = time.perf_counter() - start
+        if self.store is None:
+            return self._remember(key, vector, seconds)
+        return await loop.run_in_executor(None, self._remember, key, vector, seconds)
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        return self.embeddings.embed_documents(texts)
+
+    async def aembed_documents(self, texts: List[str]) -> List[List[float]]:
+        return await self.embeddings.aembed_documents(texts)
+
+    def stats(self) -> dict:
+        """
+        Query cache counters + andar wale document cache ke counters
+
+        Saved latency = hits * misses ka average provider latency.
+        """
+        inner = getattr(self.embeddings, "stats", None)
+        stats = inner() if inner else {}
+
+        with self._lock:
+            disk_hits, misses, embed_seconds = self.disk_hits, self.misses, self.embed_seconds
+        # Memory "misses" mein disk hits bhi shamil hain
+        memory_hits = self.memory.stats()["hits"]
+        hits = memory_hits + disk_hits
+        total = hits + misses
+        average_ms = embed_seconds * 1000 / misses if misses else 0.0
+
+        stats.update({
+            "query_memory_hits": memory_hits,
+            "query_disk_hits": disk_hits,
+            "query_misses": misses,
+            "query_disk_pruned": self.disk_pruned,
+            "query_hit_ratio": round(hits / total, 4) if total else 0.0,
+            "query_entries": len(self.memory),
+            "query_avg_embed_ms": round(average_ms, 2),
+            "query_saved_ms": round(hits * average_ms, 2)
+        })
+        return stats
+
+
+def embedding_model_key() -> str:
+    """Cache key ka model hissa - provider, model aur dimensions"""
+    if settings.EMBEDDING_PROVIDER == "hashing":
+        return f"hashing:{settings.EMBEDDING_DIMENSIONS}"
+    return f"{settings.EMBEDDING_PROVIDER}:{settings.EMBEDDING_MODEL}"
+
+
+def with_embedding_cache(embeddings: Embeddings) -> Embeddings:
+    """Settings ke hisab se embeddings ko document aur query caches mein wrap karta hai"""
+    store = None
+    if settings.EMBEDDING_CACHE_ENABLED or settings.QUERY_EMBEDDING_CACHE_DISK:
+        store = EmbeddingStore(settings.EMBEDDING_CACHE_DIRECTORY)
+
+    if settings.EMBEDDING_CACHE_ENABLED:
+        embeddings = CachedEmbeddings(embeddings, store, model=embedding_model_key())
+
+    if settings.QUERY_EMBEDDING_CACHE_SIZE > 0:
+        embeddings = QueryCachedEmbeddings(
+            embeddings,
+            model=embedding_model_key(),
+            max_size=settings.QUERY_EMBEDDING_CACHE_SIZE,
+            store=store if settings.QUERY_EMBEDDING_CACHE_DISK else None,
+            disk_max_rows=settings.QUERY_EMBEDDING_CACHE_DISK_MAX_ROWS,
+            disk_ttl_seconds=settings.QUERY_EMBEDDING_CACHE_DISK_TTL_SECONDS
+        )
+
+    return embeddings
@@ -0,0 +1,503 @@
+from langchain_core.documents import Document
+from app.core.ivf_index import IVFPartition, default_list_count
+from app.utils.logger import get_logger
+from threading import RLock
+from typing import Dict, List, Optional, Tuple
+import json
+import os
+import shutil
+import numpy as np
+
+logger = get_logger("flat_index")
+
+# Pehli allocation - is ke baad capacity double hoti hai
+MIN_CAPACITY = 1024
+
+# Compaction mein itni rows ek dafa copy hoti hain
+COPY_BLOCK_ROWS = 8192
+
+# Quantized rows itne itne float32 mein convert ho kar score hoti hain - block CPU cache mein rehta hai
+SCORE_BLOCK_ROWS = 256
+
+QUANTIZATION_DTYPES = {"none": np.float32, "float16": np.float16, "int8": np.int8}
+
+
+def normalize_rows(matrix: np.ndarray) -> np.ndarray:
+    """Rows ko unit length par laata hai (dot product = cosine similarity)"""
+    norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return matrix / norms
+
+
+def quantize(matrix: np.ndarray, quantization: str) -> Tuple[np.ndarray, Optional[np.ndarray]]:
+    """
+    Normalized float32 rows ko storage dtype mein badalta hai
+
+    int8 mein har row ka apna scale hota hai: row ~= codes * scale
+
+    Returns:
+        (codes, scales) - scales sirf int8 ke liye, warna None
+    """
+    if quantization != "int8":
+        return matrix.astype(QUANTIZATION_DTYPES[quantization]), None
+
+    scales = np.abs(matrix).max(axis=1) / 127
+    scales[scales == 0] = 1.0
+    codes = np.rint(matrix / scales[:, None]).astype(np.int8)
+    return codes, scales.astype(np.float32)
+
+
+def score_rows(codes: np.ndarray, scales: Optional[np.ndarray], query: np.ndarray) -> np.ndarray:
+    """Stored rows ka query se dot product - quantized rows blocks mein float32 par upcast"""
+    if codes.dtype == np.float32:
+        return codes @ query
+
+    scores = np.empty(len(codes), dtype=np.float32)
+    buffer = np.empty((SCORE_BLOCK_ROWS, codes.shape[1]), dtype=np.float32)
+    for start in range(0, len(codes), SCORE_BLOCK_ROWS):
+        block = codes[start:start + SCORE_BLOCK_ROWS]
+        upcast = buffer[:len(block)]
+        upcast[...] = block
+        scores[start:start + len(block)] = upcast @ query
+    if scales is not None:
+        scores *= scales[:len(codes)]
+    return scores
+
+
+def read_state_counts(directory: str) -> Tuple[int, int]:
+    """
+    Index load kiye baghair state.json se rows ginta hai
+
+    Args:
+        directory: Tenant ki index directory
+
+    Returns:
+        (live rows, tombstoned rows) - index na ho to (0, 0)
+    """
+    path = os.path.join(directory, "state.json")
+    if not os.path.exists(path):
+        return 0, 0
+
+    with open(path, encoding="utf-8") as f:
+        state = json.load(f)
+    return state["count"] - len(state["deleted"]), len(state["deleted"])
+
+
+class FlatIndex:
+    """
+    Ek company ke vectors ka exact (brute-force) index
+
+    On-disk layout (directory per company):
+        vectors.npy        [capacity, dimensions] - memory-mapped, normalized rows
+                           (float32, float16 ya int8 - quantization ke hisab se)
+        scales.npy         int8 rows ka per-vector scale (float32)
+        vectors_full.npy   rerank ke liye float32 copy - sirf top candidates ke pages parhe jate hain
+        rows.jsonl         har row ka [vector_id, text, metadata] - vectors ke parallel
+        state.json         count, dimensions, quantization aur tombstoned row numbers
+
+    Append sirf file ke aakhir mein likhta hai; delete row ko tombstone karta
+    hai (search mein skip). compact() tombstoned rows files se nikal deta hai.
+    Restart par matrix mmap hoti hai - rebuild nahi.
+
+    ann_threshold se zyada rows hon to IVF partition (app/core/ivf_index.py)
+    ban jata hai aur search approximate ho jati hai. Naye inserts seedha
+    qareebi list mein jaate hain; rows 4x ho jayen to centroids dobara train
+    hote hain.
+
+    Quantization (float16 = 2x, int8 = ~4x kam memory) index banate waqt
+    tay hoti hai aur state.json mein save rehti hai. rerank_factor > 0 par
+    quantized scores se k * rerank_factor candidates chune jate hain aur
+    float32 copy se dobara score hote hain.
+    """
+
+    def __init__(
+        self,
+        directory: str,
+        ann_threshold: Optional[int] = None,
+        nprobe: int = 16,
+        lists: Optional[int] = None,
+        quantization: str = "none",
+        rerank_factor: int = 0
+    ):
+        if quantization not in QUANTIZATION_DTYPES:
+            raise ValueError(f"Unknown quantization: {quantization}")
+
+        self.directory = directory
+        self.ann_threshold = ann_threshold
+        self.nprobe = nprobe
+        self.lists = lists
+        self.ivf: Optional[IVFPartition] = None
+        self._recover_compaction()
+        os.makedirs(directory, exist_ok=True)
+
+        self.count = 0
+        self.dimensions: Optional[int] = None
+        self.quantization = quantization
+        self.rerank_factor = rerank_factor
+        self.full_precision = quantization != "none" and rerank_factor > 0
+        self.vectors: Optional[np.memmap] = None
+        self.scales: Optional[np.memmap] = None
+        self.full: Optional[np.memmap] = None
+        self.alive = np.zeros(0, dtype=bool)
+
+        self.ids: List[str] = []
+        self.rows: List[tuple] = []  # (text, metadata) - vectors ke parallel
+        self._positions: Dict[str, int] = {}
+        self._deleted: set = set()
+        self._lock = RLock()
+
+        self._load()
+
+    def _path(self, name: str) -> str:
+        return os.path.join(self.directory, name)
+
+    def _recover_compaction(self) -> None:
+        """
+        Beech mein ruki compaction ka safaya
+
+        Directory swap ke darmiyan crash ho to mukammal likhi ".compact"
+        directory hi asal index hai.
+        """
+        staged, old = f"{self.directory}.compact", f"{self.directory}.old"
+        if not os.path.exists(self.directory) and os.path.exists(staged):
+            os.replace(staged, self.directory)
+        shutil.rmtree(staged, ignore_errors=True)
+        shutil.rmtree(old, ignore_errors=True)
+
+    def _open_arrays(self) -> None:
+        self.vectors = np.load(self._path("vectors.npy"), mmap_mode="r+")
+        if self.quantization == "int8":
+            self.scales = np.load(self._path("scales.npy"), mmap_mode="r+")
+        if self.full_precision:
+            self.full = np.load(self._path("vectors_full.npy"), mmap_mode="r+")
+
+    def _load(self) -> None:
+        if not os.path.exists(self._path("state.json")):
+            return
+
+        with open(self._path("state.json"), encoding="utf-8") as f:
+            state = json.load(f)
+        self.count = state["count"]
+        self.dimensions = state["dimensions"]
+        self._deleted = set(state["deleted"])
+        # Purane index apni quantization par rehte hain
+        self.quantization = state.get("quantization", "none")
+        self.full_precision = state.get("full_precision", False)
+
+        if self.dimensions:
+            self._open_arrays()
+            self.ivf = IVFPartition.load(self.directory, self.vectors[:self.count])
+
+        # state.json ke count se aage ki rows adhoore write ki hain - ignore
+        with open(self._path("rows.jsonl"), encoding="utf-8") as f:
+            for number, line in enumerate(f):
+                if number >= self.count:
+                    break
+                vector_id, text, metadata = json.loads(line)
+                self._positions[vector_id] = number
+                self.ids.append(vector_id)
+                self.rows.append((text, metadata))
+
+        capacity = self.vectors.shape[0] if self.vectors is not None else 0
+        self.alive = np.zeros(capacity, dtype=bool)
+        self.alive[:self.count] = True
+        self.alive[list(self._deleted)] = False
+        for number in self._deleted:
+            self._positions.pop(self.ids[number], None)
+
+    def _save_state(self, directory: Optional[str] = None, count: Optional[int] = None, deleted: Optional[set] = None) -> None:
+        """Atomic write - state.json hi batata hai kitni rows commit hain"""
+        path = os.path.join(directory or self.directory, "state.json")
+        with open(f"{path}.tmp", "w", encoding="utf-8") as f:
+            json.dump({
+                "count": self.count if count is None else count,
+                "dimensions": self.dimensions,
+                "quantization": self.quantization,
+                "full_precision": self.full_precision,
+                "deleted": sorted(self._deleted if deleted is None else deleted)
+            }, f)
+        os.replace(f"{path}.tmp", path)
+
+    def _grow(self, name: str, current: Optional[np.ndarray], dtype, shape: tuple) -> None:
+        """Array file ko nayi capacity ke sath tmp file mein copy karke replace karta hai"""
+        tmp_path = self._path(f"{name}.tmp")
+        grown = np.lib.format.open_memmap(tmp_path, mode="w+", dtype=dtype, shape=shape)
+        if self.count:
+            grown[:self.count] = current[:self.count]
+        grown.flush()
+        del grown
+        os.replace(tmp_path, self._path(name))
+
+    def _ensure_capacity(self, needed: int) -> None:
+        capacity = self.vectors.shape[0] if self.vectors is not None else 0
+        if needed <= capacity:
+            return
+
+        new_capacity = max(needed, capacity * 2, MIN_CAPACITY)
+        self._grow("vectors.npy", self.vectors, QUANTIZATION_DTYPES[self.quantization], (new_capacity, self.dimensions))
+        if self.quantization == "int8":
+            self._grow("scales.npy", self.scales, np.float32, (new_capacity,))
+        if self.full_precision:
+            self._grow("vectors_full.npy", self.full, np.float32, (new_capacity, self.dimensions))
+        self._open_arrays()
+
+        alive = np.zeros(new_capacity, dtype=bool)
+        alive[:capacity] = self.alive
+        self.alive = alive
+
+    def add(self, ids: List[str], embeddings: List[List[float]], texts: List[str], metadatas: List[dict]) -> None:
+        """Naye vectors file ke aakhir mein append karta hai"""
+        matrix = normalize_rows(np.asarray(embeddings, dtype=np.float32))
+
+        with self._lock:
+            if self.dimensions is None:
+                self.dimensions = matrix.shape[1]
+            elif matrix.shape[1] != self.dimensions:
+                raise ValueError(
+                    f"Embedding dimensions {matrix.shape[1]} do not match index dimensions {self.dimensions}"
+                )
+
+            start, end = self.count, self.count + len(ids)
+            self._ensure_capacity(end)
+            codes, scales = quantize(matrix, self.quantization)
+            self.vectors[start:end] = codes
+            self.vectors.flush()
+            if scales is not None:
+                self.scales[start:end] = scales
+                self.scales.flush()
+            if self.full is not None:
+                self.full[start:end] = matrix
+                self.full.flush()
+
+            with open(self._path("rows.jsonl"), "a", encoding="utf-8") as f:
+                for vector_id, text, metadata in zip(ids, texts, metadatas):
+                    f.write(json.dumps([vector_id, text, metadata or {}]) + "\n")
+                f.flush()
+                os.fsync(f.fileno())
+
+            for offset, (vector_id, text, metadata) in enumerate(zip(ids, texts, metadatas)):
+                self._positions[vector_id] = start + offset
+                self.ids.append(vector_id)
+                self.rows.append((text, metadata or {}))
+            self.alive[start:end] = True
+            self.count = end
+            self._save_state()
+            self._update_partition(start)
+
+    def _update_partition(self, start: int) -> None:
+        """Nayi rows IVF mein daalta hai, ya zaroorat ho to partition (dobara) train karta hai"""
+        if self.ivf is None:
+            if self.ann_threshold is None or len(self) < self.ann_threshold:
+                return
+        elif self.lists or default_list_count(self.count) < 2 * len(self.ivf.centroids):
+            self.ivf.add(self.vectors[start:self.count])
+            return
+
+        self.ivf = IVFPartition.train(self.directory, self.vectors[:self.count], self.lists)
+        logger.info("Trained IVF partition with %s lists over %s rows in %s", len(self.ivf.centroids), self.count, self.directory)
+
+    def delete(self, ids: List[str]) -> int:
+        """
+        Rows ko tombstone karta hai
+
+        Returns:
+            Kitni rows delete hui
+        """
+        with self._lock:
+            numbers = [self._positions.pop(vector_id) for vector_id in ids if vector_id in self._positions]
+            if not numbers:
+                return 0
+
+            self.alive[numbers] = False
+            self._deleted.update(numbers)
+            self._save_state()
+            return len(numbers)
+
+    def update_metadata(self, ids: List[str], metadatas: List[dict]) -> int:
+        """
+        Live rows ka metadata badalta hai - vectors wahi rehte hain
+
+        rows.jsonl temp file mein dobara likh kar swap hoti hai (sirf text,
+        matrix nahi), is liye crash par purana ya naya - poora file hi milta hai.
+
+        Returns:
+            Kitni rows update hui
+        """
+        with self._lock:
+            updated = 0
+            for vector_id, metadata in zip(ids, metadatas):
+                number = self._positions.get(vector_id)
+                if number is not None:
+                    self.rows[number] = (self.rows[number][0], metadata or {})
+                    updated += 1
+            if not updated:
+                return 0
+
+            path = self._path("rows.jsonl")
+            with open(f"{path}.tmp", "w", encoding="utf-8") as f:
+                for number in range(self.count):
+                    text, metadata = self.rows[number]
+                    f.write(json.dumps([self.ids[number], text, metadata]) + "\n")
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(f"{path}.tmp", path)
+            return updated
+
+    def dead_rows(self) -> int:
+        """Tombstoned rows jo abhi files mein hain"""
+        return self.count - len(self)
+
+    def compact(self) -> int:
+        """
+        Tombstoned rows files se nikal kar index dobara likhta hai
+
+        Naya index ".compact" directory mein likh kar directory swap hoti hai,
+        is liye crash par purana ya naya - poora index hi milta hai.
+
+        Returns:
+            Kitni rows nikli
+        """
+        with self._lock:
+            removed = self.dead_rows()
+            if not removed:
+                return 0
+
+            keep = np.flatnonzero(self.alive[:self.count])
+            staged = f"{self.directory}.compact"
+            shutil.rmtree(staged, ignore_errors=True)
+            os.makedirs(staged)
+
+            capacity = max(len(keep), MIN_CAPACITY)
+            arrays = [("vectors.npy", self.vectors, (capacity, self.dimensions))]
+            if self.scales is not None:
+                arrays.append(("scales.npy", self.scales, (capacity,)))
+            if self.full is not None:
+                arrays.append(("vectors_full.npy", self.full, (capacity, self.dimensions)))
+            for name, source, shape in arrays:
+                target = np.lib.format.open_memmap(os.path.join(staged, name), mode="w+", dtype=source.dtype, shape=shape)
+                for start in range(0, len(keep), COPY_BLOCK_ROWS):
+                    rows = keep[start:start + COPY_BLOCK_ROWS]
+                    target[start:start + len(rows)] = source[rows]
+                target.flush()
+                del target
+
+            with open(os.path.join(staged, "rows.jsonl"), "w", encoding="utf-8") as f:
+                for number in keep:
+                    text, metadata = self.rows[number]
+                    f.write(json.dumps([self.ids[number], text, metadata]) + "\n")
+                f.flush()
+                os.fsync(f.fileno())
+            self._save_state(directory=staged, count=len(keep), deleted=set())
+
+            # IVF assignments row numbers par hain - naye index par dobara banta hai
+            self.vectors = self.scales = self.full = None
+            old = f"{self.directory}.old"
+            os.replace(self.directory, old)
+            os.replace(staged, self.directory)
+            shutil.rmtree(old, ignore_errors=True)
+
+            self.count, self.ivf = 0, None
+            self.ids, self.rows, self._positions, self._deleted = [], [], {}, set()
+            self._load()
+            if self.count:
+                self._update_partition(self.count)
+
+            logger.info("Compacted %s: removed %s rows, %s remain", self.directory, removed, self.count)
+            return removed
+
+    def search(
+        self,
+        embedding: List[float],
+        k: int = 4,
+        nprobe: Optional[int] = None,
+        exact: bool = False
+    ) -> List[Tuple[str, Document, float]]:
+        """
+        Cosine top-k - IVF partition ho to approximate, warna exact
+
+        Args:
+            embedding: Query vector
+            k: Kitne results
+            nprobe: IVF lists jo scan hon (default self.nprobe)
+            exact: True = IVF ke bawajood poori matrix scan
+
+        Returns:
+            [(vector_id, Document, cosine_distance), ...] qareeb pehle
+        """
+        query = np.asarray(embedding, dtype=np.float32)
+        query /= np.linalg.norm(query) or 1.0
+
+        # ids/rows bhi vectors ke sath hi - compaction naye lists bana kar
+        # numbering badal deti hai, purane references is snapshot se match karte hain
+        with self._lock:
+            vectors, scales, full = self.vectors, self.scales, self.full
+            ids, texts = self.ids, self.rows
+            count, alive = self.count, self.alive[:self.count].copy()
+            candidates = None
+            if self.ivf is not None and not exact:
+                candidates = self.ivf.candidates(query, nprobe or self.nprobe)
+        if vectors is None:
+            return []
+
+        if candidates is None:
+            rows = np.flatnonzero(alive)
+            scores = score_rows(vectors[:count], scales, query)
+            scores = scores[rows] if len(rows) < count else scores
+        else:
+            rows = candidates[alive[candidates]]
+            scores = score_rows(vectors[rows], scales[rows] if scales is not None else None, query)
+
+        # Rerank: quantized scores se shortlist, phir float32 copy se asal scores
+        shortlist = min(k * max(self.rerank_factor, 1), len(rows)) if full is not None else min(k, len(rows))
+        if not min(k, shortlist):
+            return []
+        top = np.argpartition(-scores, shortlist - 1)[:shortlist]
+        rows, scores = rows[top], scores[top]
+        if full is not None:
+            scores = full[rows] @ query
+
+        top = np.argsort(-scores)[:k]
+
+        return [
+            (
+                ids[number],
+                Document(page_content=texts[number][0], metadata=texts[number][1]),
+                float(1.0 - score)
+            )
+            for number, score in zip(rows[top], scores[top])
+        ]
+
+    def get(self, ids: List[str]) -> Dict[str, Document]:
+        """Live ids ke documents"""
+        with self._lock:
+            found = {}
+            for vector_id in ids:
+                number = self._positions.get(vector_id)
+                if number is not None:
+                    text, metadata = self.rows[number]
+                    found[vector_id] = Document(page_content=text, metadata=metadata)
+            return found
+
+    def __len__(self) -> int:
+        return len(self._positions)
+
+    def nbytes(self) -> int:
+        """
+        Search mein scan hone wali arrays ka resident size
+
+        Rerank wali float32 copy shamil nahi - us ke sirf chand pages parhe jate hain.
+        """
+        per_vector = (self.dimensions or 0) * np.dtype(QUANTIZATION_DTYPES[self.quantization]).itemsize
+        if self.quantization == "int8":
+            per_vector += 4
+        return self.count * per_vector
+
+    def warm(self) -> None:
+        """Matrix ke pages memory mein laata hai"""
+        if self.vectors is not None and self.count:
+            float(self.vectors[:self.count].sum(dtype=np.float32))
+
+    def close(self) -> None:
+        """Memory maps chhor deta hai - data disk par rehta hai"""
+        with self._lock:
+            self.vectors = self.scales = self.full = None
@@ -0,0 +1,141 @@
+from typing import List, Optional
+import math
+import os
+import numpy as np
+
+# K-means training sample - har list ke liye itne vectors kaafi hain
+TRAINING_POINTS_PER_LIST = 64
+
+# Assignment ke waqt itni rows ek dafa float32 mein convert hoti hain
+ASSIGN_BLOCK_ROWS = 16384
+
+
+def default_list_count(vectors: int) -> int:
+    """Inverted lists ki tadaad ka andaza - sqrt(N)"""
+    return max(1, int(math.sqrt(vectors)))
+
+
+def spherical_kmeans(data: np.ndarray, lists: int, iterations: int = 10, seed: int = 0) -> np.ndarray:
+    """
+    Normalized vectors par k-means (cosine) - centroids bhi normalized
+
+    Returns:
+        float32 [lists, dimensions]
+    """
+    rng = np.random.default_rng(seed)
+    centroids = data[rng.choice(len(data), size=lists, replace=False)].copy()
+
+    for _ in range(iterations):
+        labels = np.argmax(data @ centroids.T, axis=1)
+        sums = np.zeros_like(centroids)
+        np.add.at(sums, labels, data)
+        norms = np.linalg.norm(sums, axis=1, keepdims=True)
+
+        # Khali list ko kisi random point par dobara shuru karte hain
+        empty = norms[:, 0] == 0
+        sums[empty] = data[rng.choice(len(data), size=int(empty.sum()))]
+        norms[empty] = 1.0
+        centroids = (sums / norms).astype(np.float32)
+
+    return centroids
+
+
+class IVFPartition:
+    """
+    FlatIndex ki rows ka inverted-file (IVF) partition
+
+    Har row apne qareebi centroid ki list mein jati hai. Search sirf query ke
+    nprobe qareebi lists ki rows score karti hai - nprobe barhane se recall
+    barhti hai aur latency bhi.
+
+    On-disk (FlatIndex directory mein):
+        ivf_centroids.npy    float32 [lists, dimensions]
+        ivf_assignments.bin  har row ki list (int32), append-only
+    """
+
+    def __init__(self, directory: str, centroids: np.ndarray):
+        self.directory = directory
+        self.centroids = centroids
+        self.assignments = np.zeros(0, dtype=np.int32)
+        self.lists: List[np.ndarray] = [np.zeros(0, dtype=np.int64) for _ in range(len(centroids))]
+
+    @property
+    def trained_rows(self) -> int:
+        return len(self.assignments)
+
+    def _path(self, name: str) -> str:
+        return os.path.join(self.directory, name)
+
+    @classmethod
+    def train(cls, directory: str, vectors: np.ndarray, lists: Optional[int] = None) -> "IVFPartition":
+        """
+        Vectors ke sample par centroids train karke saari rows assign karta hai
+
+        Args:
+            directory: FlatIndex directory
+            vectors: Normalized rows [count, dimensions] - float32 ya quantized (float16/int8)
+            lists: Inverted lists - None = sqrt(count)
+        """
+        lists = min(lists or default_list_count(len(vectors)), len(vectors))
+        sample_size = min(len(vectors), lists * TRAINING_POINTS_PER_LIST)
+        rng = np.random.default_rng(0)
+        sample = np.asarray(vectors[np.sort(rng.choice(len(vectors), size=sample_size, replace=False))], dtype=np.float32)
+        # int8 codes ka scale row ke hisab se alag hai - direction hi kaafi hai
+        sample /= np.maximum(np.linalg.norm(sample, axis=1, keepdims=True), 1e-12)
+
+        partition = cls(directory, spherical_kmeans(sample, lists))
+        np.save(partition._path("ivf_centroids.npy"), partition.centroids)
+        if os.path.exists(partition._path("ivf_assignments.bin")):
+            os.remove(partition._path("ivf_assignments.bin"))
+        partition.add(vectors)
+        return partition
+
+    @classmethod
+    def load(cls, directory: str, vectors: np.ndarray) -> Optional["IVFPartition"]:
+        """
+        Saved partition load karta hai
+
+        Assignments file vectors se chhoti ho (adhoora write) to baqi rows
+        dobara assign hoti hain.
+        """
+        path = os.path.join(directory, "ivf_centroids.npy")
+        if not os.path.exists(path):
+            return None
+
+        partition = cls(directory, np.load(path))
+        assignments = np.fromfile(partition._path("ivf_assignments.bin"), dtype=np.int32)[:len(vectors)]
+        partition._index(assignments)
+        if len(assignments) < len(vectors):
+            partition.add(vectors[len(assignments):])
+        return partition
+
+    def _index(self, labels: np.ndarray) -> None:
+        """Labels ko in-memory lists mein row numbers ki shakal mein jodta hai"""
+        start = len(self.assignments)
+        rows = np.arange(start, start + len(labels))
+        order = np.argsort(labels, kind="stable")
+        groups, boundaries = np.unique(labels[order], return_index=True)
+        for group, rows_in_group in zip(groups, np.split(rows[order], boundaries[1:])):
+            self.lists[group] = np.concatenate([self.lists[group], rows_in_group])
+        self.assignments = np.concatenate([self.assignments, labels.astype(np.int32)])
+
+    def add(self, vectors: np.ndarray) -> None:
+        """Nayi rows (FlatIndex ke aakhir wali) ko qareebi lists mein daalta hai"""
+        if not len(vectors):
+            return
+
+        # Per-row scale positive hai, is liye quantized codes par bhi argmax same list deta hai
+        labels = np.concatenate([
+            np.argmax(np.asarray(vectors[start:start + ASSIGN_BLOCK_ROWS], dtype=np.float32) @ self.centroids.T, axis=1)
+            for start in range(0, len(vectors), ASSIGN_BLOCK_ROWS)
+        ]).astype(np.int32)
+        with open(self._path("ivf_assignments.bin"), "ab") as f:
+            f.write(labels.tobytes())
+        self._index(labels)
+
+    def candidates(self, query: np.ndarray, nprobe: int) -> np.ndarray:
+        """Query ke nprobe qareebi lists ki rows"""
+        nprobe = min(nprobe, len(self.centroids))
+        nearest = np.argpartition(-(self.centroids @ query), nprobe - 1)[:nprobe]
+        # Sorted rows - matrix se gather sequential rehta hai
+        return np.sort(np.concatenate([self.lists[group] for group in nearest]))
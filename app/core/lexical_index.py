@@ -0,0 +1,287 @@
+from app.core.cache import LRUCache
+from app.config import settings
+from collections import Counter
+from threading import Lock
+from typing import Dict, List, Optional, Tuple
+import gzip
+import heapq
+import json
+import math
+import os
+import re
+import tempfile
+
+# SKU / error codes (ab-123, E_404, v2.1) ek token rehte hain, parts bhi index hote hain
+TOKEN_PATTERN = re.compile(r"[a-z0-9]+(?:[-_.][a-z0-9]+)*")
+
+
+def tokenize(text: str) -> List[str]:
+    """
+    Text ko BM25 terms mein todta hai
+
+    Args:
+        text: Input text
+
+    Returns:
+        Lowercase terms - compound codes ke sath unke parts bhi
+    """
+    terms = []
+    for token in TOKEN_PATTERN.findall(text.lower()):
+        terms.append(token)
+        if not token.isalnum():
+            terms.extend(re.split(r"[-_.]", token))
+    return terms
+
+
+class BM25Index:
+    """
+    Ek company ka in-process BM25 inverted index
+
+    Documents vector store ke ids se pehchane jaate hain. Andar har document
+    ek chhota integer number hai taake postings compact rahein.
+    """
+
+    def __init__(self, k1: float = 1.5, b: float = 0.75):
+        self.k1 = k1
+        self.b = b
+
+        self.doc_ids: List[Optional[str]] = []  # number -> vector id (None = deleted)
+        self.doc_lens: List[int] = []
+        self.postings: Dict[str, Dict[int, int]] = {}  # term -> {number: tf}
+
+        self._numbers: Dict[str, int] = {}  # vector id -> number
+        self._total_len = 0
+        self._lock = Lock()
+
+    def __len__(self) -> int:
+        return len(self._numbers)
+
+    def add(self, ids: List[str], texts: List[str]) -> None:
+        """Naye chunks index mein add karta hai"""
+        with self._lock:
+            for doc_id, text in zip(ids, texts):
+                if doc_id in self._numbers:
+                    continue
+
+                terms = Counter(tokenize(text))
+                number = len(self.doc_ids)
+                self.doc_ids.append(doc_id)
+                self.doc_lens.append(sum(terms.values()))
+                self._numbers[doc_id] = number
+                self._total_len += self.doc_lens[number]
+
+                for term, tf in terms.items():
+                    self.postings.setdefault(term, {})[number] = tf
+
+    def remove(self, ids: List[str]) -> int:
+        """
+        Chunks index se remove karta hai
+
+        Returns:
+            Kitne chunks remove hue
+        """
+        with self._lock:
+            numbers = {self._numbers.pop(doc_id) for doc_id in ids if doc_id in self._numbers}
+            if not numbers:
+                return 0
+
+            for number in numbers:
+                self._total_len -= self.doc_lens[number]
+                self.doc_ids[number] = None
+                self.doc_lens[number] = 0
+
+            for term in list(self.postings):
+                term_postings = self.postings[term]
+                for number in numbers & term_postings.keys():
+                    del term_postings[number]
+                if not term_postings:
+                    del self.postings[term]
+
+            return len(numbers)
+
+    def search(self, query: str, k: int = 4) -> List[Tuple[str, float]]:
+        """
+        BM25 se top-k chunks dhoondta hai
+
+        Returns:
+            [(vector_id, score), ...] high score pehle
+        """
+        with self._lock:
+            doc_count = len(self._numbers)
+            if not doc_count:
+                return []
+
+            avg_len = self._total_len / doc_count
+            scores: Dict[int, float] = {}
+
+            for term in set(tokenize(query)):
+                term_postings = self.postings.get(term)
+                if not term_postings:
+                    continue
+
+                df = len(term_postings)
+                idf = math.log(1 + (doc_count - df + 0.5) / (df + 0.5))
+                for number, tf in term_postings.items():
+                    norm = self.k1 * (1 - self.b + self.b * self.doc_lens[number] / avg_len)
+                    scores[number] = scores.get(number, 0.0) + idf * tf * (self.k1 + 1) / (tf + norm)
+
+            top = heapq.nlargest(k, scores.items(), key=lambda item: item[1])
+            return [(self.doc_ids[number], score) for number, score in top]
+
+    def to_dict(self) -> dict:
+        """Deleted slots hata kar compact, serializable shakal return karta hai"""
+        with self._lock:
+            renumber = {}
+            doc_ids, doc_lens = [], []
+            for number, doc_id in enumerate(self.doc_ids):
+                if doc_id is None:
+                    continue
+                renumber[number] = len(doc_ids)
+                doc_ids.append(doc_id)
+                doc_lens.append(self.doc_lens[number])
+
+            postings = {
+                term: [[renumber[number], tf] for number, tf in term_postings.items()]
+                for term, term_postings in self.postings.items()
+            }
+
+            return {"doc_ids": doc_ids, "doc_lens": doc_lens, "postings": postings}
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "BM25Index":
+        """Saved data se index wapas banata hai (re-tokenize nahi karna parta)"""
+        index = cls()
+        index.doc_ids = list(data["doc_ids"])
+        index.doc_lens = list(data["doc_lens"])
+        index.postings = {
+            term: {number: tf for number, tf in term_postings}
+            for term, term_postings in data["postings"].items()
+        }
+        index._numbers = {doc_id: number for number, doc_id in enumerate(index.doc_ids)}
+        index._total_len = sum(index.doc_lens)
+        return index
+
+
+class LexicalIndexManager:
+    """
+    Per-company BM25 indexes - disk par persist, memory mein LRU
+
+    Har company ki do files: gzip snapshot aur delta log (JSON lines). Upload
+    aur delete sirf apna delta log mein append karte hain - poora index
+    dobara nahi likha jata. compact_every entries ke baad snapshot likh kar
+    log khaali hota hai. Load par snapshot ke upar log replay hota hai; add
+    aur remove idempotent hain, isliye snapshot ke baad bacha log bhi sahi
+    replay hota hai.
+    """
+
+    def __init__(self, directory: str, max_loaded: int = 256, compact_every: int = 100):
+        self.directory = directory
+        self.indexes = LRUCache(max_size=max_loaded)
+        self.compact_every = compact_every
+
+        # Company ka mutate + save ek sath - do uploads ki saves ek doosre ko overwrite na karein
+        self._company_locks: Dict[int, Lock] = {}
+        self._locks_guard = Lock()
+        self._log_entries: Dict[int, int] = {}  # Company -> snapshot ke baad log entries
+
+    def _company_lock(self, company_id: int) -> Lock:
+        with self._locks_guard:
+            return self._company_locks.setdefault(company_id, Lock())
+
+    def _path(self, company_id: int) -> str:
+        return os.path.join(self.directory, f"company_{company_id}.json.gz")
+
+    def _log_path(self, company_id: int) -> str:
+        return os.path.join(self.directory, f"company_{company_id}.log")
+
+    def get_index(self, company_id: int) -> BM25Index:
+        """Company ka index return karta hai - memory mein na ho to disk se load"""
+        return self.indexes.get_or_create(company_id, lambda: self._load(company_id))
+
+    def _load(self, company_id: int) -> BM25Index:
+        path = self._path(company_id)
+        if os.path.exists(path):
+            with gzip.open(path, "rt", encoding="utf-8") as f:
+                index = BM25Index.from_dict(json.load(f))
+        else:
+            index = BM25Index()
+
+        entries = 0
+        log_path = self._log_path(company_id)
+        if os.path.exists(log_path):
+            with open(log_path, encoding="utf-8") as f:
+                for line in f:
+                    try:
+                        entry = json.loads(line)
+                    except ValueError:
+                        # Crash mein adhoori likhi aakhri line
+                        continue
+                    if entry["op"] == "add":
+                        index.add(entry["ids"], entry["texts"])
+                    else:
+                        index.remove(entry["ids"])
+                    entries += 1
+
+        self._log_entries[company_id] = entries
+        return index
+
+    def _append(self, company_id: int, index: BM25Index, entry: dict) -> None:
+        """Delta log mein ek mutation likhta hai - hadd par snapshot"""
+        os.makedirs(self.directory, exist_ok=True)
+        with open(self._log_path(company_id), "a", encoding="utf-8") as f:
+            f.write(json.dumps(entry, separators=(",", ":")) + "\n")
+            f.flush()
+            os.fsync(f.fileno())
+
+        self._log_entries[company_id] = self._log_entries.get(company_id, 0) + 1
+        if self._log_entries[company_id] >= self.compact_every:
+            self._save(company_id, index)
+
+    def _save(self, company_id: int, index: BM25Index) -> None:
+        """
+        Atomic snapshot - crash par purani file salamat rehti hai, phir log khaali
+
+        Temp file ka naam unique (same directory mein, taake os.replace atomic rahe).
+        """
+        os.makedirs(self.directory, exist_ok=True)
+        path = self._path(company_id)
+        fd, tmp_path = tempfile.mkstemp(dir=self.directory, prefix=f"company_{company_id}.", suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as raw, gzip.open(raw, "wt", encoding="utf-8") as f:
+                json.dump(index.to_dict(), f, separators=(",", ":"))
+            os.replace(tmp_path, path)
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+
+        # Snapshot mein sab shamil - log ki zaroorat nahi
+        log_path = self._log_path(company_id)
+        if os.path.exists(log_path):
+            os.remove(log_path)
+        self._log_entries[company_id] = 0
+
+    def add(self, company_id: int, ids: List[str], texts: List[str]) -> None:
+        """Upload ke chunks company ke index mein add karke delta log mein likhta hai"""
+        with self._company_lock(company_id):
+            index = self.get_index(company_id)
+            index.add(ids, texts)
+            self._append(company_id, index, {"op": "add", "ids": list(ids), "texts": list(texts)})
+
+    def remove(self, company_id: int, ids: List[str]) -> None:
+        """Delete hue document ke chunks index se nikal kar delta log mein likhta hai"""
+        with self._company_lock(company_id):
+            index = self.get_index(company_id)
+            if index.remove(ids):
+                self._append(company_id, index, {"op": "remove", "ids": list(ids)})
+
+    def search(self, company_id: int, query: str, k: int = 4) -> List[Tuple[str, float]]:
+        """Company ke index mein BM25 search"""
+        return self.get_index(company_id).search(query, k=k)
+
+
+# Global instance
+lexical_index = LexicalIndexManager(
+    settings.LEXICAL_INDEX_DIRECTORY,
+    compact_every=settings.LEXICAL_INDEX_COMPACT_EVERY
+)
@@ -0,0 +1,186 @@
+from langchain_core.embeddings import Embeddings
+from langchain_core.language_models.chat_models import BaseChatModel
+from langchain_core.messages import AIMessage, AIMessageChunk, BaseMessage
+from langchain_core.outputs import ChatGeneration, ChatGenerationChunk, ChatResult
+from langchain_openai import ChatOpenAI, OpenAIEmbeddings
+from app.config import settings
+from functools import lru_cache
+from typing import Any, AsyncIterator, Iterator, List, Optional
+import asyncio
+import hashlib
+import math
+import re
+import time
+import httpx
+import openai
+
+WORD_PATTERN = re.compile(r"\w+")
+
+
+@lru_cache(maxsize=1)
+def get_openai_clients() -> tuple:
+    """
+    Shared, pooled OpenAI clients (sync + async)
+
+    Chat model aur embeddings same connection pool use karte hain, is liye har
+    call par naya TCP/TLS handshake nahi hota.
+    """
+    limits = httpx.Limits(
+        max_connections=settings.OPENAI_MAX_CONNECTIONS,
+        max_keepalive_connections=settings.OPENAI_MAX_CONNECTIONS
+    )
+    timeout = httpx.Timeout(settings.OPENAI_TIMEOUT_SECONDS)
+
+    sync_client = openai.OpenAI(
+        api_key=settings.OPENAI_API_KEY,
+        max_retries=settings.OPENAI_MAX_RETRIES,
+        http_client=httpx.Client(limits=limits, timeout=timeout)
+    )
+    async_client = openai.AsyncOpenAI(
+        api_key=settings.OPENAI_API_KEY,
+        max_retries=settings.OPENAI_MAX_RETRIES,
+        http_client=httpx.AsyncClient(limits=limits, timeout=timeout)
+    )
+    return sync_client, async_client
+
+
+class FakeChatModel(BaseChatModel):
+    """
+    Deterministic local chat model - load testing aur CI ke liye
+
+    Same prompt par hamesha same answer. Latency do hisson mein: pehle token
+    tak ka wait (latency) aur phir tokens_per_second ki raftar se tokens.
+    """
+
+    latency: float = 0.0
+    tokens_per_second: float = 0.0  # 0 = saare tokens foran
+    response: Optional[str] = None  # Fixed answer, warna prompt se bana hua
+
+    @property
+    def _llm_type(self) -> str:
+        return "fake-chat"
+
+    def _answer(self, messages: List[BaseMessage]) -> str:
+        if self.response is not None:
+            return self.response
+
+        prompt = messages[-1].content if messages else ""
+        digest = hashlib.sha256(prompt.encode()).hexdigest()[:8]
+        words = WORD_PATTERN.findall(prompt)[-12:]
+        return f"Answer {digest}: " + " ".join(words)
+
+    def _tokens(self, text: str) -> List[str]:
+        return re.findall(r"\S+\s*", text)
+
+    def _token_delay(self) -> float:
+        return 1.0 / self.tokens_per_second if self.tokens_per_second else 0.0
+
+    def _generate(self, messages: List[BaseMessage], stop: Optional[List[str]] = None,
+                  run_manager: Any = None, **kwargs: Any) -> ChatResult:
+        text = self._answer(messages)
+        time.sleep(self.latency + self._token_delay() * len(self._tokens(text)))
+        return ChatResult(generations=[ChatGeneration(message=AIMessage(content=text))])
+
+    async def _agenerate(self, messages: List[BaseMessage], stop: Optional[List[str]] = None,
+                         run_manager: Any = None, **kwargs: Any) -> ChatResult:
+        text = self._answer(messages)
+        await asyncio.sleep(self.latency + self._token_delay() * len(self._tokens(text)))
+        return ChatResult(generations=[ChatGeneration(message=AIMessage(content=text))])
+
+    def _stream(self, messages: List[BaseMessage], stop: Optional[List[str]] = None,
+                run_manager: Any = None, **kwargs: Any) -> Iterator[ChatGenerationChunk]:
+        time.sleep(self.latency)
+        for token in self._tokens(self._answer(messages)):
+            time.sleep(self._token_delay())
+            yield ChatGenerationChunk(message=AIMessageChunk(content=token))
+
+    async def _astream(self, messages: List[BaseMessage], stop: Optional[List[str]] = None,
+                       run_manager: Any = None, **kwargs: Any) -> AsyncIterator[ChatGenerationChunk]:
+        await asyncio.sleep(self.latency)
+        for token in self._tokens(self._answer(messages)):
+            await asyncio.sleep(self._token_delay())
+            yield ChatGenerationChunk(message=AIMessageChunk(content=token))
+
+
+class HashingEmbeddings(Embeddings):
+    """
+    Local feature-hashing embeddings - network ke baghair deterministic vectors
+
+    Words aur word bigrams ko sha1 se dimensions par hash karta hai. Same
+    words wale texts ke vectors qareeb aate hain, is liye retrieval bhi
+    kuch had tak meaningful rehti hai.
+    """
+
+    def __init__(self, dimensions: int = 1536, latency: float = 0.0):
+        self.dimensions = dimensions
+        self.latency = latency
+
+    def _embed(self, text: str) -> List[float]:
+        vector = [0.0] * self.dimensions
+        words = WORD_PATTERN.findall(text.lower())
+        features = words + [f"{a} {b}" for a, b in zip(words, words[1:])]
+
+        for feature in features:
+            digest = hashlib.sha1(feature.encode()).digest()
+            index = int.from_bytes(digest[:4], "little") % self.dimensions
+            vector[index] += 1.0 if digest[4] & 1 else -1.0
+
+        norm = math.sqrt(sum(value * value for value in vector))
+        return [value / norm for value in vector] if norm else vector
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        time.sleep(self.latency)
+        return [self._embed(text) for text in texts]
+
+    def embed_query(self, text: str) -> List[float]:
+        time.sleep(self.latency)
+        return self._embed(text)
+
+    async def aembed_documents(self, texts: List[str]) -> List[List[float]]:
+        await asyncio.sleep(self.latency)
+        return [self._embed(text) for text in texts]
+
+    async def aembed_query(self, text: str) -> List[float]:
+        await asyncio.sleep(self.latency)
+        return self._embed(text)
+
+
+def get_chat_model() -> BaseChatModel:
+    """settings.LLM_PROVIDER ke hisab se chat model banata hai"""
+    if settings.LLM_PROVIDER == "openai":
+        sync_client, async_client = get_openai_clients()
+        return ChatOpenAI(
+            temperature=settings.LLM_TEMPERATURE,
+            model_name=settings.LLM_MODEL,
+            openai_api_key=settings.OPENAI_API_KEY,
+            client=sync_client.chat.completions,
+            async_client=async_client.chat.completions
+        )
+
+    if settings.LLM_PROVIDER == "fake":
+        return FakeChatModel(
+            latency=settings.FAKE_LLM_LATENCY,
+            tokens_per_second=settings.FAKE_LLM_TOKENS_PER_SECOND
+        )
+
+    raise ValueError(f"Unsupported LLM provider: {settings.LLM_PROVIDER}")
+
+
+def get_embeddings() -> Embeddings:
+    """settings.EMBEDDING_PROVIDER ke hisab se embedding model banata hai"""
+    if settings.EMBEDDING_PROVIDER == "openai":
+        sync_client, async_client = get_openai_clients()
+        return OpenAIEmbeddings(
+            model=settings.EMBEDDING_MODEL,
+            openai_api_key=settings.OPENAI_API_KEY,
+            client=sync_client.embeddings,
+            async_client=async_client.embeddings
+        )
+
+    if settings.EMBEDDING_PROVIDER == "hashing":
+        return HashingEmbeddings(
+            dimensions=settings.EMBEDDING_DIMENSIONS,
+            latency=settings.FAKE_EMBEDDING_LATENCY
+        )
+
+    raise ValueError(f"Unsupported embedding provider: {settings.EMBEDDING_PROVIDER}")
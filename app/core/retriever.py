@@ -0,0 +1,87 @@
+from langchain_core.documents import Document
+from langchain_core.retrievers import BaseRetriever
+from app.core.lexical_index import lexical_index
+from app.core.vectorestore import vector_store
+from typing import Any, Dict, List, Optional, Tuple
+import asyncio
+
+RETRIEVAL_MODES = ("vector", "lexical", "hybrid")
+
+
+def reciprocal_rank_fusion(rankings: List[List[str]], k: int = 60) -> List[Tuple[str, float]]:
+    """
+    Kai rankings ko Reciprocal Rank Fusion se combine karta hai
+    
+    Args:
+        rankings: Har retriever ki ranked ids list
+        k: RRF constant (zyada k = neeche ke ranks ka weight zyada)
+    
+    Returns:
+        [(id, fused_score), ...] high score pehle
+    """
+    scores: Dict[str, float] = {}
+    for ranking in rankings:
+        for rank, doc_id in enumerate(ranking):
+            scores[doc_id] = scores.get(doc_id, 0.0) + 1.0 / (k + rank + 1)
+    
+    return sorted(scores.items(), key=lambda item: item[1], reverse=True)
+
+
+class CompanyRetriever(BaseRetriever):
+    """
+    Company ke chunks ke liye retriever
+    
+    Modes:
+        vector  - embedding similarity (Chroma)
+        lexical - BM25 (product codes, SKUs, error strings ke liye behtar)
+        hybrid  - dono ki rankings RRF se fuse
+    """
+    
+    company_id: int
+    mode: str = "vector"
+    k: int = 4
+    candidates: int = 20  # Hybrid mein har retriever se kitne candidates
+    
+    def _get_relevant_documents(self, query: str, *, run_manager: Any = None) -> List[Document]:
+        return self.get_documents(query)
+    
+    def get_documents(self, query: str, embedding: Optional[List[float]] = None) -> List[Document]:
+        """
+        Query ke chunks - embedding di ho to vector search usi se hoti hai
+        
+        Args:
+            query: Search query
+            embedding: Isi query ki embedding (e.g. answer cache lookup wali)
+        """
+        if self.mode == "vector":
+            return [doc for doc, _ in vector_store.search(self.company_id, query, k=self.k, embedding=embedding)]
+        
+        if self.mode == "lexical":
+            ids = [doc_id for doc_id, _ in lexical_index.search(self.company_id, query, k=self.k)]
+            docs = vector_store.get_by_ids(self.company_id, ids)
+            return [docs[doc_id] for doc_id in ids if doc_id in docs]
+        
+        if self.mode == "hybrid":
+            return self._hybrid(query, embedding)
+        
+        raise ValueError(f"Unsupported retrieval mode: {self.mode}")
+    
+    async def aget_documents(self, query: str, embedding: Optional[List[float]] = None) -> List[Document]:
+        """get_documents executor thread mein - event loop block nahi hota"""
+        return await asyncio.get_running_loop().run_in_executor(None, self.get_documents, query, embedding)
+    
+    def _hybrid(self, query: str, embedding: Optional[List[float]] = None) -> List[Document]:
+        vector_results = vector_store.search_with_ids(self.company_id, query, k=self.candidates, embedding=embedding)
+        lexical_results = lexical_index.search(self.company_id, query, k=self.candidates)
+        
+        fused = reciprocal_rank_fusion([
+            [doc_id for doc_id, _, _ in vector_results],
+            [doc_id for doc_id, _ in lexical_results]
+        ])[:self.k]
+        
+        # Vector results ke documents already mil chuke hain - sirf baqi fetch karo
+        docs = {doc_id: doc for doc_id, doc, _ in vector_results}
+        missing = [doc_id for doc_id, _ in fused if doc_id not in docs]
+        docs.update(vector_store.get_by_ids(self.company_id, missing))
+        
+        return [docs[doc_id] for doc_id, _ in fused if doc_id in docs]
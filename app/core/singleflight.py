@@ -0,0 +1,81 @@
+from typing import Any, Awaitable, Callable, Dict, Hashable, Optional
+import asyncio
+
+
+class SingleFlight:
+    """
+    Same key wali concurrent calls ko ek hi in-flight computation mein coalesce karta hai
+
+    Pehli call (leader) computation ko task ki shakal mein chalati hai; baad mein
+    aane wali calls usi task ka result await karti hain. Task shielded hai - agar
+    leader ka client disconnect ho jaye to baaki waiters ka kaam nahi rukta.
+    """
+
+    def __init__(self):
+        self._inflight: Dict[Hashable, asyncio.Task] = {}
+        self._owners: Dict[Hashable, Optional[Hashable]] = {}  # Key -> kis company ki computation
+        self._counters: Dict[Hashable, Dict[str, int]] = {}
+
+    def _count(self, company_id: Hashable, name: str) -> None:
+        counters = self._counters.setdefault(company_id, {"executed": 0, "coalesced": 0})
+        counters[name] += 1
+
+    async def do(
+        self,
+        key: Hashable,
+        factory: Callable[[], Awaitable[Any]],
+        company_id: Optional[Hashable] = None
+    ) -> Any:
+        """
+        Key ki in-flight computation ka result return karta hai, na ho to shuru karta hai
+
+        Args:
+            key: Coalescing key
+            factory: Computation shuru karne wala coroutine function
+            company_id: Metrics kis company ke khaate mein jayein
+
+        Returns:
+            Computation ka result (sab waiters ko same object)
+        """
+        task = self._inflight.get(key)
+        if task is not None:
+            self._count(company_id, "coalesced")
+        else:
+            self._count(company_id, "executed")
+            task = asyncio.ensure_future(factory())
+            self._inflight[key] = task
+            self._owners[key] = company_id
+            task.add_done_callback(lambda done: self._finish(key, done))
+
+        return await asyncio.shield(task)
+
+    def _finish(self, key: Hashable, task: asyncio.Task) -> None:
+        if self._inflight.get(key) is task:
+            del self._inflight[key]
+            self._owners.pop(key, None)
+        # Sab waiters cancel ho gaye hon to bhi exception "retrieved" mark ho
+        if not task.cancelled():
+            task.exception()
+
+    def stats(self, company_id: Optional[Hashable] = None) -> dict:
+        """
+        Executed/coalesced counters return karta hai
+
+        Args:
+            company_id: Di ho to sirf us company ke counters aur in-flight, warna total
+        """
+        if company_id is not None:
+            counters = dict(self._counters.get(company_id, {"executed": 0, "coalesced": 0}))
+        else:
+            counters = {"executed": 0, "coalesced": 0}
+            for company_counters in self._counters.values():
+                counters["executed"] += company_counters["executed"]
+                counters["coalesced"] += company_counters["coalesced"]
+
+        total = counters["executed"] + counters["coalesced"]
+        counters["coalesced_ratio"] = round(counters["coalesced"] / total, 4) if total else 0.0
+        if company_id is not None:
+            counters["in_flight"] = sum(1 for owner in self._owners.values() if owner == company_id)
+        else:
+            counters["in_flight"] = len(self._inflight)
+        return counters
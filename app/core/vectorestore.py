@@ -1,50 +1,986 @@
+from abc import ABC, abstractmethod
 from langchain_community.vectorstores import Chroma
-from langchain_openai import OpenAIEmbeddings
+from langchain_core.documents import Document
+from app.core.cache import LRUCache
+from app.core.embedding_cache import with_embedding_cache
+from app.core.flat_index import QUANTIZATION_DTYPES, FlatIndex, read_state_counts
+from app.core.llm import get_embeddings
 from app.config import settings
+from app.utils.logger import get_logger
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from contextlib import contextmanager
+from threading import Event, Lock, Thread
+from typing import Callable, Dict, Iterator, List, Optional, Tuple
+import json
+import os
+import re
+import tempfile
+import time
+import uuid
 import chromadb
 from chromadb.config import Settings as ChromaSettings
 
+logger = get_logger("vectorstore")
+
+# HNSW graph links per vector (M=16, do layers ka andaza, int32 labels)
+HNSW_LINK_BYTES = 16 * 2 * 4
+
+VECTOR_BACKENDS = ("chroma", "flat")
+
+
+def _flush_segment(instance) -> bool:
+    """
+    Persistent HNSW segment ka pending batch index mein laga kar disk par likhta hai
+    
+    Chromadb chhote writes brute-force batch mein rakhta hai; sirf _persist()
+    unhein chhor kar max_seq_id aage kar deta, is liye pehle batch apply.
+    Metadata segment ke paas yeh methods nahi - woh sqlite mein hai.
+    
+    Returns:
+        False agar instance mein chromadb 0.4.18 wale HNSW internals nahi
+    """
+    apply_batch = getattr(instance, "_apply_batch", None)
+    persist = getattr(instance, "_persist", None)
+    batch = getattr(instance, "_curr_batch", None)
+    if not callable(apply_batch) or not callable(persist) or batch is None:
+        return False
+    
+    if len(batch):
+        apply_batch(batch)
+        instance._curr_batch = type(batch)()
+    if getattr(instance, "_index", None) is not None:
+        persist()
+    return True
+
+
+class TenantCollection(ABC):
+    """
+    Ek company ka loaded handle aur uski memory accounting
+    
+    Backends (ChromaTenant, FlatTenant) add/query/get/delete/warm/release
+    implement karte hain; manager sirf isi interface se baat karta hai.
+    
+    Istemal karne wale checkout()/checkin() karte hain. LRU se evict hua
+    tenant (retire) tab tak release nahi hota jab tak aakhri user checkin na
+    kar de; us se pehle dobara maanga jaye to revive() wahi handle wapas deta hai.
+    """
+    
+    index_type = "unknown"
+    
+    def __init__(self, company_id: int, vectors: int):
+        self.company_id = company_id
+        self.vectors = vectors
+        self.last_access = time.monotonic()
+        self.closed = Event()  # release() mukammal - naya handle khul sakta hai
+        self._users = 0
+        self._retired = False
+        self._releasing = False
+        self._state_lock = Lock()
+    
+    def checkout(self) -> bool:
+        """Istemal shuru - False agar tenant release ho raha hai (dobara load karo)"""
+        with self._state_lock:
+            if self._releasing:
+                return False
+            self._users += 1
+            return True
+    
+    def checkin(self) -> bool:
+        """Istemal khatam - True agar ab release karna hai (evicted aur aakhri user)"""
+        with self._state_lock:
+            self._users -= 1
+            if self._retired and not self._users and not self._releasing:
+                self._releasing = True
+                return True
+            return False
+    
+    def retire(self) -> bool:
+        """LRU se nikla - True agar koi user nahi aur abhi release karna hai"""
+        with self._state_lock:
+            self._retired = True
+            if self._users or self._releasing:
+                return False
+            self._releasing = True
+            return True
+    
+    def revive(self) -> bool:
+        """Retired magar abhi tak release na hua tenant dobara LRU mein - False agar release shuru ho chuka"""
+        with self._state_lock:
+            if self._releasing:
+                return False
+            self._retired = False
+            return True
+    
+    @abstractmethod
+    def estimated_bytes(self, dimensions: int) -> int:
+        """Tenant ki andazan resident memory (bytes)"""
+    
+    @abstractmethod
+    def add(self, ids: List[str], embeddings: List[List[float]], texts: List[str], metadatas: List[dict]) -> None:
+        """Naye vectors texts aur metadata ke sath store karta hai"""
+    
+    @abstractmethod
+    def query(self, embedding: List[float], k: int) -> list:
+        """[(vector_id, Document, distance), ...] qareeb pehle"""
+    
+    @abstractmethod
+    def get(self, ids: List[str]) -> Dict[str, Document]:
+        """Ids ke documents - jo na milein woh shamil nahi"""
+    
+    @abstractmethod
+    def delete(self, ids: List[str]) -> None:
+        """Vectors index se nikalta hai"""
+    
+    @abstractmethod
+    def update_metadata(self, ids: List[str], metadatas: List[dict]) -> None:
+        """Vectors dobara embed kiye baghair metadata badalta hai"""
+    
+    @abstractmethod
+    def warm(self) -> None:
+        """Index memory mein load karta hai"""
+    
+    def dead_rows(self) -> int:
+        """Deleted vectors jo abhi bhi storage mein jagah le rahe hain"""
+        return 0
+    
+    def compact(self, dead_ratio: float) -> int:
+        """Deleted rows storage se nikalta hai (dead_ratio se zyada hon to) - nikli rows return"""
+        return 0
+    
+    @abstractmethod
+    def release(self) -> None:
+        """Eviction par memory free karta hai - data disk par rehta hai"""
+
+
+class ChromaTenant(TenantCollection):
+    """Chroma collection (HNSW) wala tenant"""
+    
+    index_type = "hnsw"
+    
+    def __init__(self, company_id: int, store: Chroma, client, persistent: bool):
+        self.store = store  # LangChain wrapper
+        self.collection = store._collection  # Raw chromadb collection
+        self.client = client
+        self.persistent = persistent
+        super().__init__(company_id, int(self.collection.count()))
+    
+    def estimated_bytes(self, dimensions: int) -> int:
+        """Vectors + HNSW links ka andazan resident size"""
+        return self.vectors * (dimensions * 4 + HNSW_LINK_BYTES)
+    
+    def add(self, ids, embeddings, texts, metadatas) -> None:
+        self.collection.add(
+            ids=ids,
+            embeddings=embeddings,
+            documents=texts,
+            # Chroma khali metadata dict qabool nahi karta
+            metadatas=[metadata or None for metadata in metadatas]
+        )
+        self.vectors += len(ids)
+    
+    def query(self, embedding, k) -> list:
+        result = self.collection.query(
+            query_embeddings=[embedding],
+            n_results=k,
+            include=["documents", "metadatas", "distances"]
+        )
+        
+        return [
+            (doc_id, Document(page_content=text, metadata=metadata or {}), distance)
+            for doc_id, text, metadata, distance in zip(
+                result["ids"][0],
+                result["documents"][0],
+                result["metadatas"][0],
+                result["distances"][0]
+            )
+        ]
+    
+    def get(self, ids) -> Dict[str, Document]:
+        result = self.collection.get(ids=ids, include=["documents", "metadatas"])
+        
+        return {
+            doc_id: Document(page_content=text, metadata=metadata or {})
+            for doc_id, text, metadata in zip(result["ids"], result["documents"], result["metadatas"])
+        }
+    
+    def delete(self, ids) -> None:
+        self.collection.delete(ids=ids)
+        self.vectors = int(self.collection.count())
+    
+    def update_metadata(self, ids, metadatas) -> None:
+        self.collection.update(ids=ids, metadatas=[metadata or None for metadata in metadatas])
+    
+    def warm(self) -> None:
+        # Embeddings maangne se vector segment (HNSW) load hota hai
+        self.collection.get(limit=1, include=["embeddings"])
+    
+    def release(self) -> None:
+        """
+        Chromadb segments memory se nikalta hai
+        
+        Sirf persistent client par - ephemeral client mein segments hi data hain.
+        
+        Chromadb 0.4.18 mein segment cache ki eviction policy ki public setting
+        nahi hai, is liye local segment manager ki cache se segment nikalte
+        hain. Har attribute guarded hai: chromadb ka layout badle to warning
+        log hoti hai aur segments chroma ke paas rehte hain. Isi liye chromadb
+        requirements.txt mein pinned hai aur test_release_frees_chroma_segments
+        asal release check karta hai.
+        HNSW segment stop se pehle flush hota hai taake dobara load par
+        write-ahead log replay na karna pade.
+        """
+        if not self.persistent:
+            return
+        
+        manager = getattr(getattr(self.client, "_server", None), "_manager", None)
+        lock = getattr(manager, "_lock", None)
+        segment_cache = getattr(manager, "_segment_cache", None)
+        instances = getattr(manager, "_instances", None)
+        if lock is None or not isinstance(segment_cache, dict) or not isinstance(instances, dict):
+            logger.warning("Chromadb segment manager not recognised; company %s segments stay loaded", self.company_id)
+            return
+        
+        with lock:
+            segments = segment_cache.pop(self.collection.id, {})
+            for segment in segments.values():
+                instance = instances.pop(segment["id"], None)
+                if instance is None:
+                    continue
+                if not _flush_segment(instance) and str(segment.get("type", "")).startswith("urn:chroma:segment/vector"):
+                    logger.warning("Chromadb vector segment not recognised; company %s pending writes not flushed", self.company_id)
+                instance.stop()
+            
+            handles = getattr(getattr(manager, "_vector_instances_file_handle_cache", None), "cache", None)
+            handle = handles.pop(self.collection.id, None) if isinstance(handles, dict) else None
+            if handle is not None:
+                handle.close_persistent_index()
+
+
+class FlatTenant(TenantCollection):
+    """
+    NumPy flat index wala tenant - exact search, koi network/HNSW overhead nahi
+    
+    Chhote aur darmiyane tenants (kuch hazaar chunks) ke liye ek dot product
+    Chroma query se tez hai.
+    """
+    
+    def __init__(self, company_id: int, index: FlatIndex):
+        self.index = index
+        super().__init__(company_id, len(index))
+    
+    @property
+    def index_type(self) -> str:
+        """Threshold se upar IVF (approximate), warna exact flat scan"""
+        return "ivf" if self.index.ivf is not None else "flat"
+    
+    def estimated_bytes(self, dimensions: int) -> int:
+        """Quantized matrix ka size (tombstoned rows bhi memory mein hain)"""
+        return self.index.nbytes()
+    
+    def add(self, ids, embeddings, texts, metadatas) -> None:
+        self.index.add(ids, embeddings, texts, metadatas)
+        self.vectors = len(self.index)
+    
+    def query(self, embedding, k) -> list:
+        return self.index.search(embedding, k)
+    
+    def get(self, ids) -> Dict[str, Document]:
+        return self.index.get(ids)
+    
+    def delete(self, ids) -> None:
+        self.index.delete(ids)
+        self.vectors = len(self.index)
+    
+    def update_metadata(self, ids, metadatas) -> None:
+        self.index.update_metadata(ids, metadatas)
+    
+    def warm(self) -> None:
+        self.index.warm()
+    
+    def dead_rows(self) -> int:
+        return self.index.dead_rows()
+    
+    def compact(self, dead_ratio: float) -> int:
+        if self.index.dead_rows() <= dead_ratio * max(self.index.count, 1):
+            return 0
+        return self.index.compact()
+    
+    def release(self) -> None:
+        self.index.close()
+
 
 class VectorStoreManager:
-    """Vector store ko manage karne ke liye"""
+    """
+    Vector store ko manage karne ke liye
+    
+    Company collections ke handles LRU mein rehte hain. Idle ya memory budget
+    se upar wale tenants evict hote hain - data disk par rehta hai, sirf
+    memory free hoti hai.
+    
+    Backend settings.VECTOR_BACKEND se: "chroma" (HNSW) ya "flat" (NumPy
+    exact search, app/core/flat_index.py).
+    
+    Persistent mode mein on-disk layout:
+        CHROMA_PERSIST_DIRECTORY/
+            chroma/        chromadb sqlite + har collection ka HNSW segment folder
+            flat/          flat backend - company_{id}/ mein vectors.npy, rows.jsonl, state.json
+            tenants.json   tenant access counts - startup warm-up ka order
+            tombstones/    company_{id}.log - deleted vector ids jo abhi compact nahi hue
+    
+    Delete pehle sirf company ke tombstone set mein jata hai (retrieval results
+    se filter hote hain); compaction thread unhein batches mein index se
+    nikalta hai. Har tenant ka tombstone log alag hai aur sirf append hota hai -
+    ek delete doosri companies ke tombstones nahi likhta.
+    """
     
     def __init__(self):
-        # ChromaDB client
-        self.client = chromadb.Client(
-            ChromaSettings(
-                persist_directory=settings.CHROMA_PERSIST_DIRECTORY,
-                anonymized_telemetry=False
-            )
+        self.directory = settings.CHROMA_PERSIST_DIRECTORY
+        self.persistent = settings.VECTOR_STORE_PERSISTENT
+        
+        self.backend = settings.VECTOR_BACKEND
+        if self.backend not in VECTOR_BACKENDS:
+            raise ValueError(f"Unknown vector backend: {self.backend}")
+        if settings.VECTOR_QUANTIZATION not in QUANTIZATION_DTYPES:
+            raise ValueError(f"Unknown vector quantization: {settings.VECTOR_QUANTIZATION}")
+        
+        # ChromaDB client (sirf chroma backend)
+        self.client = self._create_client() if self.backend == "chroma" else None
+        
+        # Flat backend non-persistent mode mein bhi files likhta hai - temp directory mein
+        self.flat_directory = (
+            os.path.join(self.directory, "flat") if self.persistent
+            else tempfile.mkdtemp(prefix="flat_index_")
         )
         
-        # OpenAI embeddings
-        self.embeddings = OpenAIEmbeddings(
-            openai_api_key=settings.OPENAI_API_KEY
+        # Embeddings - provider settings.EMBEDDING_PROVIDER se, content-hash cache ke peeche
+        self.embeddings = with_embedding_cache(get_embeddings())
+        
+        # Loaded tenant handles
+        self.collections = LRUCache(
+            max_size=settings.VECTOR_MAX_LOADED_TENANTS,
+            on_evict=self._release
         )
+        # Har khula (release na hua) handle - evicted magar istemal mein bhi.
+        # Ek company ka ek hi handle khulta hai; doosra FlatIndex usi directory par nahi
+        self._handles: Dict[int, TenantCollection] = {}
+        self._handles_lock = Lock()
+        self.idle_seconds = settings.VECTOR_IDLE_SECONDS
+        self.memory_budget = settings.VECTOR_MEMORY_BUDGET_BYTES
+        self.dimensions = settings.EMBEDDING_DIMENSIONS
+        
+        # Ingestion embedding batches
+        self.embedding_batch_size = settings.EMBEDDING_BATCH_SIZE
+        self.embedding_concurrency = settings.EMBEDDING_CONCURRENCY
+        self.embedding_max_retries = settings.EMBEDDING_MAX_RETRIES
+        self.embedding_retry_backoff = settings.EMBEDDING_RETRY_BACKOFF_SECONDS
+        
+        self.idle_evictions = 0
+        self.memory_evictions = 0
+        self._last_sweep = time.monotonic()
+        self._sweep_lock = Lock()
+        
+        # Warm-up aur readiness
+        self.access_counts: Dict[int, int] = self._load_tenant_stats()
+        self.ready = Event()
+        self.warmed_tenants = 0
+        self.warmup_seconds: Optional[float] = None
+        if not self.persistent:
+            self.ready.set()
+        
+        # Deletes - tombstones aur background compaction
+        self.tombstones: Dict[int, set] = self._load_tombstones()
+        self.tombstone_overfetch = settings.VECTOR_TOMBSTONE_OVERFETCH
+        self.compaction_batch_size = settings.VECTOR_COMPACTION_BATCH_SIZE
+        self.compaction_dead_ratio = settings.VECTOR_COMPACTION_DEAD_RATIO
+        self.compacted_vectors = 0
+        self._tombstone_lock = Lock()  # Sirf self.tombstones dict ke liye
+        self._tombstone_company_locks: Dict[int, Lock] = {}  # Company ka log + set ek sath
+        self._compaction_lock = Lock()
+        self._stop_compaction = Event()
     
-    def get_collection(self, company_id: int):
-        """Company-specific collection get karta hai"""
-        collection_name = f"company_{company_id}"
+    def _create_client(self):
+        """Persistent mode mein disk-backed client, warna in-memory (dev/tests)"""
+        chroma_settings = ChromaSettings(anonymized_telemetry=False)
+        if not self.persistent:
+            return chromadb.Client(chroma_settings)
+        
+        return chromadb.PersistentClient(
+            path=os.path.join(self.directory, "chroma"),
+            settings=chroma_settings
+        )
+    
+    def _tenant_stats_path(self) -> str:
+        return os.path.join(self.directory, "tenants.json")
+    
+    def _load_tenant_stats(self) -> Dict[int, int]:
+        if not self.persistent or not os.path.exists(self._tenant_stats_path()):
+            return {}
+        
+        try:
+            with open(self._tenant_stats_path(), encoding="utf-8") as f:
+                return {int(company_id): count for company_id, count in json.load(f).items()}
+        except (OSError, ValueError):
+            logger.warning("Ignoring unreadable tenant stats at %s", self._tenant_stats_path())
+            return {}
+    
+    def save_tenant_stats(self) -> None:
+        """Tenant access counts atomic write se disk par save karta hai"""
+        if not self.persistent:
+            return
+        
+        path = self._tenant_stats_path()
+        tmp_path = f"{path}.tmp"
+        os.makedirs(self.directory, exist_ok=True)
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(dict(self.access_counts), f)
+        os.replace(tmp_path, path)
+    
+    def _tombstones_directory(self) -> str:
+        return os.path.join(self.directory, "tombstones")
+    
+    def _tombstones_path(self, company_id: int) -> str:
+        return os.path.join(self._tombstones_directory(), f"company_{company_id}.log")
+    
+    def _tombstone_company_lock(self, company_id: int) -> Lock:
+        with self._tombstone_lock:
+            return self._tombstone_company_locks.setdefault(company_id, Lock())
+    
+    def _load_tombstones(self) -> Dict[int, set]:
+        """Har tenant ka log replay karta hai - purani tombstones.json bhi logs mein badalti hai"""
+        if not self.persistent:
+            return {}
+        
+        tombstones: Dict[int, set] = {}
+        directory = self._tombstones_directory()
+        if os.path.isdir(directory):
+            for name in os.listdir(directory):
+                match = re.fullmatch(r"company_(\d+)\.log", name)
+                if not match:
+                    continue
+                ids = set()
+                with open(os.path.join(directory, name), encoding="utf-8") as f:
+                    for line in f:
+                        try:
+                            entry = json.loads(line)
+                        except ValueError:
+                            # Crash mein adhoori likhi aakhri line
+                            continue
+                        ids.update(entry.get("add", ()))
+                        ids.difference_update(entry.get("remove", ()))
+                if ids:
+                    tombstones[int(match.group(1))] = ids
+        
+        legacy = os.path.join(self.directory, "tombstones.json")
+        if os.path.exists(legacy):
+            with open(legacy, encoding="utf-8") as f:
+                for company_id, ids in json.load(f).items():
+                    tombstones.setdefault(int(company_id), set()).update(ids)
+                    self._append_tombstones(int(company_id), {"add": sorted(ids)})
+            os.remove(legacy)
+        
+        return tombstones
+    
+    def _append_tombstones(self, company_id: int, entry: dict) -> None:
+        """Company ke tombstone log mein ek entry - delete restart ke baad bhi filter rehte hain"""
+        if not self.persistent:
+            return
+        
+        os.makedirs(self._tombstones_directory(), exist_ok=True)
+        with open(self._tombstones_path(company_id), "a", encoding="utf-8") as f:
+            f.write(json.dumps(entry, separators=(",", ":")) + "\n")
+            f.flush()
+            os.fsync(f.fileno())
+    
+    def _flat_path(self, company_id: int) -> str:
+        return os.path.join(self.flat_directory, f"company_{company_id}")
+    
+    def _existing_tenants(self) -> set:
+        """Disk par maujood company collections ke naam"""
+        if self.backend == "flat":
+            if not os.path.isdir(self.flat_directory):
+                return set()
+            return set(os.listdir(self.flat_directory))
+        return {collection.name for collection in self.client.list_collections()}
+    
+    def hottest_tenants(self, limit: int) -> List[int]:
+        """Sab se zyada access hone wali companies jin ki collection disk par hai"""
+        existing = self._existing_tenants()
+        ranked = sorted(self.access_counts.items(), key=lambda item: item[1], reverse=True)
+        return [
+            company_id for company_id, _ in ranked
+            if f"company_{company_id}" in existing
+        ][:limit]
+    
+    def warm_up(self, limit: Optional[int] = None) -> int:
+        """
+        Hottest tenants ke collections aur HNSW indexes memory mein load karta hai
+        
+        Memory budget bhar jaye to ruk jata hai. Khatam hone par (error par bhi)
+        ready set hota hai.
+        
+        Returns:
+            Kitne tenants warm hue
+        """
+        start = time.perf_counter()
+        try:
+            for company_id in self.hottest_tenants(limit or settings.VECTOR_WARMUP_TENANTS):
+                with self._checkout(company_id, count_access=False) as tenant:
+                    tenant.warm()
+                self.warmed_tenants += 1
+                
+                if self.stats()["estimated_bytes"] >= self.memory_budget:
+                    break
+        except Exception:
+            logger.exception("Vector store warm-up failed")
+        finally:
+            self.warmup_seconds = round(time.perf_counter() - start, 3)
+            self.ready.set()
+            logger.info(
+                "Vector store warm-up finished: %s tenants in %ss",
+                self.warmed_tenants,
+                self.warmup_seconds
+            )
+        
+        return self.warmed_tenants
+    
+    def start_warmup(self) -> None:
+        """Warm-up background thread mein - startup block nahi hota"""
+        if self.ready.is_set():
+            return
+        Thread(target=self.warm_up, name="vector-store-warmup", daemon=True).start()
+    
+    def _load(self, company_id: int) -> TenantCollection:
+        """
+        Company ka handle kholta hai
+        
+        Evicted handle abhi istemal mein ho to wahi revive hota hai; release
+        ho raha ho to pehle uske band hone ka intezar.
+        """
+        with self._handles_lock:
+            tenant = self._handles.get(company_id)
+        if tenant is not None:
+            if tenant.revive():
+                return tenant
+            tenant.closed.wait()
+        
+        tenant = self._open(company_id)
+        with self._handles_lock:
+            self._handles[company_id] = tenant
+        return tenant
+    
+    def _open(self, company_id: int) -> TenantCollection:
+        if self.backend == "flat":
+            return FlatTenant(company_id, FlatIndex(
+                self._flat_path(company_id),
+                ann_threshold=settings.VECTOR_ANN_THRESHOLD,
+                nprobe=settings.VECTOR_IVF_NPROBE,
+                lists=settings.VECTOR_IVF_LISTS or None,
+                quantization=settings.VECTOR_QUANTIZATION,
+                rerank_factor=settings.VECTOR_RERANK_FACTOR
+            ))
         
         vectorstore = Chroma(
             client=self.client,
-            collection_name=collection_name,
+            collection_name=f"company_{company_id}",
             embedding_function=self.embeddings
         )
         
-        return vectorstore
+        return ChromaTenant(company_id, vectorstore, self.client, self.persistent)
+    
+    def _tenant(self, company_id: int, count_access: bool = True) -> TenantCollection:
+        """Company ka handle LRU se return karta hai, na ho to load karta hai"""
+        self._maintain()
+        if count_access:
+            self.access_counts[company_id] = self.access_counts.get(company_id, 0) + 1
+        tenant = self.collections.get_or_create(company_id, lambda: self._load(company_id))
+        tenant.last_access = time.monotonic()
+        self._enforce_memory_budget(keep=company_id)
+        return tenant
+    
+    @contextmanager
+    def _checkout(self, company_id: int, count_access: bool = True) -> Iterator[TenantCollection]:
+        """
+        Tenant ka handle istemal ke dauran - beech mein evict ho to release checkin par hota hai
+        """
+        while True:
+            tenant = self._tenant(company_id, count_access)
+            if tenant.checkout():
+                break
+            # Lookup aur checkout ke beech evict hokar release shuru - dobara load
+            count_access = False
+        
+        try:
+            yield tenant
+        finally:
+            if tenant.checkin():
+                self._close(tenant)
+    
+    def _release(self, company_id: int, tenant: TenantCollection) -> None:
+        """Evicted tenant - koi istemal na kar raha ho to foran, warna aakhri checkin par release"""
+        if tenant.retire():
+            self._close(tenant)
+    
+    def _close(self, tenant: TenantCollection) -> None:
+        """Tenant ki index memory free karta hai"""
+        try:
+            tenant.release()
+            logger.info("Released vector segments for company %s (%s vectors)", tenant.company_id, tenant.vectors)
+        finally:
+            with self._handles_lock:
+                if self._handles.get(tenant.company_id) is tenant:
+                    del self._handles[tenant.company_id]
+            tenant.closed.set()
+    
+    def _maintain(self) -> None:
+        """
+        Idle tenants evict karta hai aur tenant stats save karta hai
+        
+        Zyada se zyada har idle_seconds/4 mein ek dafa chalta hai.
+        """
+        now = time.monotonic()
+        if now - self._last_sweep < self.idle_seconds / 4:
+            return
+        if not self._sweep_lock.acquire(blocking=False):
+            return
+        try:
+            self._last_sweep = now
+            for company_id, tenant in self.collections.items():
+                if now - tenant.last_access > self.idle_seconds and self.collections.evict(company_id):
+                    self.idle_evictions += 1
+            self.save_tenant_stats()
+        except OSError:
+            logger.exception("Could not save tenant stats")
+        finally:
+            self._sweep_lock.release()
+    
+    def _enforce_memory_budget(self, keep: Optional[int] = None) -> None:
+        """Total estimated memory budget se upar ho to least-recent tenants evict karta hai"""
+        entries = self.collections.items()
+        total = sum(tenant.estimated_bytes(self.dimensions) for _, tenant in entries)
+        for company_id, tenant in entries:
+            if total <= self.memory_budget:
+                break
+            if company_id == keep:
+                continue
+            if self.collections.evict(company_id):
+                self.memory_evictions += 1
+                total -= tenant.estimated_bytes(self.dimensions)
+    
+    def get_collection(self, company_id: int):
+        """Company-specific LangChain Chroma collection get karta hai (sirf chroma backend)"""
+        if self.backend != "chroma":
+            raise ValueError(f"get_collection is not available for the {self.backend} backend")
+        return self._tenant(company_id).store
     
-    def add_documents(self, company_id: int, texts: list, metadatas: list):
-        """Documents ko vector store mein add karta hai"""
-        vectorstore = self.get_collection(company_id)
-        ids = vectorstore.add_texts(texts=texts, metadatas=metadatas)
+    def _embed_with_retry(self, texts: List[str]) -> List[List[float]]:
+        """Ek batch embed karta hai - fail ho to exponential backoff ke sath retry"""
+        for attempt in range(self.embedding_max_retries + 1):
+            try:
+                return self.embeddings.embed_documents(texts)
+            except Exception:
+                if attempt == self.embedding_max_retries:
+                    raise
+                delay = self.embedding_retry_backoff * 2 ** attempt
+                logger.warning(
+                    "Embedding batch of %s chunks failed (attempt %s), retrying in %ss",
+                    len(texts), attempt + 1, delay
+                )
+                time.sleep(delay)
+    
+    def embed_batch(self, texts: List[str]) -> List[List[float]]:
+        """Chunks ka ek batch embed karta hai (retries ke sath) - pipelines ke embed stage ke liye"""
+        return self._embed_with_retry(texts)
+    
+    def write_embeddings(
+        self,
+        company_id: int,
+        ids: List[str],
+        embeddings: List[List[float]],
+        texts: List[str],
+        metadatas: List[dict]
+    ) -> None:
+        """Pehle se embed hue chunks company ke collection mein likhta hai"""
+        with self._checkout(company_id) as tenant:
+            tenant.add(ids, embeddings, texts, metadatas)
+        self._enforce_memory_budget(keep=company_id)
+    
+    def add_documents(
+        self,
+        company_id: int,
+        texts: list,
+        metadatas: list,
+        progress: Optional[Callable[[int, int], None]] = None
+    ) -> List[str]:
+        """
+        Documents ko vector store mein add karta hai
+        
+        Chunks embedding_batch_size ke batches mein embed hote hain, zyada se
+        zyada embedding_concurrency batches ek waqt mein. Naya batch tabhi
+        shuru hota hai jab pichla likha ja chuka ho (backpressure), is liye
+        memory mein sirf chand batches ke vectors hote hain. Har batch embed
+        hote hi collection mein likha jata hai.
+        
+        Koi batch retries ke baad bhi fail ho to likhe gaye vectors wapas
+        nikal diye jate hain taake adha document retrieve na ho. Embeddings
+        cache mein reh jati hain, is liye dobara upload par woh kaam dobara
+        nahi hota.
+        
+        Args:
+            company_id: Company ID
+            texts: Chunk texts
+            metadatas: Har chunk ka metadata
+            progress: progress(done_chunks, total_chunks) har batch ke baad
+        
+        Returns:
+            Chunks ke vector ids (texts ke order mein)
+        """
+        ids = [str(uuid.uuid4()) for _ in texts]
+        batches = iter([
+            (start, min(start + self.embedding_batch_size, len(texts)))
+            for start in range(0, len(texts), self.embedding_batch_size)
+        ])
+        written: List[str] = []
+        
+        with self._checkout(company_id) as tenant:
+            try:
+                with ThreadPoolExecutor(max_workers=self.embedding_concurrency) as pool:
+                    pending = {}
+                    
+                    def submit_next() -> None:
+                        batch = next(batches, None)
+                        if batch is not None:
+                            start, end = batch
+                            pending[pool.submit(self._embed_with_retry, texts[start:end])] = batch
+                    
+                    for _ in range(self.embedding_concurrency):
+                        submit_next()
+                    
+                    while pending:
+                        finished, _ = wait(pending, return_when=FIRST_COMPLETED)
+                        for future in finished:
+                            start, end = pending.pop(future)
+                            tenant.add(ids[start:end], future.result(), texts[start:end], metadatas[start:end])
+                            written.extend(ids[start:end])
+                            
+                            if progress:
+                                progress(len(written), len(texts))
+                            submit_next()
+            except Exception:
+                if written:
+                    tenant.delete(written)
+                raise
+        
+        self._enforce_memory_budget(keep=company_id)
         return ids
     
-    def search(self, company_id: int, query: str, k: int = 4):
-        """Relevant documents search karta hai"""
-        vectorstore = self.get_collection(company_id)
-        results = vectorstore.similarity_search_with_score(query, k=k)
-        return results
+    def search(self, company_id: int, query: str, k: int = 4, embedding: Optional[List[float]] = None):
+        """
+        Relevant documents search karta hai
+        
+        Returns:
+            [(Document, distance), ...]
+        """
+        return [
+            (doc, distance)
+            for _, doc, distance in self.search_with_ids(company_id, query, k=k, embedding=embedding)
+        ]
+    
+    def search_with_ids(
+        self,
+        company_id: int,
+        query: str,
+        k: int = 4,
+        embedding: Optional[List[float]] = None
+    ) -> list:
+        """
+        Relevant documents unke vector ids ke sath search karta hai
+        
+        Tombstoned ids filter hoti hain - un ki jagah bharne ke liye itne hi
+        zyada results maange jate hain (tombstone_overfetch tak).
+        
+        Args:
+            company_id: Company ID
+            query: Search query
+            k: Kitne results
+            embedding: Query ki embedding pehle se ho (answer cache lookup) to dobara nahi banti
+        
+        Returns:
+            [(vector_id, Document, distance), ...]
+        """
+        if embedding is None:
+            embedding = self.embeddings.embed_query(query)
+        dead = self.tombstones.get(company_id)
+        with self._checkout(company_id) as tenant:
+            if not dead:
+                return tenant.query(embedding, k)
+            results = tenant.query(embedding, k + min(len(dead), self.tombstone_overfetch))
+        
+        return [result for result in results if result[0] not in dead][:k]
+    
+    def get_by_ids(self, company_id: int, ids: list) -> dict:
+        """
+        Vector ids se documents return karta hai
+        
+        Returns:
+            {vector_id: Document} - jo ids na milein woh shamil nahi
+        """
+        dead = self.tombstones.get(company_id, ())
+        ids = [doc_id for doc_id in ids if doc_id not in dead]
+        if not ids:
+            return {}
+        
+        with self._checkout(company_id) as tenant:
+            return tenant.get(ids)
+    
+    def update_metadata(self, company_id: int, ids: list, metadatas: list) -> None:
+        """
+        Existing vectors ka metadata badalta hai (e.g. re-upload par chunk_index)
+        """
+        if not ids:
+            return
+        
+        with self._checkout(company_id) as tenant:
+            tenant.update_metadata(ids, metadatas)
+    
+    def delete_documents(self, company_id: int, ids: list) -> None:
+        """
+        Vector ids ko tombstone karta hai - retrieval se foran bahar
+        
+        Index se asal mein compact() nikalta hai.
+        """
+        if not ids:
+            return
+        
+        with self._tombstone_company_lock(company_id):
+            self._append_tombstones(company_id, {"add": sorted(ids)})
+            with self._tombstone_lock:
+                self.tombstones.setdefault(company_id, set()).update(ids)
+    
+    def compact(self) -> int:
+        """
+        Tombstoned vectors compaction_batch_size ke batches mein index se nikalta hai
+        
+        Flat backend par deleted rows compaction_dead_ratio se zyada hon to
+        files bhi dobara likhi jati hain.
+        
+        Returns:
+            Kitne vectors nikle
+        """
+        if not self._compaction_lock.acquire(blocking=False):
+            return 0
+        
+        removed = 0
+        try:
+            with self._tombstone_lock:
+                companies = list(self.tombstones)
+            for company_id in companies:
+                while True:
+                    with self._tombstone_lock:
+                        batch = sorted(self.tombstones.get(company_id, ()))[:self.compaction_batch_size]
+                    if not batch:
+                        break
+                    
+                    with self._checkout(company_id, count_access=False) as tenant:
+                        tenant.delete(batch)
+                    
+                    with self._tombstone_company_lock(company_id):
+                        with self._tombstone_lock:
+                            remaining = self.tombstones[company_id]
+                            remaining.difference_update(batch)
+                            if not remaining:
+                                del self.tombstones[company_id]
+                        if remaining:
+                            self._append_tombstones(company_id, {"remove": batch})
+                        elif os.path.exists(self._tombstones_path(company_id)):
+                            # Sab compact - log ki zaroorat nahi
+                            os.remove(self._tombstones_path(company_id))
+                    removed += len(batch)
+                
+                with self._checkout(company_id, count_access=False) as tenant:
+                    tenant.compact(self.compaction_dead_ratio)
+        finally:
+            self._compaction_lock.release()
+        
+        if removed:
+            self.compacted_vectors += removed
+            logger.info("Compaction removed %s deleted vectors", removed)
+        return removed
+    
+    def _compaction_loop(self) -> None:
+        while not self._stop_compaction.wait(settings.VECTOR_COMPACTION_INTERVAL_SECONDS):
+            try:
+                self.compact()
+            except Exception:
+                logger.exception("Vector store compaction failed")
+    
+    def start_compaction(self) -> None:
+        """Har VECTOR_COMPACTION_INTERVAL_SECONDS mein compaction - background thread"""
+        Thread(target=self._compaction_loop, name="vector-store-compaction", daemon=True).start()
+    
+    def stop_compaction(self) -> None:
+        self._stop_compaction.set()
+
+    def _persisted_counts(self, company_id: int) -> Tuple[int, int]:
+        """
+        Unloaded tenant ke (vectors, dead rows) disk se - tenant load nahi hota
+        
+        Flat backend state.json parhta hai; Chroma count sirf sqlite metadata
+        se aata hai, HNSW segment memory mein nahi aata.
+        """
+        if self.backend == "flat":
+            return read_state_counts(self._flat_path(company_id))
+        
+        try:
+            collection = self.client.get_collection(f"company_{company_id}", embedding_function=None)
+        except ValueError:
+            return 0, 0
+        return int(collection.count()), 0
+    
+    def stats(self, company_id: Optional[int] = None) -> dict:
+        """
+        Loaded tenants, memory accounting aur eviction counters
+        
+        Args:
+            company_id: Di ho to us company ka apna hissa bhi
+        """
+        entries = self.collections.items()
+        cache_stats = self.collections.stats()
+        # compact() keys delete karta hai - lock ke andar snapshot
+        with self._tombstone_lock:
+            tombstone_counts = {tenant_id: len(ids) for tenant_id, ids in self.tombstones.items()}
+        stats = {
+            "backend": self.backend,
+            "loaded_tenants": len(entries),
+            "max_loaded_tenants": self.collections.max_size,
+            "estimated_bytes": sum(tenant.estimated_bytes(self.dimensions) for _, tenant in entries),
+            "memory_budget_bytes": self.memory_budget,
+            "hits": cache_stats["hits"],
+            "misses": cache_stats["misses"],
+            "evictions": cache_stats["evictions"],
+            "idle_evictions": self.idle_evictions,
+            "memory_evictions": self.memory_evictions,
+            "ready": self.ready.is_set(),
+            "warmed_tenants": self.warmed_tenants,
+            "tombstoned_vectors": sum(tombstone_counts.values()),
+            "compacted_vectors": self.compacted_vectors
+        }
+        
+        if company_id is not None:
+            tenant = dict(entries).get(company_id)
+            if tenant is not None:
+                vectors, dead_rows = tenant.vectors, tenant.dead_rows()
+            else:
+                vectors, dead_rows = self._persisted_counts(company_id)
+            stats["company_loaded"] = tenant is not None
+            stats["company_index"] = tenant.index_type if tenant else None
+            stats["company_vectors"] = vectors
+            # Dead = tombstoned (abhi index mein) + index se nikle lekin files mein pare
+            tombstoned = tombstone_counts.get(company_id, 0)
+            stats["company_live_vectors"] = max(vectors - tombstoned, 0)
+            stats["company_dead_vectors"] = tombstoned + dead_rows
+            stats["company_estimated_bytes"] = tenant.estimated_bytes(self.dimensions) if tenant else 0
+        
+        return stats
 
 
 # Global instance
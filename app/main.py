@@ -1,7 +1,11 @@
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse
 from app.config import settings
 from app.core.database import create_db_and_tables
+from app.core.document_parser import document_parser
+from app.core.vectorestore import vector_store
+from app.services.ingestion_service import ingestion_queue
 from app.api.v1.router import api_router
 
 # FastAPI app initialize
@@ -27,6 +31,24 @@ def on_startup():
     # Create database tables
     create_db_and_tables()
     print("✅ Database tables created")
+    
+    # Hottest tenants background mein load - /health/ready tab tak 503
+    vector_store.start_warmup()
+    
+    # Deleted documents ke vectors background mein index se nikalte hain
+    vector_store.start_compaction()
+    
+    # Pichle run ke adhoore upload jobs
+    ingestion_queue.resume()
+
+
+@app.on_event("shutdown")
+def on_shutdown():
+    """Application band hone par"""
+    ingestion_queue.shutdown()
+    document_parser.shutdown()
+    vector_store.stop_compaction()
+    vector_store.save_tenant_stats()
 
 
 @app.get("/")
@@ -49,6 +71,19 @@ def health_check():
     }
 
 
+@app.get("/health/ready")
+def readiness_check():
+    """Readiness - vector store warm-up khatam hone tak 503"""
+    if not vector_store.ready.is_set():
+        return JSONResponse(status_code=503, content={"status": "warming_up"})
+    
+    return {
+        "status": "ready",
+        "warmed_tenants": vector_store.warmed_tenants,
+        "warmup_seconds": vector_store.warmup_seconds
+    }
+
+
 # Include API v1 router
 app.include_router(api_router, prefix=settings.API_V1_STR)
 
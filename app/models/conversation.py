@@ -16,6 +16,10 @@ class Conversation(SQLModel, table=True):
     status: str = Field(default="active")  # active, closed, archived
     satisfaction_rating: Optional[int] = None  # 1-5 rating
     
+    # Rolling summary - history window se bahar gaye purane turns
+    summary: Optional[str] = None
+    summarized_until_id: Optional[int] = None  # Is message id tak summary mein fold ho chuka
+    
     created_at: datetime = Field(default_factory=datetime.utcnow)
     updated_at: datetime = Field(default_factory=datetime.utcnow)
     closed_at: Optional[datetime] = None
\ No newline at end of file
@@ -1,20 +1,37 @@
 from sqlmodel import SQLModel, Field
+from sqlalchemy import Index, text
 from typing import Optional
 from datetime import datetime
 
 
 class Document(SQLModel, table=True):
     """Document model - uploaded company documents"""
+    __table_args__ = (
+        # Company ka ek filename = ek active document, kai workers/processes ke beech bhi
+        Index(
+            "uq_document_active_filename", "company_id", "filename",
+            unique=True,
+            sqlite_where=text("is_active"),
+            postgresql_where=text("is_active")
+        ),
+    )
+    
     id: Optional[int] = Field(default=None, primary_key=True)
     company_id: int = Field(foreign_key="company.id")
     
     filename: str
     file_type: str  # pdf, docx, txt
-    file_path: str
+    file_path: str  # Blob store path (sha256 se)
+    
+    # Content hash - same company ka same file dobara upload ho to yehi document
+    content_hash: Optional[str] = Field(default=None, index=True)  # sha256 hex
+    file_size: int = Field(default=0)
+    duplicate_uploads: int = Field(default=0)  # Kitni dafa dobara upload hua (parse/embed skip)
     
     # Vector store metadata
     vector_ids: Optional[str] = None  # JSON array of vector IDs
     chunk_count: int = Field(default=0)
+    chunk_hashes: Optional[str] = None  # JSON array - har chunk ka sha256 (vector_ids ke parallel)
     
     is_active: bool = Field(default=True)
     uploaded_by: int = Field(foreign_key="user.id")
@@ -0,0 +1,36 @@
+from sqlmodel import SQLModel, Field
+from typing import Optional
+from datetime import datetime
+
+
+class IngestionJob(SQLModel, table=True):
+    """Document ingestion job - upload ke baad background mein process hota hai"""
+    id: Optional[int] = Field(default=None, primary_key=True)
+    company_id: int = Field(foreign_key="company.id", index=True)
+    uploaded_by: int = Field(foreign_key="user.id")
+    
+    kind: str = Field(default="document")  # document, bulk
+    filename: str
+    file_type: str  # pdf, docx, txt (bulk job ke liye "bulk")
+    file_path: str  # Bulk job ki files payload mein
+    content_hash: Optional[str] = Field(default=None, index=True)  # sha256 hex
+    file_size: int = Field(default=0)
+    
+    status: str = Field(default="queued", index=True)  # queued, running, succeeded, failed
+    attempts: int = Field(default=0)
+    error: Optional[str] = None
+    
+    # Progress - embedding batches ke hisab se
+    chunks_total: int = Field(default=0)
+    chunks_done: int = Field(default=0)
+    
+    document_id: Optional[int] = Field(default=None, foreign_key="document.id")
+    
+    # Bulk job - collect_uploads() ki files (JSON) aur mukammal hone par pipeline report (JSON)
+    payload: Optional[str] = None
+    report: Optional[str] = None
+    
+    created_at: datetime = Field(default_factory=datetime.utcnow)
+    started_at: Optional[datetime] = None
+    heartbeat_at: Optional[datetime] = None  # Running job ki lease - worker zinda hai
+    finished_at: Optional[datetime] = None
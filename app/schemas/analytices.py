@@ -19,4 +19,87 @@ class ConversationStats(BaseModel):
     message_count: int
     duration_minutes: Optional[float]
     satisfaction_rating: Optional[int]
-    status: str
\ No newline at end of file
+    status: str
+
+
+class AnswerCacheStats(BaseModel):
+    """Answer cache counters - cache sizing ke liye"""
+    exact_hits: int
+    semantic_hits: int
+    misses: int
+    evictions: int
+    entries: int
+    hit_ratio: float
+    bytes: int
+    max_bytes: int
+
+
+class CoalescingStats(BaseModel):
+    """Single-flight coalescing counters"""
+    executed: int
+    coalesced: int
+    coalesced_ratio: float
+    in_flight: int
+
+
+class CondensingStats(BaseModel):
+    """Follow-up question condensing paths ke counters"""
+    strategy: str
+    first_turn: int
+    heuristic_skip: int
+    condensed: int
+    concat_previous: int
+    avg_condense_latency_ms: float
+    estimated_saved_ms: float
+
+
+class VectorStoreStats(BaseModel):
+    """Loaded collection handles aur memory accounting"""
+    backend: str
+    loaded_tenants: int
+    max_loaded_tenants: int
+    estimated_bytes: int
+    memory_budget_bytes: int
+    hits: int
+    misses: int
+    evictions: int
+    idle_evictions: int
+    memory_evictions: int
+    ready: bool
+    warmed_tenants: int
+    tombstoned_vectors: int = 0  # Deleted lekin abhi compact nahi hue
+    compacted_vectors: int = 0
+    company_loaded: bool
+    company_index: Optional[str] = None  # hnsw, flat ya ivf
+    company_vectors: int
+    company_estimated_bytes: int
+    company_live_vectors: int = 0
+    company_dead_vectors: int = 0
+
+
+class EmbeddingCacheStats(BaseModel):
+    """Content-hash embedding cache counters (sab companies ka shared)"""
+    enabled: bool
+    model: Optional[str] = None
+    hits: int = 0
+    misses: int = 0
+    hit_ratio: float = 0.0
+    entries: int = 0
+    size_bytes: int = 0
+    query_memory_hits: int = 0
+    query_disk_hits: int = 0
+    query_misses: int = 0
+    query_disk_pruned: int = 0
+    query_hit_ratio: float = 0.0
+    query_entries: int = 0
+    query_avg_embed_ms: float = 0.0
+    query_saved_ms: float = 0.0  # Hits * average provider latency
+
+
+class UploadDedupeStats(BaseModel):
+    """Duplicate uploads jo existing documents se serve hue"""
+    documents: int
+    duplicate_uploads: int
+    dedupe_ratio: float
+    bytes_saved: int  # Jo bytes dobara parse nahi hue
+    chunks_reused: int  # Jo chunks dobara embed nahi hue
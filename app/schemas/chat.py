@@ -1,5 +1,5 @@
 from pydantic import BaseModel
-from typing import Optional, List
+from typing import Dict, Literal, Optional, List
 from datetime import datetime
 
 
@@ -9,6 +9,7 @@ class ChatRequest(BaseModel):
     conversation_id: Optional[int] = None
     customer_name: Optional[str] = None
     customer_email: Optional[str] = None
+    retrieval_mode: Optional[Literal["vector", "lexical", "hybrid"]] = None  # Default: server setting
 
 
 class ChatResponse(BaseModel):
@@ -17,6 +18,7 @@ class ChatResponse(BaseModel):
     message: str
     sources: Optional[List[dict]] = None
     created_at: datetime
+    timings: Optional[Dict[str, float]] = None  # Pipeline stages ka time (ms)
 
 
 class ConversationCreate(BaseModel):
@@ -1,6 +1,6 @@
 from pydantic import BaseModel
 from datetime import datetime
-from typing import Optional
+from typing import Dict, List, Optional
 
 
 class DocumentUpload(BaseModel):
@@ -21,6 +21,51 @@ class DocumentResponse(BaseModel):
     updated_at: datetime
 
 
+class BulkStageStats(BaseModel):
+    """Bulk pipeline ke ek stage ka throughput"""
+    unit: str  # files, chunks, rows
+    items: int
+    busy_seconds: float
+    items_per_second: float
+    utilization: float  # Busy waqt / pipeline waqt - sab se zyada wala bottleneck
+
+
+class BulkFileError(BaseModel):
+    """Bulk upload ki file jo ingest nahi hui"""
+    filename: str
+    error: str
+
+
+class BulkIngestionResponse(BaseModel):
+    """Bulk ingestion report"""
+    files: int
+    documents_created: int
+    documents_updated: int
+    duplicates_skipped: int
+    failed: List[BulkFileError]
+    chunks_embedded: int
+    elapsed_seconds: float
+    stages: Dict[str, BulkStageStats]  # parse, chunk, embed, store, insert
+
+
+class IngestionJobResponse(BaseModel):
+    """Ingestion job status"""
+    id: int
+    company_id: int
+    kind: str  # document, bulk
+    filename: str
+    status: str  # queued, running, succeeded, failed
+    attempts: int
+    error: Optional[str] = None
+    chunks_total: int
+    chunks_done: int
+    document_id: Optional[int] = None
+    report: Optional[BulkIngestionResponse] = None  # Sirf mukammal bulk job
+    created_at: datetime
+    started_at: Optional[datetime] = None
+    finished_at: Optional[datetime] = None
+
+
 class DocumentListResponse(BaseModel):
     """Document list response"""
     documents: list[DocumentResponse]
@@ -119,6 +119,40 @@ class AnalyticsService:
             "status": conversation.status
         }
 
+    
+    def get_upload_stats(self, db: Session, company_id: int) -> dict:
+        """
+        Duplicate uploads ki wajah se kitni parsing/embedding bachi
+        
+        Args:
+            db: Database session
+            company_id: Company ID
+        
+        Returns:
+            Dictionary with dedupe stats
+        """
+        documents, duplicate_uploads, bytes_saved, chunks_reused = db.exec(
+            select(
+                func.count(Document.id),
+                func.coalesce(func.sum(Document.duplicate_uploads), 0),
+                func.coalesce(func.sum(Document.duplicate_uploads * Document.file_size), 0),
+                func.coalesce(func.sum(Document.duplicate_uploads * Document.chunk_count), 0)
+            ).where(
+                Document.company_id == company_id,
+                Document.is_active == True
+            )
+        ).one()
+        
+        total_uploads = documents + duplicate_uploads
+        
+        return {
+            "documents": documents,
+            "duplicate_uploads": duplicate_uploads,
+            "dedupe_ratio": round(duplicate_uploads / total_uploads, 4) if total_uploads else 0.0,
+            "bytes_saved": bytes_saved,
+            "chunks_reused": chunks_reused
+        }
+
 
 # Global instance
 analytics_service = AnalyticsService()
\ No newline at end of file
@@ -0,0 +1,214 @@
+from collections import OrderedDict
+from threading import Lock
+from typing import Dict, List, Optional, Tuple
+from app.config import settings
+from app.utils.helpers import normalize_question
+import json
+import time
+import numpy as np
+
+
+class _CacheEntry:
+    """Ek cached answer aur uska metadata"""
+
+    __slots__ = ("answer", "sources", "embedding", "expires_at", "size")
+
+    def __init__(self, answer: str, sources: list, embedding: Optional[np.ndarray], ttl: float):
+        self.answer = answer
+        self.sources = sources
+        self.embedding = embedding
+        self.expires_at = time.monotonic() + ttl
+        self.size = (
+            len(answer.encode())
+            + len(json.dumps(sources, default=str).encode())
+            + (embedding.nbytes if embedding is not None else 0)
+        )
+
+
+class AnswerCache:
+    """
+    Per-company answer cache - do tiers ke sath
+
+    Tier 1: normalized question par exact lookup
+    Tier 2: question embedding par cosine similarity lookup
+
+    Entries TTL ke baad expire hoti hain, aur total memory cap se upar
+    least-recently-used entries evict hoti hain.
+    """
+
+    def __init__(
+        self,
+        ttl_seconds: float = 3600,
+        max_bytes: int = 64 * 1024 * 1024,
+        similarity_threshold: float = 0.95
+    ):
+        self.ttl_seconds = ttl_seconds
+        self.max_bytes = max_bytes
+        self.similarity_threshold = similarity_threshold
+
+        # (company_id, normalized_question) -> entry, LRU order mein
+        self._entries: "OrderedDict[Tuple[int, str], _CacheEntry]" = OrderedDict()
+        # company_id -> keys - semantic scan sirf usi company ki entries par
+        self._company_keys: Dict[int, set] = {}
+        self._bytes = 0
+        self._lock = Lock()
+
+        # Per-company counters
+        self._counters: Dict[int, Dict[str, int]] = {}
+
+    def _count(self, company_id: int, name: str) -> None:
+        counters = self._counters.setdefault(
+            company_id,
+            {"exact_hits": 0, "semantic_hits": 0, "misses": 0, "evictions": 0}
+        )
+        counters[name] += 1
+
+    def _remove(self, key: Tuple[int, str]) -> None:
+        entry = self._entries.pop(key)
+        self._bytes -= entry.size
+        keys = self._company_keys.get(key[0])
+        if keys is not None:
+            keys.discard(key)
+            if not keys:
+                del self._company_keys[key[0]]
+
+    def lookup_exact(self, company_id: int, question: str, count: bool = True) -> Optional[dict]:
+        """
+        Tier 1 - normalized question par exact lookup
+
+        Miss count nahi hota - uske baad lookup_similar() hamesha chalta hai.
+        count=False sirf jhaankta hai (prefetch decide karne ke liye) - hit
+        counters nahi badalte.
+        """
+        key = (company_id, normalize_question(question))
+
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            if entry.expires_at <= time.monotonic():
+                self._remove(key)
+                return None
+
+            self._entries.move_to_end(key)
+            if count:
+                self._count(company_id, "exact_hits")
+            return {"answer": entry.answer, "sources": entry.sources}
+
+    def lookup_similar(self, company_id: int, embedding: List[float], count: bool = True) -> Optional[dict]:
+        """
+        Tier 2 - query embedding par cosine similarity lookup
+
+        Args:
+            company_id: Company ID
+            embedding: Question ki query embedding (retrieval wali hi)
+            count: False ho to hit/miss counters nahi badalte
+
+        Returns:
+            Cached result ya None (miss)
+        """
+        embedding = self._normalize(embedding)
+        now = time.monotonic()
+
+        with self._lock:
+            best_key, best_score = None, self.similarity_threshold
+            for entry_key in list(self._company_keys.get(company_id, ())):
+                entry = self._entries[entry_key]
+                if entry.expires_at <= now:
+                    self._remove(entry_key)
+                    continue
+                if entry.embedding is None:
+                    continue
+                score = float(np.dot(entry.embedding, embedding))
+                if score >= best_score:
+                    best_key, best_score = entry_key, score
+
+            if best_key is None:
+                if count:
+                    self._count(company_id, "misses")
+                return None
+
+            entry = self._entries[best_key]
+            self._entries.move_to_end(best_key)
+            if count:
+                self._count(company_id, "semantic_hits")
+            return {"answer": entry.answer, "sources": entry.sources}
+
+    def store(
+        self,
+        company_id: int,
+        question: str,
+        result: dict,
+        embedding: Optional[List[float]] = None
+    ) -> None:
+        """Answer ko cache mein store karta hai"""
+        key = (company_id, normalize_question(question))
+        if embedding is not None:
+            embedding = self._normalize(embedding)
+        entry = _CacheEntry(result["answer"], result["sources"], embedding, self.ttl_seconds)
+
+        # Itni bari entry jo poore cache mein na aaye - skip
+        if entry.size > self.max_bytes:
+            return
+
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+
+            self._entries[key] = entry
+            self._company_keys.setdefault(company_id, set()).add(key)
+            self._bytes += entry.size
+
+            while self._bytes > self.max_bytes:
+                oldest_key = next(iter(self._entries))
+                self._remove(oldest_key)
+                self._count(oldest_key[0], "evictions")
+
+    def invalidate(self, company_id: int) -> None:
+        """Company ke saare cached answers remove karta hai"""
+        with self._lock:
+            for key in list(self._company_keys.get(company_id, ())):
+                self._remove(key)
+
+    def stats(self, company_id: Optional[int] = None) -> dict:
+        """
+        Hit/miss counters return karta hai
+
+        Args:
+            company_id: Di ho to sirf us company ke counters, warna total
+        """
+        with self._lock:
+            if company_id is not None:
+                counters = dict(self._counters.get(
+                    company_id,
+                    {"exact_hits": 0, "semantic_hits": 0, "misses": 0, "evictions": 0}
+                ))
+                counters["entries"] = len(self._company_keys.get(company_id, ()))
+            else:
+                counters = {"exact_hits": 0, "semantic_hits": 0, "misses": 0, "evictions": 0}
+                for company_counters in self._counters.values():
+                    for name, value in company_counters.items():
+                        counters[name] += value
+                counters["entries"] = len(self._entries)
+
+            lookups = counters["exact_hits"] + counters["semantic_hits"] + counters["misses"]
+            hits = counters["exact_hits"] + counters["semantic_hits"]
+            counters["hit_ratio"] = round(hits / lookups, 4) if lookups else 0.0
+            counters["bytes"] = self._bytes
+            counters["max_bytes"] = self.max_bytes
+            return counters
+
+    @staticmethod
+    def _normalize(vector: List[float]) -> np.ndarray:
+        """Unit-length float32 vector - dot product hi cosine similarity ban jata hai"""
+        array = np.asarray(vector, dtype=np.float32)
+        norm = np.linalg.norm(array)
+        return array / norm if norm else array
+
+
+# Global instance
+answer_cache = AnswerCache(
+    ttl_seconds=settings.ANSWER_CACHE_TTL_SECONDS,
+    max_bytes=settings.ANSWER_CACHE_MAX_BYTES,
+    similarity_threshold=settings.ANSWER_CACHE_SIMILARITY_THRESHOLD
+)
@@ -0,0 +1,517 @@
+from app.config import settings
+from app.core.blob_store import blob_store
+from app.core.document_parser import document_parser
+from app.core.lexical_index import lexical_index
+from app.core.vectorestore import vector_store
+from app.models.documents import Document
+from app.services.document_service import chunk_hash, document_service
+from app.services.reg_service import rag_service
+from app.utils.logger import get_logger
+from contextlib import ExitStack
+from queue import Empty, Full, Queue
+from sqlalchemy.exc import IntegrityError
+from sqlmodel import Session, select
+from threading import Event, Lock, Thread
+from typing import BinaryIO, Dict, Iterable, Iterator, List, Optional, Tuple
+import argparse
+import json
+import os
+import time
+import uuid
+import zipfile
+
+logger = get_logger("bulk_ingestion")
+
+ALLOWED_TYPES = ("pdf", "docx", "txt")
+
+# Queue mein "upstream stage khatam" ka nishan
+DONE = object()
+
+
+class PipelineStopped(Exception):
+    """Kisi stage ke fail hone par baqi stages ko rokne ke liye"""
+
+
+def file_type_of(filename: str) -> Optional[str]:
+    """Extension se file type - unsupported ho to None"""
+    extension = filename.rsplit(".", 1)[-1].lower() if "." in filename else ""
+    return extension if extension in ALLOWED_TYPES else None
+
+
+def _stored(stream: BinaryIO, filename: str) -> dict:
+    content_hash, file_path, file_size = blob_store.save(stream)
+    return {
+        "filename": filename,
+        "file_type": file_type_of(filename),
+        "file_path": file_path,
+        "content_hash": content_hash,
+        "file_size": file_size
+    }
+
+
+def collect_uploads(uploads: Iterable[Tuple[BinaryIO, str]]) -> List[dict]:
+    """
+    Uploads (aur zip archives ke andar ki files) blob store mein likhta hai
+
+    Zip members ka naam archive ke andar ka path hai (manuals/faq.pdf) -
+    alag folders ki same naam wali files alag documents rehti hain. Request
+    ke saare archives mil kar BULK_MAX_EXTRACT_BYTES se zyada extract nahi
+    hote (zip bombs).
+
+    Args:
+        uploads: [(binary stream, filename), ...]
+
+    Returns:
+        [{"filename", "file_type", "file_path", "content_hash", "file_size"}, ...]
+    """
+    files = []
+    extracted = 0
+    for stream, filename in uploads:
+        if filename.lower().endswith(".zip"):
+            with zipfile.ZipFile(stream) as archive:
+                members = [
+                    member for member in archive.infolist()
+                    if not member.is_dir()
+                    and file_type_of(member.filename)
+                    and not member.filename.startswith("__MACOSX/")
+                    and not os.path.basename(member.filename).startswith(".")
+                ]
+                if len(files) + len(members) > settings.BULK_MAX_FILES:
+                    raise ValueError(f"Too many files (max {settings.BULK_MAX_FILES})")
+                # zipfile member ke declared file_size se zyada bytes kabhi nahi deta
+                extracted += sum(member.file_size for member in members)
+                if extracted > settings.BULK_MAX_EXTRACT_BYTES:
+                    raise ValueError(f"Archive contents too large (max {settings.BULK_MAX_EXTRACT_BYTES} bytes uncompressed)")
+                for member in members:
+                    with archive.open(member) as f:
+                        files.append(_stored(f, member.filename))
+            continue
+
+        if file_type_of(filename) is None:
+            raise ValueError(f"File type not supported: {filename}. Allowed: {', '.join(ALLOWED_TYPES)}, zip")
+        if len(files) + 1 > settings.BULK_MAX_FILES:
+            raise ValueError(f"Too many files (max {settings.BULK_MAX_FILES})")
+        files.append(_stored(stream, filename))
+
+    return files
+
+
+class BulkIngestion:
+    """
+    Bahut si files ki ingestion ek staged pipeline mein
+
+        parse (process pool) -> chunk -> embed (embedding_concurrency threads) -> store
+
+    Stages ke darmiyan bounded queues hain: har stage apna kaam karta rehta
+    hai jab tak agla stage peeche na ho, aur peeche ho to ruk jata hai
+    (memory mein sirf queue_size items). Embedding batches kai files ke
+    chunks se bhar kar jati hain, is liye chhoti files bhi poore batches
+    banati hain.
+
+    Pehle se indexed content (same sha256) parse hi nahi hota; same
+    filename wali files document_service ke incremental update se guzarti
+    hain. Naye documents ki rows aakhir mein ek batched INSERT mein jati
+    hain (single upload wale document_lock ke andar) - kuch bhi fail ho to
+    likhe gaye vectors wapas nikal diye jate hain.
+    """
+
+    STAGES = (("parse", "files"), ("chunk", "chunks"), ("embed", "chunks"), ("store", "chunks"), ("insert", "rows"))
+
+    def __init__(self, db: Session, company_id: int, user_id: int, queue_size: Optional[int] = None):
+        self.db = db
+        self.company_id = company_id
+        self.user_id = user_id
+        self.queue_size = queue_size or settings.BULK_QUEUE_SIZE
+        self.batch_size = vector_store.embedding_batch_size
+        self.embed_workers = vector_store.embedding_concurrency
+        self.parse_window = document_parser.workers
+
+        self.stages: Dict[str, dict] = {
+            name: {"unit": unit, "items": 0, "busy_seconds": 0.0, "threads": 1}
+            for name, unit in self.STAGES
+        }
+        self.stages["embed"]["threads"] = self.embed_workers
+
+        self._documents: List[Tuple[dict, List[str], List[str]]] = []  # (file, vector ids, texts)
+        self._written: List[str] = []
+        self._failed: List[dict] = []
+        self._lock = Lock()
+        self._stop = Event()
+        self._error: Optional[BaseException] = None
+
+    def run(self, files: List[dict]) -> dict:
+        """
+        Files ingest karke har stage ka throughput report karta hai
+
+        Args:
+            files: collect_uploads() ka result
+
+        Returns:
+            Report - documents, duplicates, failures aur per-stage throughput
+        """
+        started = time.perf_counter()
+        new_files, updates, duplicates = self._classify(files)
+
+        parsed, chunked, embedded = (Queue(maxsize=self.queue_size) for _ in range(3))
+        threads = [
+            Thread(target=self._guard, args=(self._parse, new_files, parsed), name="bulk-parse"),
+            Thread(target=self._guard, args=(self._chunk, parsed, chunked), name="bulk-chunk"),
+            *[
+                Thread(target=self._guard, args=(self._embed, chunked, embedded), name=f"bulk-embed-{i}")
+                for i in range(self.embed_workers)
+            ],
+            Thread(target=self._guard, args=(self._store, embedded), name="bulk-store")
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        if self._error is not None:
+            vector_store.delete_documents(self.company_id, self._written)
+            raise self._error
+
+        pipeline_seconds = time.perf_counter() - started
+        documents, raced = self._insert_documents()
+
+        # Baqi indexes ek dafa - sirf jin ki rows bani
+        inserted = [(ids, texts) for file, ids, texts in self._documents if file not in raced]
+        new_ids = [vector_id for ids, _ in inserted for vector_id in ids]
+        if new_ids:
+            lexical_index.add(self.company_id, new_ids, [text for _, texts in inserted for text in texts])
+        rag_service.invalidate(self.company_id)
+
+        # Beech mein kisi aur upload ne bana diye - woh document_service ke update se
+        updated = self._apply_updates(updates + raced)
+        for document in duplicates:
+            document_service.register_duplicate(self.db, document)
+
+        elapsed = time.perf_counter() - started
+        report = {
+            "files": len(files),
+            "documents_created": len(documents),
+            "documents_updated": updated,
+            "duplicates_skipped": len(files) - len(new_files) - len(updates),
+            "failed": self._failed,
+            "chunks_embedded": len(new_ids),
+            "elapsed_seconds": round(elapsed, 3),
+            "stages": {
+                name: {
+                    "unit": stage["unit"],
+                    "items": stage["items"],
+                    "busy_seconds": round(stage["busy_seconds"], 3),
+                    "items_per_second": round(stage["items"] / pipeline_seconds, 1) if pipeline_seconds else 0.0,
+                    # Kitna waqt stage kaam mein tha - sab se zyada wala bottleneck hai
+                    "utilization": round(stage["busy_seconds"] / (pipeline_seconds * stage["threads"]), 3) if pipeline_seconds else 0.0
+                }
+                for name, stage in self.stages.items()
+            }
+        }
+        logger.info(
+            "Bulk ingestion for company %s: %s created, %s updated, %s duplicates, %s failed in %.1fs",
+            self.company_id, len(documents), updated, report["duplicates_skipped"], len(self._failed), elapsed
+        )
+        return report
+
+    def _classify(self, files: List[dict]) -> Tuple[List[dict], List[dict], List[Document]]:
+        """Files ko naye, update (same filename) aur duplicate (same content) mein baantta hai"""
+        existing = self.db.exec(
+            select(Document).where(
+                Document.company_id == self.company_id,
+                Document.is_active == True
+            )
+        ).all()
+        by_hash = {document.content_hash: document for document in existing if document.content_hash}
+        filenames = {document.filename for document in existing}
+
+        new_files, updates, duplicates = [], [], []
+        seen_hashes = set()
+        for file in files:
+            if file["content_hash"] in by_hash:
+                duplicates.append(by_hash[file["content_hash"]])
+            elif file["content_hash"] in seen_hashes:
+                continue  # Isi batch mein same file dobara
+            elif file["filename"] in filenames:
+                updates.append(file)
+            else:
+                new_files.append(file)
+                filenames.add(file["filename"])
+            seen_hashes.add(file["content_hash"])
+
+        return new_files, updates, duplicates
+
+    def _guard(self, stage, *args) -> None:
+        """Stage ka pehla error rakhta hai aur baqi stages ko rokta hai"""
+        try:
+            stage(*args)
+        except PipelineStopped:
+            pass
+        except BaseException as e:
+            with self._lock:
+                if self._error is None:
+                    self._error = e
+            self._stop.set()
+
+    def _put(self, queue: Queue, item) -> None:
+        while True:
+            if self._stop.is_set():
+                raise PipelineStopped()
+            try:
+                queue.put(item, timeout=0.1)
+                return
+            except Full:
+                continue
+
+    def _get(self, queue: Queue):
+        while True:
+            if self._stop.is_set():
+                raise PipelineStopped()
+            try:
+                return queue.get(timeout=0.1)
+            except Empty:
+                continue
+
+    def _record(self, stage: str, items: int, began: float) -> None:
+        with self._lock:
+            self.stages[stage]["items"] += items
+            self.stages[stage]["busy_seconds"] += time.perf_counter() - began
+
+    def _parse(self, files: List[dict], out: Queue) -> None:
+        """Parser ke workers jitni files ek sath - kharab file baqi batch nahi rokti"""
+        for start in range(0, len(files), self.parse_window):
+            window = files[start:start + self.parse_window]
+            began = time.perf_counter()
+            try:
+                results = document_parser.load_many([(file["file_path"], file["file_type"]) for file in window])
+            except Exception:
+                results = [self._parse_one(file) for file in window]
+            self._record("parse", len(window), began)
+
+            for file, pages in zip(window, results):
+                if pages is not None:
+                    self._put(out, (file, pages))
+        self._put(out, DONE)
+
+    def _parse_one(self, file: dict):
+        try:
+            return document_parser.load(file["file_path"], file["file_type"])
+        except Exception as e:
+            logger.warning("Bulk ingestion could not parse %s: %s", file["filename"], e)
+            with self._lock:
+                self._failed.append({"filename": file["filename"], "error": str(e)})
+            return None
+
+    def _chunk(self, inp: Queue, out: Queue) -> None:
+        """Files ke chunks embedding batch_size ke batches mein (files ki hadd se bahar bhi)"""
+        batch = []
+        while True:
+            item = self._get(inp)
+            if item is DONE:
+                break
+
+            file, pages = item
+            began = time.perf_counter()
+            texts = [chunk.page_content for chunk in document_service.text_splitter.split_documents(pages)]
+            ids = [str(uuid.uuid4()) for _ in texts]
+            metadatas = document_service.chunk_metadatas(self.company_id, file["filename"], len(texts))
+            self._documents.append((file, ids, texts))
+            self._record("chunk", len(texts), began)
+
+            for record in zip(ids, texts, metadatas):
+                batch.append(record)
+                if len(batch) == self.batch_size:
+                    self._put(out, batch)
+                    batch = []
+
+        if batch:
+            self._put(out, batch)
+        for _ in range(self.embed_workers):
+            self._put(out, DONE)
+
+    def _embed(self, inp: Queue, out: Queue) -> None:
+        while True:
+            batch = self._get(inp)
+            if batch is DONE:
+                break
+            began = time.perf_counter()
+            embeddings = vector_store.embed_batch([text for _, text, _ in batch])
+            self._record("embed", len(batch), began)
+            self._put(out, (batch, embeddings))
+        self._put(out, DONE)
+
+    def _store(self, inp: Queue) -> None:
+        remaining = self.embed_workers
+        while remaining:
+            item = self._get(inp)
+            if item is DONE:
+                remaining -= 1
+                continue
+
+            batch, embeddings = item
+            ids, texts, metadatas = (list(column) for column in zip(*batch))
+            began = time.perf_counter()
+            vector_store.write_embeddings(self.company_id, ids, embeddings, texts, metadatas)
+            with self._lock:
+                self._written.extend(ids)
+            self._record("store", len(ids), began)
+
+    def _document_row(self, file: dict, ids: List[str], texts: List[str]) -> Document:
+        return Document(
+            company_id=self.company_id,
+            filename=file["filename"],
+            file_type=file["file_type"],
+            file_path=file["file_path"],
+            vector_ids=json.dumps(ids),
+            chunk_count=len(ids),
+            chunk_hashes=json.dumps([chunk_hash(text) for text in texts]),
+            content_hash=file["content_hash"],
+            file_size=file["file_size"],
+            uploaded_by=self.user_id
+        )
+
+    def _insert_documents(self) -> Tuple[List[Document], List[dict]]:
+        """
+        Naye documents ki rows ek commit mein (SQLAlchemy ek batched INSERT bhejta hai)
+
+        Single upload jaisa hi guard: har filename ka document_lock, phir
+        dobara check ke koi active document ban to nahi gaya. Doosre process
+        ne bana diya ho to unique index batch rokta hai - tab rows ek ek karke.
+        Jo filenames ab maujood hain un ke likhe vectors nikal kar woh files
+        update ke liye wapas di jati hain.
+
+        Returns:
+            (bani hui rows, update ke liye files)
+        """
+        if not self._documents:
+            return [], []
+
+        began = time.perf_counter()
+        with ExitStack() as stack:
+            # Sorted order - process_and_store ek hi lock leta hai, deadlock nahi
+            for filename in sorted({file["filename"] for file, _, _ in self._documents}):
+                stack.enter_context(document_service.document_lock(self.company_id, filename))
+
+            taken = set(self.db.exec(
+                select(Document.filename).where(
+                    Document.company_id == self.company_id,
+                    Document.filename.in_([file["filename"] for file, _, _ in self._documents]),
+                    Document.is_active == True
+                )
+            ).all())
+            fresh = [entry for entry in self._documents if entry[0]["filename"] not in taken]
+            raced = [entry for entry in self._documents if entry[0]["filename"] in taken]
+
+            documents = [self._document_row(*entry) for entry in fresh]
+            try:
+                self.db.add_all(documents)
+                self.db.commit()
+            except IntegrityError:
+                self.db.rollback()
+                documents, lost = self._insert_one_by_one(fresh)
+                raced += lost
+            except Exception:
+                self.db.rollback()
+                vector_store.delete_documents(self.company_id, self._written)
+                raise
+
+        for file, ids, _ in raced:
+            vector_store.delete_documents(self.company_id, ids)
+        self._record("insert", len(documents), began)
+        return documents, [file for file, _, _ in raced]
+
+    def _insert_one_by_one(self, entries: list) -> Tuple[List[Document], list]:
+        """Har row alag commit - unique index par haarne wali entries alag"""
+        documents, lost = [], []
+        for position, entry in enumerate(entries):
+            document = self._document_row(*entry)
+            try:
+                self.db.add(document)
+                self.db.commit()
+            except IntegrityError:
+                self.db.rollback()
+                lost.append(entry)
+                continue
+            except Exception:
+                self.db.rollback()
+                # Commit ho chuki rows ke vectors rehte hain
+                pending = [vector_id for _, ids, _ in entries[position:] for vector_id in ids]
+                vector_store.delete_documents(self.company_id, pending)
+                raise
+            documents.append(document)
+        return documents, lost
+
+    def _apply_updates(self, updates: List[dict]) -> int:
+        """Same filename wali files - sirf badle hue chunks embed (document_service)"""
+        updated = 0
+        for file in updates:
+            try:
+                document_service.process_and_store(
+                    db=self.db,
+                    company_id=self.company_id,
+                    user_id=self.user_id,
+                    file_path=file["file_path"],
+                    filename=file["filename"],
+                    file_type=file["file_type"],
+                    content_hash=file["content_hash"],
+                    file_size=file["file_size"]
+                )
+                updated += 1
+            except Exception as e:
+                self.db.rollback()
+                logger.warning("Bulk ingestion could not update %s: %s", file["filename"], e)
+                self._failed.append({"filename": file["filename"], "error": str(e)})
+        return updated
+
+
+def _local_files(paths: List[str]) -> Iterator[Tuple[BinaryIO, str]]:
+    """CLI paths - folders ke andar ki supported files aur zip archives"""
+    for path in paths:
+        if os.path.isdir(path):
+            for root, _, names in sorted(os.walk(path)):
+                for name in sorted(names):
+                    if file_type_of(name) or name.lower().endswith(".zip"):
+                        full_path = os.path.join(root, name)
+                        with open(full_path, "rb") as f:
+                            yield f, os.path.relpath(full_path, path)
+        else:
+            with open(path, "rb") as f:
+                yield f, os.path.basename(path)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Company ke documents bulk mein ingest karta hai")
+    parser.add_argument("paths", nargs="+", help="Files, folders ya zip archives")
+    parser.add_argument("--company-id", type=int, required=True)
+    parser.add_argument("--user-id", type=int, required=True, help="uploaded_by")
+    parser.add_argument("--queue-size", type=int, default=None)
+    args = parser.parse_args()
+
+    from app.core.database import create_db_and_tables, engine
+    from app.models.company import Company  # noqa: F401 - foreign key tables
+    from app.models.user import User  # noqa: F401
+
+    create_db_and_tables()
+    files = collect_uploads(_local_files(args.paths))
+    try:
+        with Session(engine) as db:
+            report = BulkIngestion(db, args.company_id, args.user_id, queue_size=args.queue_size).run(files)
+    finally:
+        document_parser.shutdown()
+
+    print(
+        f"files={report['files']} created={report['documents_created']} updated={report['documents_updated']} "
+        f"duplicates={report['duplicates_skipped']} failed={len(report['failed'])} "
+        f"chunks={report['chunks_embedded']} seconds={report['elapsed_seconds']}"
+    )
+    print(f"{'stage':<8}{'items':>10}{'unit':>8}{'per sec':>10}{'busy s':>10}{'util':>8}")
+    for name, stage in report["stages"].items():
+        print(
+            f"{name:<8}{stage['items']:>10}{stage['unit']:>8}{stage['items_per_second']:>10}"
+            f"{stage['busy_seconds']:>10}{stage['utilization']:>8.0%}"
+        )
+    for failure in report["failed"]:
+        print(f"FAILED {failure['filename']}: {failure['error']}")
+
+
+if __name__ == "__main__":
+    main()
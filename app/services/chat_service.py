@@ -1,17 +1,24 @@
-from sqlmodel import Session, select
+from sqlmodel.ext.asyncio.session import AsyncSession
+from langchain_core.messages import BaseMessage
 from app.models.conversation import Conversation
 from app.models.message import Message
-from app.services.reg_service import rag_service
-from typing import Optional, List, Tuple
+from app.services.reg_service import discard_task, rag_service
+from app.services.history_service import history_manager
+from app.utils.logger import get_logger
+from app.utils.timing import StageTimer
+from typing import AsyncIterator, Optional, List, Tuple
+import asyncio
 import json
 
+logger = get_logger("chat")
+
 
 class ChatService:
     """Chat logic ko handle karta hai"""
     
-    def get_or_create_conversation(
+    async def get_or_create_conversation(
         self,
-        db: Session,
+        db: AsyncSession,
         company_id: int,
         conversation_id: Optional[int] = None,
         user_id: Optional[int] = None,
@@ -24,7 +31,7 @@ class ChatService:
         
         if conversation_id:
             # Get existing conversation
-            conversation = db.get(Conversation, conversation_id)
+            conversation = await db.get(Conversation, conversation_id)
             if not conversation:
                 raise ValueError("Conversation not found")
             return conversation
@@ -37,74 +44,98 @@ class ChatService:
             customer_email=customer_email
         )
         db.add(conversation)
-        db.commit()
-        db.refresh(conversation)
+        await db.commit()
+        await db.refresh(conversation)
         
         return conversation
     
-    def get_chat_history(
+    async def get_chat_history(
         self, 
-        db: Session, 
-        conversation_id: int
-    ) -> List[Tuple[str, str]]:
+        db: AsyncSession, 
+        conversation: Conversation
+    ) -> List[BaseMessage]:
+        """
+        Conversation ka token-budgeted history return karta hai
+        Format: [SystemMessage(summary), HumanMessage, AIMessage, ...]
         """
-        Conversation ka history return karta hai
-        Format: [(user_message, bot_message), ...]
+        
+        return await history_manager.get_history(db, conversation)
+    
+    async def _start_turn(
+        self,
+        db: AsyncSession,
+        company_id: int,
+        conversation_id: int,
+        user_message: str,
+        retrieval_mode: Optional[str],
+        timer: StageTimer
+    ) -> Tuple[List[BaseMessage], Optional[asyncio.Task]]:
         """
+        Turn ke independent stages parallel chalata hai
         
-        statement = select(Message).where(
-            Message.conversation_id == conversation_id
-        ).order_by(Message.created_at)
+        Question ki retrieval background task mein shuru hoti hai jab tak
+        conversation, history aur user message ka DB kaam hota hai. Session ek
+        hai is liye DB stages apas mein sequential hain.
         
-        messages = db.exec(statement).all()
+        Returns:
+            (chat_history, prefetched retrieval task - answer cache hit par None)
+        """
+        prefetched = rag_service.prefetch_documents(company_id, user_message, retrieval_mode)
+        if prefetched is not None:
+            prefetched = asyncio.ensure_future(timer.track("retrieval", prefetched))
         
-        # Group messages into pairs
-        history = []
-        for i in range(0, len(messages) - 1, 2):
-            if i + 1 < len(messages):
-                user_msg = messages[i].content if messages[i].role == "user" else ""
-                bot_msg = messages[i + 1].content if messages[i + 1].role == "assistant" else ""
-                history.append((user_msg, bot_msg))
+        try:
+            async with timer.stage("history"):
+                conversation = await db.get(Conversation, conversation_id)
+                if not conversation:
+                    raise ValueError("Conversation not found")
+                chat_history = await self.get_chat_history(db, conversation)
+            
+            # Save user message
+            async with timer.stage("save_user_message"):
+                user_msg = Message(
+                    conversation_id=conversation_id,
+                    role="user",
+                    content=user_message
+                )
+                db.add(user_msg)
+                await db.commit()
+        except BaseException:
+            discard_task(prefetched)
+            raise
         
-        return history
+        return chat_history, prefetched
     
-    def process_message(
+    async def process_message(
         self,
-        db: Session,
+        db: AsyncSession,
         company_id: int,
         conversation_id: int,
-        user_message: str
+        user_message: str,
+        retrieval_mode: Optional[str] = None
     ) -> dict:
         """
         User message ko process karke response generate karta hai
         
         Returns:
-            dict with 'message', 'sources', 'conversation_id'
+            dict with 'message', 'sources', 'conversation_id', 'timings'
         """
         
-        # Get conversation
-        conversation = db.get(Conversation, conversation_id)
-        if not conversation:
-            raise ValueError("Conversation not found")
-        
-        # Get chat history
-        chat_history = self.get_chat_history(db, conversation_id)
-        
-        # Save user message
-        user_msg = Message(
-            conversation_id=conversation_id,
-            role="user",
-            content=user_message
+        timer = StageTimer()
+        chat_history, prefetched = await self._start_turn(
+            db, company_id, conversation_id, user_message, retrieval_mode, timer
         )
-        db.add(user_msg)
-        db.commit()
         
-        # Get answer from RAG
-        result = rag_service.get_answer(
-            company_id=company_id,
-            question=user_message,
-            chat_history=chat_history
-        )
+        # Get answer from RAG - prefetched task ab get_answer ka hai; coalesced
+        # computation followers ke liye usay request cancel hone par bhi chalata hai
+        async with timer.stage("answer"):
+            result = await rag_service.get_answer(
+                company_id=company_id,
+                question=user_message,
+                chat_history=chat_history,
+                retrieval_mode=retrieval_mode,
+                prefetched=prefetched
+            )
         
         # Save assistant message
         assistant_msg = Message(
@@ -114,14 +145,87 @@ class ChatService:
             sources_used=json.dumps(result["sources"]) if result["sources"] else None
         )
         db.add(assistant_msg)
-        db.commit()
-        db.refresh(assistant_msg)
+        await db.commit()
+        await db.refresh(assistant_msg)
+        
+        # Window se bahar gaye turns summary mein
+        history_manager.schedule_fold(conversation_id)
+        
+        timings = timer.finish()
+        logger.info("Chat pipeline timings (ms) for conversation %s: %s", conversation_id, timings)
         
         return {
             "conversation_id": conversation_id,
             "message": result["answer"],
             "sources": result["sources"],
-            "created_at": assistant_msg.created_at
+            "created_at": assistant_msg.created_at,
+            "timings": timings
+        }
+
+    
+    async def stream_message(
+        self,
+        db: AsyncSession,
+        company_id: int,
+        conversation_id: int,
+        user_message: str,
+        retrieval_mode: Optional[str] = None
+    ) -> AsyncIterator[dict]:
+        """
+        User message ka response tokens ki shakal mein stream karta hai
+        
+        Assistant message stream khatam hone ke baad save hota hai.
+        
+        Yields:
+            dicts with 'event' (sources, token, done) aur 'data'
+        """
+        
+        timer = StageTimer()
+        chat_history, prefetched = await self._start_turn(
+            db, company_id, conversation_id, user_message, retrieval_mode, timer
+        )
+        
+        sources = []
+        tokens = []
+        try:
+            async with timer.stage("answer"):
+                async for event in rag_service.stream_answer(
+                    company_id=company_id,
+                    question=user_message,
+                    chat_history=chat_history,
+                    retrieval_mode=retrieval_mode,
+                    prefetched=prefetched
+                ):
+                    if event["event"] == "sources":
+                        sources = event["data"]
+                    elif event["event"] == "token":
+                        tokens.append(event["data"])
+                    yield event
+        finally:
+            discard_task(prefetched)
+        
+        # Save assistant message
+        assistant_msg = Message(
+            conversation_id=conversation_id,
+            role="assistant",
+            content="".join(tokens),
+            sources_used=json.dumps(sources) if sources else None
+        )
+        db.add(assistant_msg)
+        await db.commit()
+        await db.refresh(assistant_msg)
+        
+        # Window se bahar gaye turns summary mein
+        history_manager.schedule_fold(conversation_id)
+        
+        yield {
+            "event": "done",
+            "data": {
+                "conversation_id": conversation_id,
+                "message_id": assistant_msg.id,
+                "created_at": assistant_msg.created_at.isoformat(),
+                "timings": timer.finish()
+            }
         }
 
 
@@ -0,0 +1,140 @@
+from langchain_core.messages import BaseMessage, HumanMessage
+from app.config import settings
+from typing import Dict, Hashable, List, Optional, Tuple
+import re
+import time
+
+CONDENSE_STRATEGIES = ("always", "heuristic", "concat_previous")
+
+# Follow-up ki nishaniyan - in ke baghair question history ke bina samajh aata hai
+REFERENCE_WORDS = {
+    "it", "its", "this", "that", "these", "those", "they", "them", "their",
+    "he", "she", "him", "her", "one", "ones", "same", "there", "above",
+    "previous", "earlier", "else", "also", "instead", "too"
+}
+FOLLOW_UP_PREFIXES = ("what about", "how about", "and ", "or ", "but ", "so ", "then ", "why not")
+MIN_SELF_CONTAINED_WORDS = 4
+
+PATHS = ("first_turn", "heuristic_skip", "condensed", "concat_previous")
+
+
+def is_self_contained(question: str) -> bool:
+    """
+    Sasta check - kya question history ke baghair samajh aata hai
+
+    Args:
+        question: Customer ka question
+
+    Returns:
+        True agar question mein pronouns/follow-up phrases nahi aur kaafi lamba hai
+    """
+    text = question.lower().strip()
+    words = re.findall(r"[a-z']+", text)
+    if len(words) < MIN_SELF_CONTAINED_WORDS:
+        return False
+    if text.startswith(FOLLOW_UP_PREFIXES):
+        return False
+    return not REFERENCE_WORDS.intersection(words)
+
+
+class QuestionCondenser:
+    """
+    Follow-up question ko condense karne ka faisla
+
+    - always: history ho to hamesha alag LLM call (purana behaviour)
+    - heuristic: self-contained question par LLM call skip
+    - concat_previous: condense call kabhi nahi - follow-up ki retrieval pichle
+      user message ke sath hoti hai aur answer prompt history dekh kar khud
+      reference resolve karta hai
+    """
+
+    def __init__(self, strategy: str = "heuristic"):
+        if strategy not in CONDENSE_STRATEGIES:
+            raise ValueError(f"Unsupported condense strategy: {strategy}")
+        self.strategy = strategy
+        self._counters: Dict[Hashable, Dict[str, int]] = {}
+        self._condense_seconds = 0.0
+        self._condense_calls = 0
+
+    def _count(self, company_id: Hashable, path: str) -> None:
+        counters = self._counters.setdefault(company_id, dict.fromkeys(PATHS, 0))
+        counters[path] += 1
+
+    async def condense(
+        self,
+        question: str,
+        chat_history: List[BaseMessage],
+        chat_history_str: str,
+        question_generator,
+        company_id: Optional[Hashable] = None
+    ) -> Tuple[str, str]:
+        """
+        Retrieval query aur answer prompt ka question decide karta hai
+
+        Args:
+            question: Customer ka question
+            chat_history: History messages
+            chat_history_str: Prompt format mein history
+            question_generator: Chain ka condense LLMChain
+            company_id: Telemetry kis company ke khaate mein jaye
+
+        Returns:
+            (retrieval_query, answer_question)
+        """
+        if not chat_history_str:
+            self._count(company_id, "first_turn")
+            return question, question
+
+        if self.strategy == "heuristic" and is_self_contained(question):
+            self._count(company_id, "heuristic_skip")
+            return question, question
+
+        if self.strategy == "concat_previous":
+            if is_self_contained(question):
+                self._count(company_id, "heuristic_skip")
+                return question, question
+            self._count(company_id, "concat_previous")
+            previous = next(
+                (m.content for m in reversed(chat_history) if isinstance(m, HumanMessage)),
+                ""
+            )
+            return f"{previous} {question}".strip(), question
+
+        self._count(company_id, "condensed")
+        start = time.perf_counter()
+        standalone_question = await question_generator.arun(
+            question=question,
+            chat_history=chat_history_str
+        )
+        self._condense_seconds += time.perf_counter() - start
+        self._condense_calls += 1
+        return standalone_question, standalone_question
+
+    def stats(self, company_id: Optional[Hashable] = None) -> dict:
+        """
+        Har path ke counters aur bachaya hua andaazan waqt
+
+        Args:
+            company_id: Di ho to sirf us company ke counters, warna total
+        """
+        if company_id is not None:
+            counters = dict(self._counters.get(company_id, dict.fromkeys(PATHS, 0)))
+        else:
+            counters = dict.fromkeys(PATHS, 0)
+            for company_counters in self._counters.values():
+                for path in PATHS:
+                    counters[path] += company_counters[path]
+
+        avg_latency = self._condense_seconds / self._condense_calls if self._condense_calls else 0.0
+        # Sirf wahi paths jahan history thi aur condense call nahi chali
+        skipped = counters["heuristic_skip"] + counters["concat_previous"]
+
+        counters["strategy"] = self.strategy
+        counters["avg_condense_latency_ms"] = round(avg_latency * 1000, 2)
+        # Har skip ek condense call jitna waqt bachata hai - latency sirf asal calls se naapi jati hai
+        counters["estimated_saved_ms"] = round(skipped * avg_latency * 1000, 2)
+        return counters
+
+
+# Global instance
+question_condenser = QuestionCondenser(strategy=settings.CONDENSE_STRATEGY)
@@ -0,0 +1,153 @@
+from langchain_core.documents import Document
+from app.config import settings
+from app.utils.helpers import count_tokens, truncate_tokens
+from typing import List, Optional, Set
+
+
+def strip_overlap(
+    previous: str,
+    following: str,
+    max_overlap: int = 400,
+    min_overlap: int = 20
+) -> str:
+    """
+    Adjacent chunk ke shuru se woh hissa hatata hai jo pichle chunk ke aakhir mein hai
+
+    Args:
+        previous: Pehla chunk
+        following: Agla chunk
+        max_overlap: Kitne characters tak overlap dhoondna hai
+        min_overlap: Is se chhota match ittefaq samjha jata hai
+
+    Returns:
+        Overlap ke baghair agla chunk
+    """
+    limit = min(len(previous), len(following), max_overlap)
+    for size in range(limit, min_overlap - 1, -1):
+        if previous.endswith(following[:size]):
+            return following[size:]
+    return following
+
+
+def shingles(text: str, size: int = 3) -> Set[tuple]:
+    """Text ke word n-grams - near-duplicate detection ke liye"""
+    words = text.lower().split()
+    if len(words) < size:
+        return {tuple(words)}
+    return {tuple(words[i:i + size]) for i in range(len(words) - size + 1)}
+
+
+def jaccard(a: Set[tuple], b: Set[tuple]) -> float:
+    """Do sets ki Jaccard similarity"""
+    if not a or not b:
+        return 0.0
+    return len(a & b) / len(a | b)
+
+
+class ContextAssembler:
+    """
+    Retrieval aur prompt ke beech context assembly
+
+    1. Same file ke adjacent chunks (chunk_index run) merge, overlap strip
+    2. Near-duplicate blocks drop (re-uploaded files)
+    3. Result token budget mein fit - top block budget se bada ho to kat kar
+       rakha jata hai, best evidence prompt se gayab nahi hoti
+    """
+
+    def __init__(
+        self,
+        token_budget: int = 2000,
+        duplicate_threshold: float = 0.9,
+        max_overlap: int = 400
+    ):
+        self.token_budget = token_budget
+        self.duplicate_threshold = duplicate_threshold
+        self.max_overlap = max_overlap
+
+    def assemble(self, docs: List[Document], token_budget: Optional[int] = None) -> List[Document]:
+        """
+        Retrieved chunks ko prompt-ready context blocks mein badalta hai
+
+        Args:
+            docs: Retriever ke documents (rank order mein)
+            token_budget: Override budget
+
+        Returns:
+            Merged, deduplicated blocks - best rank pehle
+        """
+        blocks = self._merge_adjacent(docs)
+        blocks = self._drop_near_duplicates(blocks)
+        return self._fit_budget(blocks, token_budget or self.token_budget)
+
+    def _merge_adjacent(self, docs: List[Document]) -> List[Document]:
+        # (rank, doc) - rank se final order decide hota hai
+        by_file = {}
+        passthrough = []
+        for rank, doc in enumerate(docs):
+            filename = doc.metadata.get("filename")
+            chunk_index = doc.metadata.get("chunk_index")
+            if filename is None or chunk_index is None:
+                passthrough.append((rank, doc))
+                continue
+            by_file.setdefault(filename, {}).setdefault(chunk_index, (rank, doc))
+
+        merged = list(passthrough)
+        for chunks in by_file.values():
+            run = []
+            for chunk_index in sorted(chunks):
+                if run and chunk_index != run[-1][0] + 1:
+                    merged.append(self._merge_run(run))
+                    run = []
+                run.append((chunk_index, *chunks[chunk_index]))
+            if run:
+                merged.append(self._merge_run(run))
+
+        merged.sort(key=lambda item: item[0])
+        return [doc for _, doc in merged]
+
+    def _merge_run(self, run: list) -> tuple:
+        """Consecutive chunks [(chunk_index, rank, doc), ...] ko ek block banata hai"""
+        best_rank = min(rank for _, rank, _ in run)
+        first = run[0][2]
+        text = first.page_content
+        for _, _, doc in run[1:]:
+            following = strip_overlap(text, doc.page_content, self.max_overlap)
+            # Overlap na mile to chunks ke beech newline - warna words jud jate hain
+            text += following if following != doc.page_content else "\n" + following
+
+        metadata = dict(first.metadata)
+        if len(run) > 1:
+            metadata["chunk_indexes"] = [chunk_index for chunk_index, _, _ in run]
+        return best_rank, Document(page_content=text, metadata=metadata)
+
+    def _drop_near_duplicates(self, blocks: List[Document]) -> List[Document]:
+        kept, kept_shingles = [], []
+        for block in blocks:
+            block_shingles = shingles(block.page_content)
+            if any(jaccard(block_shingles, other) >= self.duplicate_threshold for other in kept_shingles):
+                continue
+            kept.append(block)
+            kept_shingles.append(block_shingles)
+        return kept
+
+    def _fit_budget(self, blocks: List[Document], token_budget: int) -> List[Document]:
+        kept = []
+        for block in blocks:
+            cost = count_tokens(block.page_content)
+            if cost > token_budget and not kept:
+                # Sab se behtar block - chhod dene ki bajaye budget tak kaatte hain
+                content = truncate_tokens(block.page_content, token_budget)
+                block = Document(page_content=content, metadata={**block.metadata, "truncated": True})
+                cost = token_budget
+            if cost > token_budget:
+                continue
+            token_budget -= cost
+            kept.append(block)
+        return kept
+
+
+# Global instance
+context_assembler = ContextAssembler(
+    token_budget=settings.CONTEXT_TOKEN_BUDGET,
+    duplicate_threshold=settings.CONTEXT_DUPLICATE_THRESHOLD
+)
@@ -1,12 +1,28 @@
-from langchain_community.document_loaders import PyPDFLoader, Docx2txtLoader, TextLoader
-from langchain_text_splitters import RecursiveCharacterTextSplitter
+from langchain.text_splitter import RecursiveCharacterTextSplitter
+from app.core.document_parser import document_parser
 from app.core.vectorestore import vector_store
+from app.core.lexical_index import lexical_index
+from app.services.reg_service import rag_service
 from app.models.documents import Document
-from sqlmodel import Session
+from app.utils.logger import get_logger
+from sqlmodel import Session, select
+from sqlalchemy.exc import IntegrityError
+from collections import deque
+from contextlib import contextmanager
+from datetime import datetime
+from threading import Lock
+import hashlib
 import os
-from typing import List
+from typing import Callable, Dict, Iterator, List, Optional, Tuple
 import json
 
+logger = get_logger("documents")
+
+
+def chunk_hash(text: str) -> str:
+    """Chunk text ka sha256 - re-upload par unchanged chunks pehchanne ke liye"""
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
 
 class DocumentService:
     """Document processing service"""
@@ -18,6 +34,28 @@ class DocumentService:
             chunk_overlap=200,
             length_function=len
         )
+        
+        # (company_id, filename) -> [lock, users] - same document ke do versions is process
+        # mein ek sath nahi likhe jate. Aakhri user ke baad entry hat-ti hai (map bounded).
+        # Processes ke beech database ka unique index aur row lock (find_by_filename) guard hain.
+        self._document_locks: Dict[Tuple[int, str], list] = {}
+        self._locks_guard = Lock()
+    
+    @contextmanager
+    def document_lock(self, company_id: int, filename: str) -> Iterator[None]:
+        """Company ke logical document (filename) ka in-process lock"""
+        key = (company_id, filename)
+        with self._locks_guard:
+            entry = self._document_locks.setdefault(key, [Lock(), 0])
+            entry[1] += 1
+        try:
+            with entry[0]:
+                yield
+        finally:
+            with self._locks_guard:
+                entry[1] -= 1
+                if not entry[1]:
+                    del self._document_locks[key]
     
     def load_document(self, file_path: str, file_type: str) -> List[str]:
         """
@@ -31,24 +69,30 @@ class DocumentService:
             List of text chunks
         """
         
-        # File type ke hisab se loader
-        if file_type == "pdf":
-            loader = PyPDFLoader(file_path)
-        elif file_type == "docx":
-            loader = Docx2txtLoader(file_path)
-        elif file_type == "txt":
-            loader = TextLoader(file_path)
-        else:
-            raise ValueError(f"Unsupported file type: {file_type}")
-        
-        # Load document
-        documents = loader.load()
+        # Pages process pool mein parallel parse hote hain (order wahi)
+        documents = document_parser.load(file_path, file_type)
         
         # Split into chunks
         chunks = self.text_splitter.split_documents(documents)
         
         return chunks
     
+    def load_documents(self, files: List[Tuple[str, str]]) -> List[list]:
+        """
+        Kai files ek sath load karke chunks banata hai (bulk ingestion)
+        
+        Args:
+            files: [(file_path, file_type), ...]
+        
+        Returns:
+            Har file ke chunks - input order mein
+        """
+        
+        return [
+            self.text_splitter.split_documents(documents)
+            for documents in document_parser.load_many(files)
+        ]
+    
     def process_and_store(
         self, 
         db: Session,
@@ -56,11 +100,21 @@ class DocumentService:
         user_id: int,
         file_path: str, 
         filename: str,
-        file_type: str
+        file_type: str,
+        progress: Optional[Callable[[int, int], None]] = None,
+        content_hash: Optional[str] = None,
+        file_size: int = 0
     ) -> Document:
         """
         Document ko process karke vector store mein store karta hai
         
+        Company ka same filename wala active document pehle se ho to naya
+        document nahi banta - woh incremental update hota hai (update_document).
+        Document row commit na ho sake to likhe gaye vectors wapas nikalte hain
+        aur chunks lexical index mein nahi jate. Doosre worker ne beech mein
+        same filename ka document bana diya ho to unique index insert rokta hai
+        aur upload usi document ka update ban jata hai.
+        
         Args:
             db: Database session
             company_id: Company ID
@@ -68,6 +122,9 @@ class DocumentService:
             file_path: File path
             filename: Original filename
             file_type: File type
+            progress: progress(embedded_chunks, total_chunks) - default log karta hai
+            content_hash: File ka sha256 (duplicate uploads pehchanne ke liye)
+            file_size: File ka size bytes mein
         
         Returns:
             Document model instance
@@ -78,34 +135,277 @@ class DocumentService:
         
         # Prepare texts and metadata
         texts = [chunk.page_content for chunk in chunks]
-        metadatas = [
+        metadatas = self.chunk_metadatas(company_id, filename, len(chunks))
+        
+        if progress is None:
+            def progress(done: int, total: int) -> None:
+                logger.info("Embedded %s/%s chunks of %s (company %s)", done, total, filename, company_id)
+        
+        with self.document_lock(company_id, filename):
+            existing = self.find_by_filename(db, company_id, filename, for_update=True)
+            if existing:
+                return self.update_document(
+                    db, existing, texts, file_path,
+                    progress=progress, content_hash=content_hash, file_size=file_size
+                )
+            
+            # Store in vector database - batch by batch
+            vector_ids = vector_store.add_documents(company_id, texts, metadatas, progress=progress)
+            
+            # Create document record in SQL database - fail ho to vectors orphan na rahein
+            try:
+                document = Document(
+                    company_id=company_id,
+                    filename=filename,
+                    file_type=file_type,
+                    file_path=file_path,
+                    vector_ids=json.dumps(vector_ids),
+                    chunk_count=len(chunks),
+                    chunk_hashes=json.dumps([chunk_hash(text) for text in texts]),
+                    content_hash=content_hash,
+                    file_size=file_size,
+                    uploaded_by=user_id
+                )
+                
+                db.add(document)
+                db.commit()
+                db.refresh(document)
+            except IntegrityError:
+                # Doosre worker ne isi filename ka document pehle bana diya - us par update
+                db.rollback()
+                vector_store.delete_documents(company_id, vector_ids)
+                existing = self.find_by_filename(db, company_id, filename, for_update=True)
+                if existing is None:
+                    raise
+                return self.update_document(
+                    db, existing, texts, file_path,
+                    progress=progress, content_hash=content_hash, file_size=file_size
+                )
+            except Exception:
+                db.rollback()
+                vector_store.delete_documents(company_id, vector_ids)
+                raise
+            
+            # Same chunks BM25 index mein bhi (hybrid/lexical retrieval ke liye) - row committed hone ke baad
+            lexical_index.add(company_id, vector_ids, texts)
+            
+            # Company ka corpus badal gaya - prebuilt chain refresh karo
+            rag_service.invalidate(company_id)
+            
+            return document
+    
+    def chunk_metadatas(self, company_id: int, filename: str, count: int) -> List[dict]:
+        return [
             {
                 "filename": filename,
                 "chunk_index": i,
                 "company_id": company_id
             }
-            for i in range(len(chunks))
+            for i in range(count)
         ]
+    
+    def find_by_filename(
+        self,
+        db: Session,
+        company_id: int,
+        filename: str,
+        for_update: bool = False
+    ) -> Optional[Document]:
+        """
+        Company ka active document is filename ke sath (logical document key)
+        
+        Args:
+            for_update: Row lock (SELECT ... FOR UPDATE) - commit tak doosre
+                workers isi document ko update nahi kar sakte (sqlite par no-op)
+        
+        Returns:
+            Document ya None
+        """
+        
+        statement = select(Document).where(
+            Document.company_id == company_id,
+            Document.filename == filename,
+            Document.is_active == True
+        ).order_by(Document.id.desc())
+        if for_update:
+            statement = statement.with_for_update()
+        
+        return db.exec(statement).first()
+    
+    def update_document(
+        self,
+        db: Session,
+        document: Document,
+        texts: List[str],
+        file_path: str,
+        progress: Optional[Callable[[int, int], None]] = None,
+        content_hash: Optional[str] = None,
+        file_size: int = 0
+    ) -> Document:
+        """
+        Document ke naye version ke sirf badle hue chunks embed karta hai
+        
+        Naye chunks purane chunks se content hash par milaye jate hain:
+        unchanged chunks apne vector ids rakhte hain (sirf chunk_index badle
+        to metadata update), naye chunks embed hote hain aur hataye gaye
+        chunks ke vectors tombstone hote hain. Document row (vector_ids,
+        chunk_count, chunk_hashes) ek hi commit mein badalti hai - commit
+        fail ho to naye vectors wapas nikal diye jate hain aur purana version
+        waisa hi rehta hai.
         
-        # Store in vector database
-        vector_ids = vector_store.add_documents(company_id, texts, metadatas)
-        
-        # Create document record in SQL database
-        document = Document(
-            company_id=company_id,
-            filename=filename,
-            file_type=file_type,
-            file_path=file_path,
-            vector_ids=json.dumps(vector_ids),
-            chunk_count=len(chunks),
-            uploaded_by=user_id
+        Args:
+            db: Database session
+            document: Existing document (same company + filename)
+            texts: Naye version ke chunk texts
+            file_path: Naye version ki file
+            progress: progress(embedded_chunks, new_chunks)
+            content_hash: Nayi file ka sha256
+            file_size: Nayi file ka size bytes mein
+        
+        Returns:
+            Updated Document
+        """
+        
+        company_id = document.company_id
+        old_ids = json.loads(document.vector_ids or "[]")
+        old_hashes = self._stored_chunk_hashes(document, old_ids)
+        old_positions = {vector_id: i for i, vector_id in enumerate(old_ids)}
+        
+        # Hash -> purane vector ids (same text do dafa ho sakta hai)
+        available: Dict[str, deque] = {}
+        for vector_id, digest in zip(old_ids, old_hashes):
+            available.setdefault(digest, deque()).append(vector_id)
+        
+        hashes = [chunk_hash(text) for text in texts]
+        metadatas = self.chunk_metadatas(company_id, document.filename, len(texts))
+        vector_ids: List[Optional[str]] = []
+        added = []
+        for i, digest in enumerate(hashes):
+            reusable = available.get(digest)
+            if reusable:
+                vector_ids.append(reusable.popleft())
+            else:
+                vector_ids.append(None)
+                added.append(i)
+        removed = [vector_id for ids in available.values() for vector_id in ids]
+        moved = [i for i, vector_id in enumerate(vector_ids) if vector_id and old_positions[vector_id] != i]
+        
+        # Sirf naye chunks embed
+        new_ids = []
+        if added:
+            new_ids = vector_store.add_documents(
+                company_id,
+                [texts[i] for i in added],
+                [metadatas[i] for i in added],
+                progress=progress
+            )
+            for i, vector_id in zip(added, new_ids):
+                vector_ids[i] = vector_id
+        
+        try:
+            document.file_path = file_path
+            document.vector_ids = json.dumps(vector_ids)
+            document.chunk_count = len(texts)
+            document.chunk_hashes = json.dumps(hashes)
+            document.content_hash = content_hash
+            document.file_size = file_size
+            document.updated_at = datetime.utcnow()
+            db.add(document)
+            db.commit()
+            db.refresh(document)
+        except Exception:
+            db.rollback()
+            vector_store.delete_documents(company_id, new_ids)
+            raise
+        
+        # Naya version committed - ab purane chunks retrieval se bahar
+        vector_store.update_metadata(company_id, [vector_ids[i] for i in moved], [metadatas[i] for i in moved])
+        vector_store.delete_documents(company_id, removed)
+        if new_ids:
+            lexical_index.add(company_id, new_ids, [texts[i] for i in added])
+        lexical_index.remove(company_id, removed)
+        rag_service.invalidate(company_id)
+        
+        logger.info(
+            "Updated document %s (company %s): %s chunks kept, %s embedded, %s removed",
+            document.id, company_id, len(texts) - len(added), len(added), len(removed)
         )
+        return document
+    
+    def _stored_chunk_hashes(self, document: Document, vector_ids: List[str]) -> List[str]:
+        """Stored chunk hashes - purane documents (column se pehle) ke liye vector store ke texts se"""
+        if document.chunk_hashes:
+            return json.loads(document.chunk_hashes)
+        
+        stored = vector_store.get_by_ids(document.company_id, vector_ids)
+        return [
+            chunk_hash(stored[vector_id].page_content) if vector_id in stored else ""
+            for vector_id in vector_ids
+        ]
+
+    def find_duplicate(self, db: Session, company_id: int, content_hash: str) -> Optional[Document]:
+        """
+        Company ka active document jiska content same hai
+        
+        Deleted documents ke vectors tombstone ho chuke hain - unhein reuse
+        nahi kiya jata.
+        
+        Args:
+            db: Database session
+            company_id: Company ID
+            content_hash: Upload ka sha256
         
+        Returns:
+            Document ya None
+        """
+        
+        statement = select(Document).where(
+            Document.company_id == company_id,
+            Document.content_hash == content_hash,
+            Document.is_active == True
+        ).order_by(Document.id)
+        
+        return db.exec(statement).first()
+    
+    def register_duplicate(self, db: Session, document: Document) -> Document:
+        """
+        Duplicate upload count karta hai - parsing/embedding nahi hoti,
+        existing chunks aur vectors hi use hote hain
+        """
+        
+        document.duplicate_uploads += 1
         db.add(document)
         db.commit()
         db.refresh(document)
         
+        logger.info(
+            "Duplicate upload of document %s (company %s) - reused %s chunks",
+            document.id, document.company_id, document.chunk_count
+        )
         return document
+    
+    def delete_document(self, db: Session, document: Document) -> None:
+        """
+        Document ko soft delete karta hai aur uske chunks retrieval se nikalta hai
+        
+        Vectors tombstone hote hain (foran filter) - compaction job unhein
+        baad mein index se nikalta hai.
+        
+        Args:
+            db: Database session
+            document: Document model instance
+        """
+        
+        document.is_active = False
+        db.add(document)
+        db.commit()
+        
+        vector_ids = json.loads(document.vector_ids or "[]")
+        vector_store.delete_documents(document.company_id, vector_ids)
+        lexical_index.remove(document.company_id, vector_ids)
+        
+        # Company ka corpus badal gaya - prebuilt chain refresh karo
+        rag_service.invalidate(document.company_id)
 
 
 # Global instance
@@ -0,0 +1,165 @@
+from sqlmodel import select
+from sqlmodel.ext.asyncio.session import AsyncSession
+from langchain_core.messages import AIMessage, BaseMessage, HumanMessage, SystemMessage
+from app.core.database import async_engine
+from app.models.conversation import Conversation
+from app.models.message import Message
+from app.services.reg_service import rag_service
+from app.config import settings
+from app.utils.helpers import count_tokens
+from app.utils.logger import get_logger
+from typing import List, Optional
+import asyncio
+
+logger = get_logger("history")
+
+SUMMARY_PROMPT = """Progressively summarize the conversation between a customer and a support assistant.
+Add the new lines to the current summary and return one concise new summary.
+Keep names, order numbers, product codes and unresolved issues.
+
+Current summary:
+{summary}
+
+New lines of conversation:
+{new_lines}
+
+New summary:"""
+
+
+def fit_to_token_budget(messages: List[Message], budget: int) -> List[Message]:
+    """
+    Newest messages se shuru karke budget mein aane wale messages return karta hai
+
+    Args:
+        messages: Purane se naye order mein messages
+        budget: Token budget
+
+    Returns:
+        Budget mein aane wala sab se naya suffix (same order mein)
+    """
+    kept = []
+    for message in reversed(messages):
+        cost = count_tokens(message.content)
+        if cost > budget:
+            break
+        budget -= cost
+        kept.append(message)
+
+    kept.reverse()
+    return kept
+
+
+class HistoryManager:
+    """
+    Token-budgeted chat history
+
+    Prompt mein sirf rolling summary aur aakhri kuch turns jaate hain, is liye
+    har turn ka cost conversation ki lambai se independent rehta hai. Window se
+    bahar nikalne wale turns background mein summary mein fold hote hain.
+    """
+
+    def __init__(
+        self,
+        max_turns: int = 10,
+        token_budget: int = 1500,
+        fold_batch_size: int = 50
+    ):
+        self.max_turns = max_turns
+        self.token_budget = token_budget
+        self.fold_batch_size = fold_batch_size
+
+        self._folding: set = set()
+        self._tasks: set = set()
+
+    async def _load_window(self, db: AsyncSession, conversation: Conversation) -> List[Message]:
+        """Summary ke baad ke aakhri messages (bounded query) budget ke andar"""
+        statement = select(Message).where(Message.conversation_id == conversation.id)
+        if conversation.summarized_until_id:
+            statement = statement.where(Message.id > conversation.summarized_until_id)
+        statement = statement.order_by(Message.id.desc()).limit(self.max_turns * 2)
+
+        messages = list(reversed((await db.exec(statement)).all()))
+        budget = self.token_budget - count_tokens(conversation.summary or "")
+
+        return fit_to_token_budget(messages, max(budget, 0))
+
+    async def get_history(self, db: AsyncSession, conversation: Conversation) -> List[BaseMessage]:
+        """
+        Prompt ke liye history return karta hai
+
+        Returns:
+            [SystemMessage(summary)] + recent Human/AI messages
+        """
+        history: List[BaseMessage] = []
+        if conversation.summary:
+            history.append(SystemMessage(content=f"Summary of earlier conversation: {conversation.summary}"))
+
+        for message in await self._load_window(db, conversation):
+            if message.role == "user":
+                history.append(HumanMessage(content=message.content))
+            else:
+                history.append(AIMessage(content=message.content))
+
+        return history
+
+    def schedule_fold(self, conversation_id: int) -> None:
+        """Window se bahar gaye turns ko background mein summary mein fold karta hai"""
+        if conversation_id in self._folding:
+            return
+
+        self._folding.add(conversation_id)
+        task = asyncio.create_task(self.fold(conversation_id))
+        # Reference rakho warna task garbage collect ho sakta hai
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def fold(self, conversation_id: int) -> None:
+        """Summary aur window ke beech ke messages ko rolling summary mein daalta hai"""
+        self._folding.add(conversation_id)
+        try:
+            # Request ka session close ho chuka hoga - apna session
+            async with AsyncSession(async_engine, expire_on_commit=False) as db:
+                conversation = await db.get(Conversation, conversation_id)
+                if not conversation:
+                    return
+
+                kept = await self._load_window(db, conversation)
+
+                statement = select(Message).where(Message.conversation_id == conversation_id)
+                if conversation.summarized_until_id:
+                    statement = statement.where(Message.id > conversation.summarized_until_id)
+                if kept:
+                    statement = statement.where(Message.id < kept[0].id)
+                statement = statement.order_by(Message.id).limit(self.fold_batch_size)
+
+                old_messages = (await db.exec(statement)).all()
+                if not old_messages:
+                    return
+
+                conversation.summary = await self._summarize(conversation.summary, old_messages)
+                conversation.summarized_until_id = old_messages[-1].id
+                db.add(conversation)
+                await db.commit()
+        except Exception:
+            logger.exception("History fold failed for conversation %s", conversation_id)
+        finally:
+            self._folding.discard(conversation_id)
+
+    async def _summarize(self, summary: Optional[str], messages: List[Message]) -> str:
+        """LLM se purani summary + naye lines ki nayi summary banwata hai"""
+        new_lines = "\n".join(
+            f"{'Customer' if message.role == 'user' else 'Assistant'}: {message.content}"
+            for message in messages
+        )
+        prompt = SUMMARY_PROMPT.format(summary=summary or "(none)", new_lines=new_lines)
+
+        result = await rag_service.llm.ainvoke(prompt)
+        return result.content.strip()
+
+
+# Global instance
+history_manager = HistoryManager(
+    max_turns=settings.HISTORY_MAX_TURNS,
+    token_budget=settings.HISTORY_TOKEN_BUDGET,
+    fold_batch_size=settings.HISTORY_FOLD_BATCH_SIZE
+)
@@ -0,0 +1,362 @@
+from app.config import settings
+from app.core.database import engine
+from app.models.documents import Document
+from app.models.ingestion_job import IngestionJob
+from app.services.bulk_ingestion import BulkIngestion
+from app.services.document_service import document_service
+from app.utils.logger import get_logger
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+from sqlalchemy import update
+from sqlmodel import Session, select
+from threading import Event, Lock, Thread, Timer
+from typing import Deque, Dict, List, Optional
+import json
+import os
+
+logger = get_logger("ingestion")
+
+
+class IngestionQueue:
+    """
+    Document ingestion jobs ki in-process queue
+
+    Upload sirf file save karke job banata hai; workers (thread pool) job
+    chala kar DocumentService.process_and_store call karte hain. Har company
+    ke zyada se zyada max_per_company jobs ek waqt mein chalte hain aur
+    companies round-robin mein baari leti hain - ek tenant ka bara batch
+    doosron ko nahi rokta. Fail hone par job exponential backoff ke sath
+    dobara queue hota hai. Bulk uploads (submit_bulk) bhi isi queue mein ek
+    job ki shakal mein BulkIngestion pipeline chalate hain.
+
+    Job state database mein hai, is liye restart par adhoore jobs resume()
+    se dobara queue ho jate hain. Worker job ko atomic UPDATE se claim karta
+    hai (queued -> running) aur chalne ke dauran heartbeat deta hai; resume()
+    sirf woh running jobs wapas leta hai jin ki lease (heartbeat) khatam ho
+    chuki ho - doosre process ka chalta job dobara nahi chalta.
+    """
+
+    def __init__(self):
+        self.max_workers = settings.INGESTION_WORKERS
+        self.max_per_company = settings.INGESTION_MAX_JOBS_PER_COMPANY
+        self.max_attempts = settings.INGESTION_MAX_ATTEMPTS
+        self.retry_backoff = settings.INGESTION_RETRY_BACKOFF_SECONDS
+        self.lease_seconds = settings.INGESTION_LEASE_SECONDS
+
+        self.pool = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="ingestion")
+        self._pending: Dict[int, Deque[int]] = {}  # company_id -> job ids (insertion order = baari)
+        self._running: Dict[int, int] = {}
+        self._active = 0
+        self._lock = Lock()
+
+    def submit(
+        self,
+        db: Session,
+        company_id: int,
+        user_id: int,
+        file_path: str,
+        filename: str,
+        file_type: str,
+        content_hash: Optional[str] = None,
+        file_size: int = 0
+    ) -> IngestionJob:
+        """
+        Saved file ke liye job banata hai aur queue karta hai
+
+        Returns:
+            IngestionJob (status "queued")
+        """
+        job = IngestionJob(
+            company_id=company_id,
+            uploaded_by=user_id,
+            filename=filename,
+            file_type=file_type,
+            file_path=file_path,
+            content_hash=content_hash,
+            file_size=file_size
+        )
+        db.add(job)
+        db.commit()
+        db.refresh(job)
+
+        self._enqueue(company_id, job.id)
+        return job
+
+    def submit_bulk(self, db: Session, company_id: int, user_id: int, files: List[dict]) -> IngestionJob:
+        """
+        Blob store mein likhi files ke liye ek bulk job banata hai aur queue karta hai
+
+        Args:
+            files: collect_uploads() ka result
+
+        Returns:
+            IngestionJob (kind "bulk", status "queued") - report mukammal hone par job mein
+        """
+        job = IngestionJob(
+            company_id=company_id,
+            uploaded_by=user_id,
+            kind="bulk",
+            filename=f"{len(files)} files",
+            file_type="bulk",
+            file_path="",
+            payload=json.dumps(files),
+            file_size=sum(file["file_size"] for file in files)
+        )
+        db.add(job)
+        db.commit()
+        db.refresh(job)
+
+        self._enqueue(company_id, job.id)
+        return job
+
+    def find_pending(self, db: Session, company_id: int, content_hash: str) -> Optional[IngestionJob]:
+        """
+        Same content ka queued/running job - dobara upload naya job nahi banata
+
+        Returns:
+            IngestionJob ya None
+        """
+        return db.exec(
+            select(IngestionJob)
+            .where(
+                IngestionJob.company_id == company_id,
+                IngestionJob.content_hash == content_hash,
+                IngestionJob.status.in_(["queued", "running"])
+            )
+            .order_by(IngestionJob.id)
+        ).first()
+
+    def resume(self) -> int:
+        """
+        Startup par queued jobs aur lease khatam hue running jobs dobara queue karta hai
+
+        Running job ki heartbeat lease_seconds se purani na ho to woh kisi aur
+        worker ke paas hai - usay nahi chhedte.
+
+        Returns:
+            Kitne jobs resume hue
+        """
+        expired = datetime.utcnow() - timedelta(seconds=self.lease_seconds)
+        with Session(engine) as db:
+            jobs = db.exec(
+                select(IngestionJob)
+                .where(IngestionJob.status.in_(["queued", "running"]))
+                .order_by(IngestionJob.id)
+            ).all()
+
+            pending = []
+            for job in jobs:
+                if job.status == "running":
+                    # Reclaim bhi atomic - do processes ek sath resume karein to ek hi jeete
+                    reclaimed = db.execute(
+                        update(IngestionJob)
+                        .where(
+                            IngestionJob.id == job.id,
+                            IngestionJob.status == "running",
+                            IngestionJob.heartbeat_at.is_(None) | (IngestionJob.heartbeat_at < expired)
+                        )
+                        .values(status="queued")
+                    )
+                    if not reclaimed.rowcount:
+                        continue
+                pending.append((job.company_id, job.id))
+            db.commit()
+
+        for company_id, job_id in pending:
+            self._enqueue(company_id, job_id)
+
+        if pending:
+            logger.info("Resumed %s ingestion jobs", len(pending))
+        return len(pending)
+
+    def _claim(self, db: Session, job_id: int) -> bool:
+        """
+        Queued job ko atomic tareeqe se running karta hai
+
+        Returns:
+            True agar isi worker ne claim kiya (koi aur pehle le chuka ho to False)
+        """
+        now = datetime.utcnow()
+        claimed = db.execute(
+            update(IngestionJob)
+            .where(IngestionJob.id == job_id, IngestionJob.status == "queued")
+            .values(
+                status="running",
+                attempts=IngestionJob.attempts + 1,
+                started_at=now,
+                heartbeat_at=now
+            )
+        )
+        db.commit()
+        return claimed.rowcount == 1
+
+    def _heartbeat(self, job_id: int, stop: Event) -> None:
+        """Job chalne tak har lease_seconds/3 mein heartbeat_at update - lease zinda rehti hai"""
+        while not stop.wait(self.lease_seconds / 3):
+            try:
+                with Session(engine) as db:
+                    db.execute(
+                        update(IngestionJob)
+                        .where(IngestionJob.id == job_id, IngestionJob.status == "running")
+                        .values(heartbeat_at=datetime.utcnow())
+                    )
+                    db.commit()
+            except Exception:
+                logger.exception("Heartbeat for ingestion job %s failed", job_id)
+
+    def _enqueue(self, company_id: int, job_id: int) -> None:
+        with self._lock:
+            self._pending.setdefault(company_id, deque()).append(job_id)
+        self._dispatch()
+
+    def _dispatch(self) -> None:
+        """Khali workers ko companies ki baari aur cap ke hisab se jobs deta hai"""
+        started = []
+        with self._lock:
+            progress = True
+            while progress and self._active < self.max_workers:
+                progress = False
+                for company_id in list(self._pending):
+                    if self._active >= self.max_workers:
+                        break
+                    if self._running.get(company_id, 0) >= self.max_per_company:
+                        continue
+
+                    queue = self._pending.pop(company_id)
+                    job_id = queue.popleft()
+                    if queue:
+                        # Company baari ke aakhir mein
+                        self._pending[company_id] = queue
+
+                    self._running[company_id] = self._running.get(company_id, 0) + 1
+                    self._active += 1
+                    started.append((company_id, job_id))
+                    progress = True
+
+        for company_id, job_id in started:
+            self.pool.submit(self._run, company_id, job_id)
+
+    def _run(self, company_id: int, job_id: int) -> None:
+        try:
+            self._process(job_id)
+        except Exception:
+            logger.exception("Ingestion job %s crashed", job_id)
+        finally:
+            with self._lock:
+                self._running[company_id] -= 1
+                if not self._running[company_id]:
+                    del self._running[company_id]
+                self._active -= 1
+            self._dispatch()
+
+    def _process(self, job_id: int) -> None:
+        """Ek job chalata hai - status, progress aur retries database mein"""
+        with Session(engine) as db:
+            if not self._claim(db, job_id):
+                return
+            job = db.get(IngestionJob, job_id)
+
+            stop = Event()
+            Thread(target=self._heartbeat, args=(job_id, stop), name=f"ingestion-heartbeat-{job_id}", daemon=True).start()
+            try:
+                self._ingest(db, job)
+            finally:
+                stop.set()
+
+    def _ingest(self, db: Session, job: IngestionJob) -> None:
+        """Claimed job ka document banata hai - har failure retry/failed tak pohanchti hai"""
+        def progress(done: int, total: int) -> None:
+            job.chunks_done = done
+            job.chunks_total = total
+            job.heartbeat_at = datetime.utcnow()
+            db.add(job)
+            db.commit()
+
+        try:
+            if job.kind == "bulk":
+                # Retry par pehle se indexed files content hash se skip hoti hain
+                report = BulkIngestion(db, job.company_id, job.uploaded_by).run(json.loads(job.payload))
+                job.report = json.dumps(report)
+                self._finish(db, job, None)
+                return
+
+            # Retry ke dauran same file kisi aur job se document ban chuki ho
+            duplicate = None
+            if job.content_hash:
+                duplicate = document_service.find_duplicate(db, job.company_id, job.content_hash)
+            if duplicate is not None:
+                document_service.register_duplicate(db, duplicate)
+                document_id = duplicate.id
+            else:
+                document_id = document_service.process_and_store(
+                    db=db,
+                    company_id=job.company_id,
+                    user_id=job.uploaded_by,
+                    file_path=job.file_path,
+                    filename=job.filename,
+                    file_type=job.file_type,
+                    progress=progress,
+                    content_hash=job.content_hash,
+                    file_size=job.file_size
+                ).id
+        except Exception as e:
+            db.rollback()
+            self._handle_failure(db, job, e)
+            return
+
+        self._finish(db, job, document_id)
+
+    def _finish(self, db: Session, job: IngestionJob, document_id: Optional[int]) -> None:
+        job.status = "succeeded"
+        job.document_id = document_id
+        job.error = None
+        job.finished_at = datetime.utcnow()
+        db.add(job)
+        db.commit()
+        logger.info("Ingestion job %s finished: %s", job.id, f"document {document_id}" if document_id else job.filename)
+
+    def _handle_failure(self, db: Session, job: IngestionJob, error: Exception) -> None:
+        """Attempts baqi hon to backoff ke baad dobara queue, warna failed"""
+        job.error = str(error)
+
+        retry = job.attempts < self.max_attempts
+        job.status = "queued" if retry else "failed"
+        if not retry:
+            job.finished_at = datetime.utcnow()
+        db.add(job)
+        db.commit()
+
+        if retry:
+            delay = self.retry_backoff * 2 ** (job.attempts - 1)
+            logger.warning("Ingestion job %s failed (attempt %s), retrying in %ss: %s", job.id, job.attempts, delay, error)
+            timer = Timer(delay, self._enqueue, args=(job.company_id, job.id))
+            timer.daemon = True
+            timer.start()
+        else:
+            logger.error("Ingestion job %s failed after %s attempts: %s", job.id, job.attempts, error)
+            # Bulk job ki files apne documents ki hain (jo ban gaye) - blob store mein rehti hain
+            if job.kind != "bulk" and not self._file_in_use(db, job) and os.path.exists(job.file_path):
+                os.remove(job.file_path)
+
+    def _file_in_use(self, db: Session, job: IngestionJob) -> bool:
+        """Blob store ki file doosre documents/jobs (kisi bhi company) ki bhi ho sakti hai"""
+        document = db.exec(
+            select(Document.id).where(Document.file_path == job.file_path)
+        ).first()
+        other_job = db.exec(
+            select(IngestionJob.id).where(
+                IngestionJob.file_path == job.file_path,
+                IngestionJob.id != job.id,
+                IngestionJob.status.in_(["queued", "running"])
+            )
+        ).first()
+        return document is not None or other_job is not None
+
+    def shutdown(self) -> None:
+        """Naye jobs shuru nahi hote - adhoore jobs agle startup par resume hote hain"""
+        self.pool.shutdown(wait=False, cancel_futures=True)
+
+
+# Global instance
+ingestion_queue = IngestionQueue()
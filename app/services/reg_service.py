@@ -1,24 +1,44 @@
-from langchain_openai import ChatOpenAI
-# from langchain_community.chains import ConversationalRetrievalChain
-from langchain.chains import RetrievalQA
-
-from langchain_core import ConversationBufferMemory
-from langchain_core import PromptTemplate
+from langchain.chains import ConversationalRetrievalChain
+from langchain.chains.conversational_retrieval.base import _get_chat_history
+from langchain_core.messages import BaseMessage
+from langchain_core.prompts import PromptTemplate
+from langchain_core.retrievers import BaseRetriever
+from app.core.cache import LRUCache
+from app.core.llm import get_chat_model
+from app.core.retriever import CompanyRetriever, RETRIEVAL_MODES
+from app.core.singleflight import SingleFlight
+from app.services.answer_cache import answer_cache
+from app.services.condense_service import question_condenser
+from app.services.context_service import context_assembler
 from app.core.vectorestore import vector_store
 from app.config import settings
-from typing import List, Tuple
+from app.utils.helpers import normalize_question
+from typing import AsyncIterator, List, Optional
+import asyncio
+import hashlib
+
+
+def discard_task(task: Optional[asyncio.Future]) -> None:
+    """Istemal na hone wala task cancel karta hai aur uska exception retrieved mark karta hai"""
+    if task is None:
+        return
+    if not task.done():
+        task.cancel()
+    elif not task.cancelled():
+        task.exception()
+
+
+def history_fingerprint(chat_history: Optional[list]) -> str:
+    """Chat history ka chhota hash - coalescing key ke liye"""
+    return hashlib.sha1(_get_chat_history(chat_history or []).encode()).hexdigest()
 
 
 class RAGService:
     """RAG (Retrieval Augmented Generation) service"""
     
     def __init__(self):
-        # OpenAI LLM
-        self.llm = ChatOpenAI(
-            temperature=0.7,
-            model_name="gpt-3.5-turbo",
-            openai_api_key=settings.OPENAI_API_KEY
-        )
+        # Chat model - provider settings.LLM_PROVIDER se
+        self.llm = get_chat_model()
         
         # Custom prompt template
         self.prompt_template = """You are a helpful customer support assistant. 
@@ -32,12 +52,153 @@ Chat History: {chat_history}
 Customer Question: {question}
 
 Assistant Answer:"""
+        
+        # Prompt sab companies ke liye same hai - ek hi baar banate hain
+        self.qa_prompt = PromptTemplate(
+            template=self.prompt_template,
+            input_variables=["context", "chat_history", "question"]
+        )
+        
+        # Per-company chain registry (LRU) - key: (company_id, retrieval_mode)
+        self.chains = LRUCache(max_size=settings.RAG_CHAIN_CACHE_SIZE)
+        
+        # Identical in-flight questions ka coalescing
+        self.inflight = SingleFlight()
+    
+    def _build_chain(self, company_id: int, retrieval_mode: str) -> ConversationalRetrievalChain:
+        """Company ke liye retriever aur retrieval chain banata hai"""
+        retriever = CompanyRetriever(
+            company_id=company_id,
+            mode=retrieval_mode,
+            k=settings.RETRIEVAL_TOP_K,
+            candidates=settings.RETRIEVAL_HYBRID_CANDIDATES
+        )
+        return self.create_chain(retriever)
+    
+    def create_chain(self, retriever: BaseRetriever) -> ConversationalRetrievalChain:
+        """Diye gaye retriever par retrieval chain banata hai"""
+        # Memory chain mein nahi rakhte - history har request ke sath aati hai
+        return ConversationalRetrievalChain.from_llm(
+            llm=self.llm,
+            retriever=retriever,
+            return_source_documents=True,
+            combine_docs_chain_kwargs={"prompt": self.qa_prompt}
+        )
+    
+    def get_chain(
+        self,
+        company_id: int,
+        retrieval_mode: Optional[str] = None
+    ) -> ConversationalRetrievalChain:
+        """Company ki prebuilt chain return karta hai, na ho to bana deta hai"""
+        retrieval_mode = retrieval_mode or settings.RETRIEVAL_MODE
+        if retrieval_mode not in RETRIEVAL_MODES:
+            raise ValueError(f"Unsupported retrieval mode: {retrieval_mode}")
+        
+        return self.chains.get_or_create(
+            (company_id, retrieval_mode),
+            lambda: self._build_chain(company_id, retrieval_mode)
+        )
+    
+    def invalidate(self, company_id: int) -> None:
+        """Company ke documents change hone par uski chains aur cached answers drop karta hai"""
+        for retrieval_mode in RETRIEVAL_MODES:
+            self.chains.pop((company_id, retrieval_mode))
+        answer_cache.invalidate(company_id)
     
-    def get_answer(
+    def prefetch_documents(
+        self,
+        company_id: int,
+        question: str,
+        retrieval_mode: Optional[str] = None
+    ) -> Optional[asyncio.Task]:
+        """
+        Original question ki retrieval background task mein shuru karta hai
+        
+        History load aur DB writes ke sath parallel chalti hai; result
+        get_answer/stream_answer ko prefetched ki shakal mein diya jata hai
+        aur wahi task ke malik hain (istemal na ho to woh cancel karte hain).
+        
+        Answer cache mein exact hit ho to koi kaam shuru nahi hota (None).
+        
+        Returns:
+            Task jiska result (query embedding ya None, documents ya None) hai
+        """
+        if settings.ANSWER_CACHE_ENABLED and answer_cache.lookup_exact(company_id, question, count=False) is not None:
+            return None
+        
+        retriever = self.get_chain(company_id, retrieval_mode).retriever
+        return asyncio.ensure_future(self._prefetch(company_id, question, retriever))
+    
+    async def _prefetch(self, company_id: int, question: str, retriever: BaseRetriever) -> tuple:
+        """
+        Question ek dafa embed hota hai - wahi embedding cache lookup aur vector search dono mein
+        
+        Semantic cache hit ho to retrieval skip (documents None): pehle turn
+        ka answer cache se aayega, follow-up ho to _prepare_prompt isi
+        embedding se retrieval kar leta hai.
+        """
+        embedding = None
+        if settings.ANSWER_CACHE_ENABLED or getattr(retriever, "mode", "vector") != "lexical":
+            embedding = await vector_store.embeddings.aembed_query(question)
+        
+        if settings.ANSWER_CACHE_ENABLED and answer_cache.lookup_similar(company_id, embedding, count=False) is not None:
+            return embedding, None
+        
+        return embedding, await self._retrieve(retriever, question, embedding)
+    
+    async def _lookup_cached_answer(
+        self,
+        company_id: int,
+        question: str,
+        chat_history,
+        prefetched: Optional[asyncio.Future] = None
+    ) -> tuple:
+        """
+        Answer cache check karta hai
+        
+        Sirf pehle turn ke questions cache hote hain - follow-up ka answer
+        history par depend karta hai. Prefetch ne question embed kiya ho to
+        wahi embedding use hoti hai.
+        
+        Returns:
+            (cached_result ya None, query embedding ya None)
+        """
+        if not settings.ANSWER_CACHE_ENABLED or chat_history:
+            return None, None
+        
+        cached = answer_cache.lookup_exact(company_id, question)
+        if cached is not None:
+            return cached, None
+        
+        embedding = None
+        if prefetched is not None:
+            embedding, _ = await prefetched
+        if embedding is None:
+            embedding = await vector_store.embeddings.aembed_query(question)
+        return answer_cache.lookup_similar(company_id, embedding), embedding
+    
+    def _store_cached_answer(
+        self,
+        company_id: int,
+        question: str,
+        chat_history,
+        result: dict,
+        embedding
+    ) -> None:
+        """Pehle turn ka answer cache mein store karta hai"""
+        if not settings.ANSWER_CACHE_ENABLED or chat_history:
+            return
+        
+        answer_cache.store(company_id, question, result, embedding)
+    
+    async def get_answer(
         self, 
         company_id: int, 
         question: str, 
-        chat_history: List[Tuple[str, str]] = None
+        chat_history: List[BaseMessage] = None,
+        retrieval_mode: Optional[str] = None,
+        prefetched: Optional[asyncio.Task] = None
     ) -> dict:
         """
         Question ka answer return karta hai with sources
@@ -45,61 +206,200 @@ Assistant Answer:"""
         Args:
             company_id: Company ID
             question: Customer ka question
-            chat_history: Previous conversation [(user_msg, bot_msg), ...]
+            chat_history: Previous conversation (summary + recent messages)
+            retrieval_mode: vector, lexical ya hybrid (default: settings.RETRIEVAL_MODE)
+            prefetched: prefetch_documents ka task - question hi retrieval query ho to use hota hai
         
         Returns:
             dict with 'answer' and 'sources'
         """
         
-        # Vector store se relevant documents
-        vectorstore = vector_store.get_collection(company_id)
+        retrieval_mode = retrieval_mode or settings.RETRIEVAL_MODE
+        if not settings.COALESCE_ENABLED:
+            return await self._compute_answer(company_id, question, chat_history, retrieval_mode, prefetched)
         
-        # Memory for conversation
-        memory = ConversationBufferMemory(
-            memory_key="chat_history",
-            return_messages=True,
-            output_key="answer"
+        # Same question + same history ki concurrent requests ek hi computation share karti hain
+        key = (
+            company_id,
+            retrieval_mode,
+            normalize_question(question),
+            history_fingerprint(chat_history)
         )
         
-        # Add chat history to memory
-        if chat_history:
-            for user_msg, bot_msg in chat_history:
-                memory.save_context(
-                    {"input": user_msg},
-                    {"answer": bot_msg}
-                )
+        # Leader ka prefetch shared computation ka ho jata hai - leader disconnect
+        # ho to bhi cancel nahi hota (followers usi ka intezar kar rahe hain).
+        # Follower ka prefetch kabhi istemal nahi hota.
+        claimed = []
         
-        # Custom prompt
-        qa_prompt = PromptTemplate(
-            template=self.prompt_template,
-            input_variables=["context", "chat_history", "question"]
+        def compute():
+            claimed.append(True)
+            return self._compute_answer(company_id, question, chat_history, retrieval_mode, prefetched)
+        
+        try:
+            return await self.inflight.do(key, compute, company_id=company_id)
+        finally:
+            if not claimed:
+                discard_task(prefetched)
+    
+    async def _compute_answer(
+        self,
+        company_id: int,
+        question: str,
+        chat_history: List[BaseMessage],
+        retrieval_mode: str,
+        prefetched: Optional[asyncio.Task] = None
+    ) -> dict:
+        """
+        Cache lookup, retrieval aur LLM call - get_answer ka asal kaam
+        
+        prefetched task ki malik yahi computation hai - istemal na ho to cancel.
+        """
+        try:
+            cached, embedding = await self._lookup_cached_answer(company_id, question, chat_history, prefetched)
+            if cached is not None:
+                return cached
+            
+            docs, prompt = await self._prepare_prompt(
+                company_id, question, chat_history, retrieval_mode, prefetched, embedding
+            )
+        finally:
+            discard_task(prefetched)
+        
+        result = await self.llm.ainvoke(prompt)
+        
+        answer = {
+            "answer": result.content,
+            "sources": self._format_sources(docs)
+        }
+        self._store_cached_answer(company_id, question, chat_history, answer, embedding)
+        
+        return answer
+    
+    async def _prepare_prompt(
+        self,
+        company_id: int,
+        question: str,
+        chat_history: List[BaseMessage],
+        retrieval_mode: Optional[str],
+        prefetched: Optional[asyncio.Task] = None,
+        embedding: Optional[List[float]] = None
+    ) -> tuple:
+        """
+        Condensing, retrieval aur context assembly karke final prompt banata hai
+        
+        Prefetched documents tabhi use hote hain jab retrieval query original
+        question hi ho (first turn ya condensing skip); warna task cancel.
+        Answer cache lookup ki embedding bhi isi soorat mein vector search
+        mein dobara use hoti hai - question do dafa embed nahi hota.
+        
+        Returns:
+            (context documents, answer prompt)
+        """
+        qa_chain = self.get_chain(company_id, retrieval_mode)
+        chat_history_str = _get_chat_history(chat_history or [])
+        
+        # Follow-up ko standalone banana hai ya nahi - strategy decide karti hai
+        retrieval_query, answer_question = await question_condenser.condense(
+            question,
+            chat_history or [],
+            chat_history_str,
+            qa_chain.question_generator,
+            company_id=company_id
         )
         
-        # Conversational Retrieval Chain
-        qa_chain = ConversationalRetrievalChain.from_llm(
-            llm=self.llm,
-            retriever=vectorstore.as_retriever(search_kwargs={"k": 4}),
-            memory=memory,
-            return_source_documents=True,
-            combine_docs_chain_kwargs={"prompt": qa_prompt}
+        raw_docs = None
+        if prefetched is not None and retrieval_query == question:
+            embedding, raw_docs = await prefetched
+        else:
+            discard_task(prefetched)
+        
+        if raw_docs is None:
+            query_embedding = embedding if retrieval_query == question else None
+            raw_docs = await self._retrieve(qa_chain.retriever, retrieval_query, query_embedding)
+        
+        docs = context_assembler.assemble(raw_docs)
+        prompt = self.qa_prompt.format(
+            context="\n\n".join(doc.page_content for doc in docs),
+            chat_history=chat_history_str,
+            question=answer_question
         )
+        return docs, prompt
+    
+    async def _retrieve(self, retriever: BaseRetriever, query: str, embedding: Optional[List[float]] = None) -> list:
+        """CompanyRetriever ko query ki embedding deta hai; doosre retrievers sirf query se"""
+        if embedding is not None and isinstance(retriever, CompanyRetriever):
+            return await retriever.aget_documents(query, embedding)
+        return await retriever.aget_relevant_documents(query)
+    
+    async def stream_answer(
+        self,
+        company_id: int,
+        question: str,
+        chat_history: List[BaseMessage] = None,
+        retrieval_mode: Optional[str] = None,
+        prefetched: Optional[asyncio.Task] = None
+    ) -> AsyncIterator[dict]:
+        """
+        Answer ko tokens ki shakal mein stream karta hai
         
-        # Get answer
-        result = qa_chain({"question": question})
+        get_answer wala hi _prepare_prompt use hota hai taake streamed aur
+        non-streamed answers same hon.
         
-        # Extract sources
+        Args:
+            company_id: Company ID
+            question: Customer ka question
+            chat_history: Previous conversation (summary + recent messages)
+            retrieval_mode: vector, lexical ya hybrid (default: settings.RETRIEVAL_MODE)
+            prefetched: prefetch_documents ka task
+        
+        Yields:
+            {"event": "sources", "data": [...]} pehle, phir
+            {"event": "token", "data": "..."} har token ke liye
+        """
+        
+        try:
+            cached, embedding = await self._lookup_cached_answer(company_id, question, chat_history, prefetched)
+            if cached is not None:
+                yield {"event": "sources", "data": cached["sources"]}
+                yield {"event": "token", "data": cached["answer"]}
+                return
+            
+            docs, prompt = await self._prepare_prompt(
+                company_id, question, chat_history, retrieval_mode, prefetched, embedding
+            )
+        finally:
+            discard_task(prefetched)
+        
+        sources = self._format_sources(docs)
+        
+        # Sources pehle bhej dete hain
+        yield {"event": "sources", "data": sources}
+        
+        tokens = []
+        async for chunk in self.llm.astream(prompt):
+            if chunk.content:
+                tokens.append(chunk.content)
+                yield {"event": "token", "data": chunk.content}
+        
+        self._store_cached_answer(
+            company_id,
+            question,
+            chat_history,
+            {"answer": "".join(tokens), "sources": sources},
+            embedding
+        )
+    
+    def _format_sources(self, docs: list) -> List[dict]:
+        """Source documents ko response format mein convert karta hai"""
         sources = []
-        for doc in result.get("source_documents", []):
+        for doc in docs:
             sources.append({
                 "content": doc.page_content[:200],  # First 200 chars
                 "metadata": doc.metadata
             })
         
-        return {
-            "answer": result["answer"],
-            "sources": sources
-        }
+        return sources
 
 
 # Global instance
-rag_service = RAGService()
\ No newline at end of file
+rag_service = RAGService()
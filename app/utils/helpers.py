@@ -1,5 +1,7 @@
 from datetime import datetime
+from functools import lru_cache
 from typing import Optional
+import json
 import re
 
 
@@ -80,4 +82,81 @@ def truncate_text(text: str, max_length: int = 100) -> str:
     if len(text) <= max_length:
         return text
     
-    return text[:max_length - 3] + "..."
\ No newline at end of file
+    return text[:max_length - 3] + "..."
+
+
+@lru_cache(maxsize=1)
+def _get_token_encoding():
+    """tiktoken encoding load karta hai - na mile to None (offline environments)"""
+    try:
+        import tiktoken
+        return tiktoken.get_encoding("cl100k_base")
+    except Exception:
+        return None
+
+
+def count_tokens(text: str) -> int:
+    """
+    Text ke tokens count karta hai (gpt-3.5/4 tokenizer)
+    
+    Args:
+        text: Input text
+    
+    Returns:
+        Token count - tokenizer na ho to ~4 characters per token estimate
+    """
+    encoding = _get_token_encoding()
+    if encoding is None:
+        return (len(text) + 3) // 4
+    return len(encoding.encode(text))
+
+
+def truncate_tokens(text: str, max_tokens: int) -> str:
+    """
+    Text ko pehle max_tokens tokens tak kaatta hai
+    
+    Args:
+        text: Input text
+        max_tokens: Kitne tokens rakhne hain
+    
+    Returns:
+        Kata hua text - tokenizer na ho to ~4 characters per token
+    """
+    if max_tokens <= 0:
+        return ""
+    encoding = _get_token_encoding()
+    if encoding is None:
+        return text[:max_tokens * 4]
+    tokens = encoding.encode(text)
+    if len(tokens) <= max_tokens:
+        return text
+    return encoding.decode(tokens[:max_tokens])
+
+
+def normalize_question(question: str) -> str:
+    """
+    Question ko cache key ke liye normalize karta hai
+    (lowercase, punctuation remove, extra spaces collapse)
+    
+    Args:
+        question: Original question
+    
+    Returns:
+        Normalized question
+    """
+    question = re.sub(r'[^\w\s]', ' ', question.lower())
+    return " ".join(question.split())
+
+
+def format_sse(event: str, data) -> str:
+    """
+    Server-Sent Event frame banata hai
+    
+    Args:
+        event: Event name
+        data: Payload (JSON mein serialize hota hai)
+    
+    Returns:
+        SSE formatted string
+    """
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
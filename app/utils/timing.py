@@ -0,0 +1,43 @@
+from contextlib import asynccontextmanager
+from typing import Awaitable, Dict, TypeVar
+import time
+
+T = TypeVar("T")
+
+
+class StageTimer:
+    """
+    Request pipeline ke stages ka wall-clock time (milliseconds)
+
+    Parallel stages bhi apna apna time record karte hain; "total" se pata
+    chalta hai critical path kitna lamba tha.
+    """
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.timings: Dict[str, float] = {}
+
+    def _record(self, name: str, start: float) -> None:
+        self.timings[name] = round((time.perf_counter() - start) * 1000, 2)
+
+    @asynccontextmanager
+    async def stage(self, name: str):
+        """async with timer.stage("history"): ..."""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self._record(name, start)
+
+    async def track(self, name: str, awaitable: Awaitable[T]) -> T:
+        """Awaitable ko await karke uska time record karta hai (tasks ke liye)"""
+        start = time.perf_counter()
+        try:
+            return await awaitable
+        finally:
+            self._record(name, start)
+
+    def finish(self) -> Dict[str, float]:
+        """Total time record karke saari timings return karta hai"""
+        self._record("total", self.started)
+        return dict(self.timings)
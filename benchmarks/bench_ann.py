@@ -0,0 +1,99 @@
+"""
+IVF (approximate) vs exact flat search - recall@k aur latency benchmark
+
+Har corpus size par FlatIndex banata hai (IVF threshold se upar), phir har
+nprobe value ke liye recall@k (exact search ke muqable) aur p50/p99 latency
+report karta hai. Is se tenant ke size ke hisab se VECTOR_IVF_NPROBE chuna
+ja sakta hai.
+
+Data clustered synthetic vectors hain (real embeddings bhi topics mein
+jama hoti hain) - pure random vectors par IVF ki recall bemani hoti hai.
+
+Usage:
+    python -m benchmarks.bench_ann --sizes 50000,200000 --nprobe 4,8,16,32
+"""
+import argparse
+import os
+import tempfile
+import time
+from typing import List
+
+# Benchmark ko real credentials ki zaroorat nahi
+os.environ.setdefault("DATABASE_URL", "sqlite://")
+os.environ.setdefault("SECRET_KEY", "benchmark")
+os.environ.setdefault("OPENAI_API_KEY", "sk-benchmark")
+
+import numpy as np
+
+from app.core.flat_index import FlatIndex, normalize_rows
+
+INSERT_BATCH_SIZE = 10000
+
+
+def clustered_vectors(rng: np.random.Generator, centers: np.ndarray, count: int, spread: float) -> np.ndarray:
+    labels = rng.integers(0, len(centers), size=count)
+    noise = rng.standard_normal((count, centers.shape[1])).astype(np.float32) * spread / np.sqrt(centers.shape[1])
+    return normalize_rows(centers[labels] + noise)
+
+
+def measure(index: FlatIndex, queries: np.ndarray, k: int, **search_args) -> tuple:
+    """(result id lists, latencies in seconds)"""
+    results, latencies = [], []
+    for vector in queries:
+        start = time.perf_counter()
+        hits = index.search(vector, k, **search_args)
+        latencies.append(time.perf_counter() - start)
+        results.append([doc_id for doc_id, _, _ in hits])
+    return results, latencies
+
+
+def recall_at_k(approximate: List[List[str]], exact: List[List[str]]) -> float:
+    found = sum(len(set(a) & set(e)) for a, e in zip(approximate, exact))
+    return found / sum(len(e) for e in exact)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="IVF recall/latency vs exact search")
+    parser.add_argument("--sizes", default="50000,200000", help="Comma-separated corpus sizes")
+    parser.add_argument("--nprobe", default="4,8,16,32", help="Comma-separated nprobe values")
+    parser.add_argument("--dimensions", type=int, default=1536)
+    parser.add_argument("--clusters", type=int, default=500, help="Synthetic topics")
+    parser.add_argument("--spread", type=float, default=2.0, help="Topic ke andar noise")
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--k", type=int, default=4)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    centers = normalize_rows(rng.standard_normal((args.clusters, args.dimensions)).astype(np.float32))
+    queries = clustered_vectors(rng, centers, args.queries, args.spread)
+
+    print(f"dimensions={args.dimensions} clusters={args.clusters} queries={args.queries} k={args.k}")
+    print(f"{'vectors':>10}{'mode':>12}{'recall@k':>10}{'p50 ms':>10}{'p99 ms':>10}")
+
+    for size in (int(value) for value in args.sizes.split(",")):
+        with tempfile.TemporaryDirectory() as directory:
+            index = FlatIndex(directory, ann_threshold=0)
+            build_start = time.perf_counter()
+            for start in range(0, size, INSERT_BATCH_SIZE):
+                end = min(start + INSERT_BATCH_SIZE, size)
+                ids = [str(i) for i in range(start, end)]
+                index.add(ids, clustered_vectors(rng, centers, end - start, args.spread), ids, [{}] * (end - start))
+            build_seconds = time.perf_counter() - build_start
+            index.warm()
+
+            exact, latencies = measure(index, queries, args.k, exact=True)
+            rows = [("exact", 1.0, latencies)]
+            for nprobe in (int(value) for value in args.nprobe.split(",")):
+                approximate, latencies = measure(index, queries, args.k, nprobe=nprobe)
+                rows.append((f"nprobe={nprobe}", recall_at_k(approximate, exact), latencies))
+
+            for mode, recall, latencies in rows:
+                print(
+                    f"{size:>10}{mode:>12}{recall:>10.3f}"
+                    f"{np.percentile(latencies, 50) * 1000:>10.2f}{np.percentile(latencies, 99) * 1000:>10.2f}"
+                )
+            print(f"{size:>10}{'lists':>12}{len(index.ivf.centroids):>10}  build {build_seconds:.1f}s")
+
+
+if __name__ == "__main__":
+    main()
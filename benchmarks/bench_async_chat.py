@@ -0,0 +1,98 @@
+"""
+Sync vs async chat throughput benchmark
+
+Fake LLM (injected latency) ke against purana sync path (threadpool mein
+chain call) aur naya async path (RAGService.get_answer) compare karta hai.
+
+Usage:
+    python -m benchmarks.bench_async_chat --requests 500 --latency 0.5
+"""
+import argparse
+import asyncio
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, List
+
+# Benchmark ko real credentials ki zaroorat nahi
+os.environ.setdefault("DATABASE_URL", "sqlite://")
+os.environ.setdefault("SECRET_KEY", "benchmark")
+os.environ.setdefault("OPENAI_API_KEY", "sk-benchmark")
+os.environ.setdefault("LLM_PROVIDER", "fake")
+os.environ.setdefault("EMBEDDING_PROVIDER", "hashing")
+
+from langchain_core.documents import Document
+from langchain_core.retrievers import BaseRetriever
+
+from app.config import settings
+from app.core.llm import FakeChatModel
+from app.services.reg_service import RAGService
+
+# Starlette/AnyIO ka default threadpool size
+THREADPOOL_SIZE = 40
+
+
+class StaticRetriever(BaseRetriever):
+    """Hamesha same documents return karta hai - vector store ka kharcha nikal deta hai"""
+
+    docs: List[Document] = []
+
+    def _get_relevant_documents(self, query: str, *, run_manager: Any = None) -> List[Document]:
+        return self.docs
+
+    async def _aget_relevant_documents(self, query: str, *, run_manager: Any = None) -> List[Document]:
+        return self.docs
+
+
+def build_service(latency: float) -> RAGService:
+    """Fake LLM aur static retriever wala RAGService banata hai"""
+    settings.ANSWER_CACHE_ENABLED = False
+
+    service = RAGService()
+    service.llm = FakeChatModel(
+        latency=latency,
+        response="You can reset your password from the account settings page."
+    )
+    retriever = StaticRetriever(docs=[
+        Document(page_content="Passwords can be reset from Settings > Account.", metadata={"filename": "faq.txt"})
+    ])
+    service.chains.set((1, settings.RETRIEVAL_MODE), service.create_chain(retriever))
+    return service
+
+
+def run_sync(service: RAGService, questions: List[str]) -> float:
+    """Purana path - har request ek threadpool thread hold karti hai"""
+    chain = service.get_chain(1)
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=THREADPOOL_SIZE) as pool:
+        list(pool.map(lambda q: chain.invoke({"question": q, "chat_history": []}), questions))
+    return time.perf_counter() - start
+
+
+async def run_async(service: RAGService, questions: List[str]) -> float:
+    """Naya path - saari requests ek event loop par wait karti hain"""
+    start = time.perf_counter()
+    await asyncio.gather(*(service.get_answer(company_id=1, question=q) for q in questions))
+    return time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Sync vs async chat throughput")
+    parser.add_argument("--requests", type=int, default=500, help="Concurrent requests")
+    parser.add_argument("--latency", type=float, default=0.5, help="Fake LLM latency (seconds)")
+    args = parser.parse_args()
+
+    service = build_service(args.latency)
+    questions = [f"How do I reset my password? ({i})" for i in range(args.requests)]
+
+    sync_seconds = run_sync(service, questions)
+    async_seconds = asyncio.run(run_async(service, questions))
+
+    print(f"requests={args.requests} llm_latency={args.latency}s threadpool={THREADPOOL_SIZE}")
+    print(f"{'mode':<8}{'wall (s)':>12}{'req/s':>12}")
+    for mode, seconds in (("sync", sync_seconds), ("async", async_seconds)):
+        print(f"{mode:<8}{seconds:>12.2f}{args.requests / seconds:>12.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,109 @@
+"""
+PDF parsing benchmark - ek process vs process pool
+
+Synthetic multi-hundred-page PDF banata hai (har page par text ki lines)
+aur DocumentParser se workers=1 aur workers=N par parse karke time,
+pages/second aur speedup report karta hai. Pool ka startup (spawn) alag
+warmup run mein hota hai taake sirf parsing measure ho.
+
+Usage:
+    python -m benchmarks.bench_parsing --pages 400 --workers 1 2 4 8
+"""
+import argparse
+import os
+import tempfile
+import time
+
+# Benchmark ko real credentials ki zaroorat nahi
+os.environ.setdefault("DATABASE_URL", "sqlite://")
+os.environ.setdefault("SECRET_KEY", "benchmark")
+os.environ.setdefault("OPENAI_API_KEY", "sk-benchmark")
+
+from app.core.document_parser import DocumentParser
+
+WORDS = (
+    "refund shipping order account password invoice warranty delivery "
+    "support return policy payment subscription upgrade cancel billing"
+).split()
+
+
+def synthetic_pdf(path: str, pages: int, lines_per_page: int = 50) -> None:
+    """
+    Text pages wali PDF - reportlab ke baghair, seedha PDF objects likh kar
+
+    Har page ka text alag hai (page number + words) taake order check ho sake.
+    """
+    objects = [
+        b"<< /Type /Catalog /Pages 2 0 R >>",
+        None,  # Pages - kids maloom hone ke baad
+        b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>"
+    ]
+    kids = []
+    for page in range(pages):
+        lines = [
+            f"Page {page} line {line}: " + " ".join(WORDS[(page + line + i) % len(WORDS)] for i in range(10))
+            for line in range(lines_per_page)
+        ]
+        stream = "BT /F1 9 Tf 11 TL 36 806 Td " + " ".join(f"({text}) Tj T*" for text in lines) + " ET"
+        stream = stream.encode("latin-1")
+        objects.append(b"<< /Length %d >>\nstream\n%s\nendstream" % (len(stream), stream))
+        content_number = len(objects)
+        objects.append(
+            b"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 595 842] "
+            b"/Resources << /Font << /F1 3 0 R >> >> /Contents %d 0 R >>" % content_number
+        )
+        kids.append(len(objects))
+    objects[1] = b"<< /Type /Pages /Kids [%s] /Count %d >>" % (
+        b" ".join(b"%d 0 R" % kid for kid in kids), pages
+    )
+
+    with open(path, "wb") as f:
+        f.write(b"%PDF-1.4\n")
+        offsets = []
+        for number, body in enumerate(objects, start=1):
+            offsets.append(f.tell())
+            f.write(b"%d 0 obj\n%s\nendobj\n" % (number, body))
+        xref = f.tell()
+        f.write(b"xref\n0 %d\n0000000000 65535 f \n" % (len(objects) + 1))
+        for offset in offsets:
+            f.write(b"%010d 00000 n \n" % offset)
+        f.write(b"trailer\n<< /Size %d /Root 1 0 R >>\nstartxref\n%d\n%%%%EOF\n" % (len(objects) + 1, xref))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Parallel PDF parsing throughput")
+    parser.add_argument("--pages", type=int, default=400)
+    parser.add_argument("--lines", type=int, default=50, help="Har page par text lines")
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4, 8])
+    parser.add_argument("--pages-per-task", type=int, default=16)
+    parser.add_argument("--repeat", type=int, default=3, help="Har setting ke runs (best liya jata hai)")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "manual.pdf")
+        synthetic_pdf(path, args.pages, args.lines)
+        size_mb = os.path.getsize(path) / 1024 / 1024
+
+        print(f"pages={args.pages} size={size_mb:.1f}MB pages_per_task={args.pages_per_task} cpus={os.cpu_count()}")
+        print(f"{'workers':<10}{'seconds':>10}{'pages/s':>10}{'speedup':>10}")
+
+        baseline = None
+        for workers in args.workers:
+            document_parser = DocumentParser(workers=workers, pages_per_task=args.pages_per_task)
+            document_parser.load(path, "pdf")  # Warmup - pool spawn
+
+            best = float("inf")
+            for _ in range(args.repeat):
+                started = time.perf_counter()
+                documents = document_parser.load(path, "pdf")
+                best = min(best, time.perf_counter() - started)
+            document_parser.shutdown()
+
+            assert len(documents) == args.pages
+            assert documents[-1].metadata["page"] == args.pages - 1
+            baseline = baseline or best
+            print(f"{workers:<10}{best:>10.2f}{args.pages / best:>10.0f}{baseline / best:>9.2f}x")
+
+
+if __name__ == "__main__":
+    main()
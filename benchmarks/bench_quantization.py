@@ -0,0 +1,72 @@
+"""
+Quantized flat index storage - memory aur recall benchmark
+
+Same clustered vectors float32, float16 aur int8 (rerank ke sath aur
+baghair) FlatIndex mein likh kar har mode ka resident size, recall@k
+(float32 exact search ke muqable) aur p50/p99 latency report karta hai.
+
+Usage:
+    python -m benchmarks.bench_quantization --size 50000 --rerank 4
+"""
+import argparse
+import os
+import tempfile
+
+# Benchmark ko real credentials ki zaroorat nahi
+os.environ.setdefault("DATABASE_URL", "sqlite://")
+os.environ.setdefault("SECRET_KEY", "benchmark")
+os.environ.setdefault("OPENAI_API_KEY", "sk-benchmark")
+
+import numpy as np
+
+from app.core.flat_index import FlatIndex, normalize_rows
+from benchmarks.bench_ann import INSERT_BATCH_SIZE, clustered_vectors, measure, recall_at_k
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Quantized storage memory vs recall")
+    parser.add_argument("--size", type=int, default=50000)
+    parser.add_argument("--dimensions", type=int, default=1536)
+    parser.add_argument("--clusters", type=int, default=500, help="Synthetic topics")
+    parser.add_argument("--spread", type=float, default=2.0, help="Topic ke andar noise")
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--k", type=int, default=4)
+    parser.add_argument("--rerank", type=int, default=4, help="Rerank factor (k * N candidates)")
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    centers = normalize_rows(rng.standard_normal((args.clusters, args.dimensions)).astype(np.float32))
+    vectors = clustered_vectors(rng, centers, args.size, args.spread)
+    queries = clustered_vectors(rng, centers, args.queries, args.spread)
+    ids = [str(i) for i in range(args.size)]
+
+    modes = [
+        ("float32", "none", 0),
+        ("float16", "float16", 0),
+        ("int8", "int8", 0),
+        (f"int8+rerank{args.rerank}", "int8", args.rerank)
+    ]
+
+    print(f"vectors={args.size} dimensions={args.dimensions} queries={args.queries} k={args.k}")
+    print(f"{'mode':<16}{'MB':>10}{'bytes/vec':>11}{'recall@k':>10}{'p50 ms':>10}{'p99 ms':>10}")
+
+    exact = None
+    for name, quantization, rerank in modes:
+        with tempfile.TemporaryDirectory() as directory:
+            index = FlatIndex(directory, quantization=quantization, rerank_factor=rerank)
+            for start in range(0, args.size, INSERT_BATCH_SIZE):
+                end = min(start + INSERT_BATCH_SIZE, args.size)
+                index.add(ids[start:end], vectors[start:end], ids[start:end], [{}] * (end - start))
+            index.warm()
+
+            results, latencies = measure(index, queries, args.k)
+            exact = exact or results
+            print(
+                f"{name:<16}{index.nbytes() / 2 ** 20:>10.1f}{index.nbytes() // args.size:>11}"
+                f"{recall_at_k(results, exact):>10.3f}"
+                f"{np.percentile(latencies, 50) * 1000:>10.2f}{np.percentile(latencies, 99) * 1000:>10.2f}"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,114 @@
+"""
+Chroma vs flat (NumPy) vector backend query latency benchmark
+
+Har corpus size par dono backends mein same random normalized vectors
+likhta hai aur same queries chala kar p50/p99 latency compare karta hai.
+Embedding ka kharcha shamil nahi - sirf index query.
+
+Usage:
+    python -m benchmarks.bench_vector_backends --sizes 1000,10000,50000 --dimensions 1536
+"""
+import argparse
+import os
+import tempfile
+import time
+import uuid
+from typing import Callable, List
+
+# Benchmark ko real credentials ki zaroorat nahi
+os.environ.setdefault("DATABASE_URL", "sqlite://")
+os.environ.setdefault("SECRET_KEY", "benchmark")
+os.environ.setdefault("OPENAI_API_KEY", "sk-benchmark")
+
+import chromadb
+import numpy as np
+from chromadb.config import Settings as ChromaSettings
+
+from app.core.flat_index import FlatIndex, normalize_rows
+
+# Chroma ek add call mein itne se zyada records qabool nahi karta
+INSERT_BATCH_SIZE = 5000
+
+
+def random_vectors(rng: np.random.Generator, count: int, dimensions: int) -> np.ndarray:
+    return normalize_rows(rng.standard_normal((count, dimensions)).astype(np.float32))
+
+
+def percentile_ms(samples: List[float], percentile: float) -> float:
+    return float(np.percentile(samples, percentile)) * 1000
+
+
+def time_queries(query: Callable[[List[float]], object], queries: np.ndarray) -> List[float]:
+    samples = []
+    for vector in queries:
+        start = time.perf_counter()
+        query(vector.tolist())
+        samples.append(time.perf_counter() - start)
+    return samples
+
+
+def bench_size(size: int, dimensions: int, queries: np.ndarray, k: int, rng: np.random.Generator) -> dict:
+    vectors = random_vectors(rng, size, dimensions)
+    ids = [str(uuid.uuid4()) for _ in range(size)]
+    texts = [f"chunk {i}" for i in range(size)]
+    metadatas = [{"chunk_index": i} for i in range(size)]
+
+    with tempfile.TemporaryDirectory() as directory:
+        client = chromadb.PersistentClient(
+            path=os.path.join(directory, "chroma"),
+            settings=ChromaSettings(anonymized_telemetry=False)
+        )
+        collection = client.create_collection(f"company_{size}")
+        index = FlatIndex(os.path.join(directory, "flat"))
+
+        for start in range(0, size, INSERT_BATCH_SIZE):
+            end = min(start + INSERT_BATCH_SIZE, size)
+            batch = vectors[start:end].tolist()
+            collection.add(ids=ids[start:end], embeddings=batch, documents=texts[start:end], metadatas=metadatas[start:end])
+            index.add(ids[start:end], batch, texts[start:end], metadatas[start:end])
+
+        def chroma_query(vector):
+            return collection.query(query_embeddings=[vector], n_results=k, include=["documents", "metadatas", "distances"])
+
+        def flat_query(vector):
+            return index.search(vector, k)
+
+        # Pehli query index load karti hai - warm-up ke baad naapte hain
+        chroma_query(queries[0].tolist())
+        index.warm()
+
+        chroma = time_queries(chroma_query, queries)
+        flat = time_queries(flat_query, queries)
+
+    return {
+        "size": size,
+        "chroma_p50": percentile_ms(chroma, 50),
+        "chroma_p99": percentile_ms(chroma, 99),
+        "flat_p50": percentile_ms(flat, 50),
+        "flat_p99": percentile_ms(flat, 99)
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Chroma vs flat backend query latency")
+    parser.add_argument("--sizes", default="1000,10000,50000", help="Comma-separated corpus sizes")
+    parser.add_argument("--dimensions", type=int, default=1536)
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--k", type=int, default=4)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    queries = random_vectors(rng, args.queries, args.dimensions)
+
+    print(f"dimensions={args.dimensions} queries={args.queries} k={args.k}")
+    print(f"{'vectors':>10}{'chroma p50':>14}{'chroma p99':>14}{'flat p50':>12}{'flat p99':>12}  (ms)")
+    for size in (int(value) for value in args.sizes.split(",")):
+        row = bench_size(size, args.dimensions, queries, args.k, rng)
+        print(
+            f"{row['size']:>10}{row['chroma_p50']:>14.2f}{row['chroma_p99']:>14.2f}"
+            f"{row['flat_p50']:>12.2f}{row['flat_p99']:>12.2f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,44 @@
+"""
+Analytics endpoint access tests - process-wide stats sirf admin ke liye
+"""
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from app.api.deps import get_current_active_user
+from app.api.v1.analytices import router
+from app.models.user import User
+
+
+def make_client(is_admin: bool) -> TestClient:
+    """Sirf analytics router - auth override"""
+    app = FastAPI()
+    app.include_router(router, prefix="/api/v1")
+    app.dependency_overrides[get_current_active_user] = lambda: User(
+        id=1, email="agent@acme.test", hashed_password="x", full_name="Agent",
+        company_id=1, is_admin=is_admin
+    )
+    return TestClient(app)
+
+
+@pytest.mark.parametrize("path", ["/api/v1/analytics/vector-store", "/api/v1/analytics/embedding-cache"])
+def test_process_wide_stats_require_admin(path):
+    """Test non-admin ko sab companies ke totals nahi milte"""
+    response = make_client(is_admin=False).get(path)
+
+    assert response.status_code == 403
+
+
+def test_admin_reads_embedding_cache_stats():
+    """Test admin ko embedding cache stats milte hain"""
+    response = make_client(is_admin=True).get("/api/v1/analytics/embedding-cache")
+
+    assert response.status_code == 200
+    assert "enabled" in response.json()
+
+
+def test_coalescing_stats_open_to_company_users():
+    """Test coalescing stats company scoped hain - har user dekh sakta hai"""
+    response = make_client(is_admin=False).get("/api/v1/analytics/coalescing")
+
+    assert response.status_code == 200
+    assert response.json()["in_flight"] == 0
@@ -0,0 +1,100 @@
+"""
+Answer cache tests
+"""
+import pytest
+from app.services.answer_cache import AnswerCache
+
+
+def fake_embed(text: str):
+    """Refund wale questions ek hi direction mein embed hote hain"""
+    return [1.0, 0.0] if "refund" in text.lower() else [0.0, 1.0]
+
+
+@pytest.fixture
+def cache():
+    """Fresh answer cache"""
+    return AnswerCache(ttl_seconds=60, max_bytes=10_000, similarity_threshold=0.9)
+
+
+def test_exact_hit_on_normalized_question(cache):
+    """Test punctuation/case ka farq exact tier ko miss nahi karwata"""
+    cache.store(1, "How do I reset my password?", {"answer": "Click reset", "sources": []})
+    
+    result = cache.lookup_exact(1, "how do i reset my PASSWORD")
+    
+    assert result["answer"] == "Click reset"
+    assert cache.stats(1)["exact_hits"] == 1
+
+
+def test_semantic_hit_on_similar_question(cache):
+    """Test similar question semantic tier se milta hai"""
+    embedding = fake_embed("Refund policy?")
+    assert cache.lookup_exact(1, "Refund policy?") is None
+    assert cache.lookup_similar(1, embedding) is None
+    cache.store(1, "Refund policy?", {"answer": "30 days", "sources": []}, embedding)
+    
+    assert cache.lookup_exact(1, "Can I get a refund") is None
+    result = cache.lookup_similar(1, fake_embed("Can I get a refund"))
+    
+    assert result["answer"] == "30 days"
+    stats = cache.stats(1)
+    assert stats["semantic_hits"] == 1
+    assert stats["misses"] == 1
+
+
+def test_cache_is_per_company(cache):
+    """Test ek company ka answer doosri company ko nahi milta"""
+    cache.store(1, "Refund policy?", {"answer": "30 days", "sources": []})
+    
+    result = cache.lookup_exact(2, "Refund policy?")
+    
+    assert result is None
+
+
+def test_invalidate_drops_company_entries(cache):
+    """Test documents change hone par company ka cache clear hota hai"""
+    cache.store(1, "Refund policy?", {"answer": "30 days", "sources": []})
+    cache.store(2, "Refund policy?", {"answer": "14 days", "sources": []})
+    
+    cache.invalidate(1)
+    
+    assert cache.lookup_exact(1, "Refund policy?") is None
+    assert cache.lookup_exact(2, "Refund policy?")["answer"] == "14 days"
+
+
+def test_expired_entries_are_not_returned(cache):
+    """Test TTL ke baad entry miss hoti hai"""
+    cache.ttl_seconds = 0
+    cache.store(1, "Refund policy?", {"answer": "30 days", "sources": []})
+    
+    assert cache.lookup_exact(1, "Refund policy?") is None
+
+
+def test_memory_cap_evicts_least_recently_used(cache):
+    """Test memory cap se upar purani entries evict hoti hain"""
+    cache.max_bytes = 250
+    for i in range(5):
+        cache.store(1, f"question {i}", {"answer": "x" * 50, "sources": []})
+    
+    stats = cache.stats()
+    assert stats["bytes"] <= 250
+    assert stats["evictions"] > 0
+    assert cache.lookup_exact(1, "question 4") is not None
+    assert cache.lookup_exact(1, "question 0") is None
+
+
+def test_exact_hit_skips_retrieval_prefetch(cache):
+    """Test cache mein answer ho to prefetch embedding/retrieval shuru nahi karta"""
+    from unittest.mock import patch
+    from app.services.reg_service import rag_service
+    
+    cache.store(1, "Refund policy?", {"answer": "30 days", "sources": []})
+    
+    with patch("app.services.reg_service.answer_cache", cache), \
+            patch("app.services.reg_service.settings.ANSWER_CACHE_ENABLED", True), \
+            patch.object(rag_service, "get_chain") as get_chain:
+        assert rag_service.prefetch_documents(1, "refund policy") is None
+    
+    get_chain.assert_not_called()
+    # Peek hit count nahi karta - asal lookup get_answer mein hota hai
+    assert cache.stats(1)["exact_hits"] == 0
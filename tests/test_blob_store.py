@@ -0,0 +1,49 @@
+"""
+Content-addressed blob store aur upload dedupe stats tests
+"""
+import hashlib
+import io
+from sqlmodel import Session, SQLModel, create_engine
+from app.core.blob_store import BlobStore
+from app.models.company import Company  # noqa: F401 - foreign key tables
+from app.models.user import User  # noqa: F401
+from app.models.documents import Document
+from app.services.analytics_service import analytics_service
+
+
+def test_same_bytes_stored_once(tmp_path):
+    """Test chunked write sahi sha256 deta hai aur dobara upload nayi file nahi banata"""
+    store = BlobStore(str(tmp_path), chunk_bytes=7)
+    data = b"refund policy is 30 days\n" * 10
+
+    digest, path, size = store.save(io.BytesIO(data))
+    again = store.save(io.BytesIO(data))
+
+    assert digest == hashlib.sha256(data).hexdigest()
+    assert size == len(data)
+    assert again == (digest, path, size)
+    assert open(path, "rb").read() == data
+    assert list((tmp_path / "tmp").iterdir()) == []
+
+
+def test_upload_dedupe_stats():
+    """Test duplicate uploads ke bytes aur chunks company ke stats mein"""
+    engine = create_engine("sqlite://")
+    SQLModel.metadata.create_all(engine)
+
+    with Session(engine) as db:
+        db.add(Document(company_id=1, filename="faq.pdf", file_type="pdf", file_path="x",
+                        file_size=1000, chunk_count=12, duplicate_uploads=2, uploaded_by=1))
+        db.add(Document(company_id=1, filename="terms.txt", file_type="txt", file_path="y",
+                        file_size=50, chunk_count=1, uploaded_by=1))
+        db.add(Document(company_id=2, filename="faq.pdf", file_type="pdf", file_path="x",
+                        file_size=1000, chunk_count=12, duplicate_uploads=5, uploaded_by=1))
+        db.commit()
+
+        stats = analytics_service.get_upload_stats(db, company_id=1)
+
+    assert stats["documents"] == 2
+    assert stats["duplicate_uploads"] == 2
+    assert stats["bytes_saved"] == 2000
+    assert stats["chunks_reused"] == 24
+    assert stats["dedupe_ratio"] == 0.5
@@ -0,0 +1,147 @@
+"""
+Bulk ingestion pipeline tests
+"""
+import io
+import json
+import os
+import zipfile
+import pytest
+from unittest.mock import Mock, patch
+from sqlmodel import Session, SQLModel, create_engine, select
+
+from app.core.blob_store import BlobStore
+from app.models.company import Company  # noqa: F401 - foreign key tables
+from app.models.user import User  # noqa: F401
+from app.models.documents import Document
+from app.services.bulk_ingestion import BulkIngestion, collect_uploads
+
+
+@pytest.fixture
+def db():
+    engine = create_engine("sqlite://")
+    SQLModel.metadata.create_all(engine)
+    with Session(engine) as session:
+        yield session
+
+
+@pytest.fixture
+def vector_store(tmp_path):
+    store = Mock(embedding_batch_size=2, embedding_concurrency=2)
+    store.embed_batch.side_effect = lambda texts: [[1.0, 0.0]] * len(texts)
+    with patch("app.services.bulk_ingestion.vector_store", store), \
+            patch("app.services.bulk_ingestion.blob_store", BlobStore(str(tmp_path), 1024)), \
+            patch("app.services.bulk_ingestion.lexical_index"), \
+            patch("app.services.bulk_ingestion.rag_service"):
+        yield store
+
+
+def uploads():
+    archive = io.BytesIO()
+    with zipfile.ZipFile(archive, "w") as z:
+        z.writestr("manuals/setup.txt", "install the router")
+        z.writestr("manuals/reset.txt", "hold the button")
+        z.writestr("__MACOSX/._setup.txt", "junk")
+    archive.seek(0)
+    return [
+        (archive, "onboarding.zip"),
+        (io.BytesIO(b"refund policy is 30 days"), "faq.txt"),
+        (io.BytesIO(b"refund policy is 30 days"), "faq-copy.txt")
+    ]
+
+
+def test_zip_and_files_ingested_with_stage_stats(db, vector_store):
+    """Test zip members + files ek pipeline mein, duplicate skip aur har stage ke counts"""
+    files = collect_uploads(uploads())
+    report = BulkIngestion(db, company_id=1, user_id=1).run(files)
+
+    documents = db.exec(select(Document).order_by(Document.id)).all()
+    assert [document.filename for document in documents] == ["manuals/setup.txt", "manuals/reset.txt", "faq.txt"]
+    assert all(len(json.loads(document.vector_ids)) == document.chunk_count == 1 for document in documents)
+
+    assert report["documents_created"] == 3
+    assert report["duplicates_skipped"] == 1
+    assert report["stages"]["parse"]["items"] == 3
+    assert report["stages"]["store"]["items"] == 3
+    assert report["stages"]["insert"]["items"] == 3
+    # Batch size 2 - chunks files ki hadd se bahar batch hote hain
+    assert sorted(len(call.args[0]) for call in vector_store.embed_batch.call_args_list) == [1, 2]
+
+
+def existing_faq():
+    return Document(company_id=1, filename="faq.txt", file_type="txt", file_path="old", uploaded_by=1, vector_ids="[]")
+
+
+def test_filename_created_during_run_becomes_update(db, vector_store):
+    """Test pipeline ke dauran single upload ne same filename bana diya to bulk doosra document nahi banata"""
+    original = BulkIngestion._classify
+    
+    def classify_then_upload(self, files):
+        result = original(self, files)
+        db.add(existing_faq())
+        db.commit()
+        return result
+    
+    files = collect_uploads(uploads())
+    with patch.object(BulkIngestion, "_classify", classify_then_upload), \
+            patch("app.services.bulk_ingestion.document_service.process_and_store") as process_and_store:
+        report = BulkIngestion(db, company_id=1, user_id=1).run(files)
+    
+    faqs = db.exec(select(Document).where(Document.filename == "faq.txt")).all()
+    assert len(faqs) == 1 and faqs[0].file_path == "old"
+    assert report["documents_created"] == 2
+    assert report["documents_updated"] == 1
+    assert process_and_store.call_args.kwargs["filename"] == "faq.txt"
+    # faq ke liye likhe gaye vectors wapas nikle
+    faq_ids = vector_store.delete_documents.call_args.args[1]
+    assert len(faq_ids) == 1
+
+
+def test_unique_index_conflict_inserts_rest(db, vector_store):
+    """Test doosre process ki row batch INSERT rok de to baqi rows ek ek karke bante hain"""
+    add_all = db.add_all
+    
+    def add_all_after_other_process(documents):
+        db.add(existing_faq())
+        db.commit()
+        add_all(documents)
+    
+    files = collect_uploads(uploads())
+    with patch.object(db, "add_all", side_effect=add_all_after_other_process), \
+            patch("app.services.bulk_ingestion.document_service.process_and_store"):
+        report = BulkIngestion(db, company_id=1, user_id=1).run(files)
+    
+    filenames = sorted(document.filename for document in db.exec(select(Document)).all())
+    assert filenames == ["faq.txt", "manuals/reset.txt", "manuals/setup.txt"]
+    assert report["documents_created"] == 2
+    assert report["documents_updated"] == 1
+
+
+def test_embedding_failure_rolls_back_vectors(db, vector_store):
+    """Test embed stage fail ho to likhe gaye vectors tombstone aur koi document row nahi"""
+    vector_store.embed_batch.side_effect = [[[1.0, 0.0]] * 2, RuntimeError("provider down")]
+    vector_store.embedding_concurrency = 1
+    files = collect_uploads(uploads())
+
+    with pytest.raises(RuntimeError):
+        BulkIngestion(db, company_id=1, user_id=1).run(files)
+
+    # Pehla batch store ho chuka ho ya nahi - jo likha gaya wahi wapas nikalta hai
+    written = [vector_id for call in vector_store.write_embeddings.call_args_list for vector_id in call.args[1]]
+    vector_store.delete_documents.assert_called_once_with(1, written)
+    assert db.exec(select(Document)).all() == []
+
+
+def test_zip_extraction_size_limited(tmp_path):
+    """Test zip ka kul uncompressed size hadd se upar ho to kuch extract nahi hota"""
+    archive = io.BytesIO()
+    with zipfile.ZipFile(archive, "w", zipfile.ZIP_DEFLATED) as z:
+        z.writestr("big.txt", "a" * 5000)
+    archive.seek(0)
+    
+    with patch("app.services.bulk_ingestion.blob_store", BlobStore(str(tmp_path), 1024)), \
+            patch("app.services.bulk_ingestion.settings.BULK_MAX_EXTRACT_BYTES", 4096):
+        with pytest.raises(ValueError):
+            collect_uploads([(archive, "bomb.zip")])
+    
+    # Koi blob nahi likha gaya
+    assert os.listdir(tmp_path) == ["tmp"]
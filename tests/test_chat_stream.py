@@ -0,0 +1,103 @@
+"""
+Chat streaming (SSE) endpoint tests
+"""
+import json
+import pytest
+from unittest.mock import patch
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy.ext.asyncio import create_async_engine
+from sqlmodel import Session, SQLModel, create_engine, select
+from sqlmodel.ext.asyncio.session import AsyncSession
+from app.api.deps import get_current_active_user
+from app.api.v1.chat import router
+from app.core.database import get_async_session
+from app.models.company import Company
+from app.models.conversation import Conversation  # noqa: F401 - tables
+from app.models.message import Message
+from app.models.user import User
+from app.services.reg_service import rag_service
+
+
+@pytest.fixture
+def db_url(tmp_path):
+    """File-based sqlite - TestClient ka event loop apna aiosqlite connection kholta hai"""
+    path = tmp_path / "chat.db"
+    engine = create_engine(f"sqlite:///{path}")
+    SQLModel.metadata.create_all(engine)
+    with Session(engine) as db:
+        db.add(Company(id=1, name="Acme", domain="acme"))
+        db.add(User(id=1, email="agent@acme.test", hashed_password="x", full_name="Agent", company_id=1))
+        db.commit()
+    return f"sqlite:///{path}"
+
+
+@pytest.fixture
+def client(db_url):
+    """Sirf chat router - auth aur async session override"""
+    app = FastAPI()
+    app.include_router(router, prefix="/api/v1")
+    async_engine = create_async_engine(db_url.replace("sqlite://", "sqlite+aiosqlite://"))
+
+    async def session():
+        async with AsyncSession(async_engine, expire_on_commit=False) as db:
+            yield db
+
+    app.dependency_overrides[get_async_session] = session
+    app.dependency_overrides[get_current_active_user] = lambda: User(
+        id=1, email="agent@acme.test", hashed_password="x", full_name="Agent", company_id=1
+    )
+
+    with patch.object(rag_service, "prefetch_documents", return_value=None), \
+            patch("app.services.chat_service.history_manager.schedule_fold"):
+        yield TestClient(app)
+
+
+def parse_events(body: str) -> list:
+    """SSE body ko (event, data) pairs mein todta hai"""
+    events = []
+    for block in body.strip().split("\n\n"):
+        fields = dict(line.split(": ", 1) for line in block.splitlines())
+        events.append((fields["event"], json.loads(fields["data"])))
+    return events
+
+
+def test_stream_sends_sources_tokens_then_done(client, db_url):
+    """Test events ka order sources -> token -> done aur answer save hota hai"""
+    async def fake_stream(**kwargs):
+        yield {"event": "sources", "data": [{"filename": "faq.txt"}]}
+        yield {"event": "token", "data": "Hi"}
+        yield {"event": "token", "data": " there"}
+
+    with patch.object(rag_service, "stream_answer", side_effect=fake_stream):
+        response = client.post("/api/v1/chat/message/stream", json={"message": "Hello"})
+
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/event-stream")
+    events = parse_events(response.text)
+    assert [event for event, _ in events] == ["sources", "token", "token", "done"]
+    assert events[0][1] == [{"filename": "faq.txt"}]
+
+    done = events[-1][1]
+    with Session(create_engine(db_url)) as db:
+        saved = db.get(Message, done["message_id"])
+        assert saved.role == "assistant" and saved.content == "Hi there"
+
+
+def test_stream_failure_sends_error_event(client, db_url):
+    """Test beech mein failure error event ban kar aata hai aur adhoora answer save nahi hota"""
+    async def failing_stream(**kwargs):
+        yield {"event": "sources", "data": []}
+        yield {"event": "token", "data": "Hi"}
+        raise RuntimeError("LLM down")
+
+    with patch.object(rag_service, "stream_answer", side_effect=failing_stream):
+        response = client.post("/api/v1/chat/message/stream", json={"message": "Hello"})
+
+    events = parse_events(response.text)
+    assert [event for event, _ in events] == ["sources", "token", "error"]
+    assert events[-1][1] == {"detail": "LLM down"}
+
+    with Session(create_engine(db_url)) as db:
+        roles = db.exec(select(Message.role)).all()
+        assert roles == ["user"]
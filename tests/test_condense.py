@@ -0,0 +1,87 @@
+"""
+Question condensing strategy tests
+"""
+import asyncio
+import pytest
+from unittest.mock import AsyncMock, Mock
+from langchain_core.messages import AIMessage, HumanMessage
+from app.services.condense_service import QuestionCondenser, is_self_contained
+
+HISTORY = [
+    HumanMessage(content="Tell me about the premium plan"),
+    AIMessage(content="Premium costs $20 per month")
+]
+HISTORY_STR = "\nHuman: Tell me about the premium plan\nAssistant: Premium costs $20 per month"
+
+
+def make_generator():
+    generator = Mock()
+    generator.arun = AsyncMock(return_value="Can I cancel the premium plan anytime?")
+    return generator
+
+
+def test_is_self_contained():
+    """Test pronouns aur chhote follow-ups self-contained nahi"""
+    assert is_self_contained("How do I reset my account password?")
+    assert not is_self_contained("Can I cancel it anytime?")
+    assert not is_self_contained("What about shipping costs?")
+    assert not is_self_contained("And refunds?")
+
+
+def test_first_turn_never_condenses():
+    """Test history ke baghair LLM call nahi hoti"""
+    condenser = QuestionCondenser("always")
+    generator = make_generator()
+
+    result = asyncio.run(condenser.condense("Can I cancel it?", [], "", generator, company_id=1))
+
+    assert result == ("Can I cancel it?", "Can I cancel it?")
+    generator.arun.assert_not_called()
+    assert condenser.stats(1)["first_turn"] == 1
+
+
+def test_heuristic_skips_only_self_contained_questions():
+    """Test heuristic strategy sirf follow-up par condense karti hai"""
+    condenser = QuestionCondenser("heuristic")
+    generator = make_generator()
+
+    asyncio.run(condenser.condense("How do I reset my account password?", HISTORY, HISTORY_STR, generator, 1))
+    query, question = asyncio.run(condenser.condense("Can I cancel it anytime?", HISTORY, HISTORY_STR, generator, 1))
+
+    assert query == question == "Can I cancel the premium plan anytime?"
+    assert generator.arun.call_count == 1
+    stats = condenser.stats(1)
+    assert stats["heuristic_skip"] == 1
+    assert stats["condensed"] == 1
+
+
+def test_concat_previous_uses_previous_turn_for_retrieval():
+    """Test concat_previous strategy alag call ke baghair pichla user message retrieval mein jodti hai"""
+    condenser = QuestionCondenser("concat_previous")
+    generator = make_generator()
+
+    query, question = asyncio.run(condenser.condense("Can I cancel it anytime?", HISTORY, HISTORY_STR, generator, 1))
+
+    assert query == "Tell me about the premium plan Can I cancel it anytime?"
+    assert question == "Can I cancel it anytime?"
+    generator.arun.assert_not_called()
+    assert condenser.stats()["concat_previous"] == 1
+
+
+def test_concat_previous_counts_self_contained_as_skip():
+    """Test concat_previous mein self-contained question heuristic_skip mein ginta hai, concat mein nahi"""
+    condenser = QuestionCondenser("concat_previous")
+    generator = make_generator()
+
+    query, _ = asyncio.run(condenser.condense("How do I reset my account password?", HISTORY, HISTORY_STR, generator, 1))
+
+    assert query == "How do I reset my account password?"
+    stats = condenser.stats(1)
+    assert stats["heuristic_skip"] == 1
+    assert stats["concat_previous"] == 0
+
+
+def test_unknown_strategy_rejected():
+    """Test ghalat strategy par error"""
+    with pytest.raises(ValueError):
+        QuestionCondenser("sometimes")
@@ -0,0 +1,86 @@
+"""
+Context assembly tests
+"""
+import pytest
+from langchain_core.documents import Document
+from app.services.context_service import ContextAssembler, strip_overlap
+from app.utils.helpers import count_tokens
+
+OVERLAP = "the warranty covers manufacturing defects for two years "
+
+
+def chunk(text, filename="faq.pdf", index=0):
+    """Retriever jaisa chunk banata hai"""
+    return Document(page_content=text, metadata={"filename": filename, "chunk_index": index})
+
+
+def test_strip_overlap_removes_shared_text():
+    """Test adjacent chunk ka overlap sirf ek baar rehta hai"""
+    first = "Intro text. " + OVERLAP
+    second = OVERLAP + "and batteries for one year."
+    
+    assert strip_overlap(first, second) == "and batteries for one year."
+
+
+def test_strip_overlap_ignores_tiny_matches():
+    """Test chhota ittefaqi match strip nahi hota"""
+    assert strip_overlap("ends with e", "every word") == "every word"
+
+
+def test_adjacent_chunks_are_merged_in_order():
+    """Test same file ke consecutive chunks ek block bante hain"""
+    assembler = ContextAssembler()
+    docs = [
+        chunk(OVERLAP + "and batteries for one year.", index=3),
+        chunk("Intro text. " + OVERLAP, index=2),
+        chunk("Shipping takes five days.", filename="shipping.pdf", index=0)
+    ]
+    
+    blocks = assembler.assemble(docs)
+    
+    assert len(blocks) == 2
+    assert blocks[0].page_content.count(OVERLAP) == 1
+    assert blocks[0].page_content.startswith("Intro text.")
+    assert blocks[0].metadata["chunk_indexes"] == [2, 3]
+
+
+def test_adjacent_chunks_without_overlap_keep_boundary():
+    """Test overlap na ho to chunks newline se judte hain, words chipakte nahi"""
+    assembler = ContextAssembler()
+    docs = [chunk("Reset it from settings.", index=0), chunk("Then log in again.", index=1)]
+    
+    blocks = assembler.assemble(docs)
+    
+    assert blocks[0].page_content == "Reset it from settings.\nThen log in again."
+
+
+def test_near_duplicates_from_reuploads_are_dropped():
+    """Test re-upload wala same chunk dobara prompt mein nahi jata"""
+    assembler = ContextAssembler()
+    text = "Refunds are processed within five business days of receiving the item."
+    docs = [chunk(text, "faq.pdf", 1), chunk(text + " ", "faq (1).pdf", 1)]
+    
+    assert len(assembler.assemble(docs)) == 1
+
+
+def test_blocks_fit_token_budget():
+    """Test budget se zyada neeche wale blocks drop hote hain"""
+    assembler = ContextAssembler(token_budget=30)
+    docs = [chunk("short answer here", "a.pdf"), chunk("word " * 100, "b.pdf"), chunk("another one", "c.pdf")]
+    
+    blocks = assembler.assemble(docs)
+    
+    assert [b.metadata["filename"] for b in blocks] == ["a.pdf", "c.pdf"]
+
+
+def test_oversized_top_block_truncated():
+    """Test top block budget se bada ho to kat kar rakha jata hai, context khaali nahi"""
+    assembler = ContextAssembler(token_budget=50)
+    docs = [chunk("refund " * 200, "a.pdf"), chunk("short answer here", "b.pdf")]
+    
+    blocks = assembler.assemble(docs)
+    
+    assert blocks[0].metadata["filename"] == "a.pdf"
+    assert blocks[0].metadata["truncated"] is True
+    assert blocks[0].page_content.startswith("refund refund")
+    assert count_tokens(blocks[0].page_content) <= 50
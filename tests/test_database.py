@@ -0,0 +1,85 @@
+"""
+Startup schema upgrade tests - purani tables mein naye columns
+"""
+from sqlalchemy import inspect, text
+from sqlmodel import Session, create_engine
+
+from app.core.database import add_missing_columns
+from app.models.company import Company  # noqa: F401 - foreign key tables
+from app.models.user import User  # noqa: F401
+from app.models.conversation import Conversation
+from app.models.documents import Document
+
+
+def make_old_engine():
+    """Pichle version ki document aur conversation tables, ek purani row ke sath"""
+    engine = create_engine("sqlite://")
+    with engine.begin() as connection:
+        connection.execute(text(
+            "CREATE TABLE document (id INTEGER PRIMARY KEY, company_id INTEGER NOT NULL, "
+            "filename VARCHAR NOT NULL, file_type VARCHAR NOT NULL, file_path VARCHAR NOT NULL, "
+            "vector_ids VARCHAR, chunk_count INTEGER NOT NULL, is_active BOOLEAN NOT NULL, "
+            "uploaded_by INTEGER NOT NULL, created_at DATETIME NOT NULL, updated_at DATETIME NOT NULL)"
+        ))
+        connection.execute(text(
+            "CREATE TABLE conversation (id INTEGER PRIMARY KEY, company_id INTEGER NOT NULL, "
+            "user_id INTEGER, customer_name VARCHAR, customer_email VARCHAR, status VARCHAR NOT NULL, "
+            "satisfaction_rating INTEGER, created_at DATETIME NOT NULL, updated_at DATETIME NOT NULL, "
+            "closed_at DATETIME)"
+        ))
+        connection.execute(text(
+            "INSERT INTO document VALUES (1, 1, 'faq.txt', 'txt', 'uploads/faq.txt', '[]', 0, 1, 1, "
+            "'2024-01-01 00:00:00', '2024-01-01 00:00:00')"
+        ))
+        connection.execute(text(
+            "INSERT INTO conversation (id, company_id, status, created_at, updated_at) "
+            "VALUES (1, 1, 'active', '2024-01-01 00:00:00', '2024-01-01 00:00:00')"
+        ))
+    return engine
+
+
+def test_missing_columns_added_once():
+    """Test naye columns ek dafa judte hain, dobara chalane par kuch nahi hota"""
+    engine = make_old_engine()
+
+    added = add_missing_columns(engine)
+
+    assert set(added) == {
+        "conversation.summary", "conversation.summarized_until_id",
+        "document.content_hash", "document.file_size", "document.duplicate_uploads", "document.chunk_hashes"
+    }
+    assert add_missing_columns(engine) == []
+    indexes = {index["name"] for index in inspect(engine).get_indexes("document")}
+    assert "ix_document_content_hash" in indexes
+    assert "uq_document_active_filename" in indexes
+
+
+def test_duplicate_rows_do_not_block_startup():
+    """Test purane duplicate active documents hon to unique index chhoot jata hai, columns phir bhi judte hain"""
+    engine = make_old_engine()
+    with engine.begin() as connection:
+        connection.execute(text(
+            "INSERT INTO document VALUES (2, 1, 'faq.txt', 'txt', 'uploads/faq2.txt', '[]', 0, 1, 1, "
+            "'2024-01-02 00:00:00', '2024-01-02 00:00:00')"
+        ))
+    
+    assert "document.content_hash" in add_missing_columns(engine)
+    indexes = {index["name"] for index in inspect(engine).get_indexes("document")}
+    assert "uq_document_active_filename" not in indexes
+    assert "ix_document_content_hash" in indexes
+
+
+def test_old_rows_readable_with_defaults():
+    """Test purani rows model se load hoti hain aur NOT NULL columns default se bharte hain"""
+    engine = make_old_engine()
+    add_missing_columns(engine)
+
+    with Session(engine) as db:
+        document = db.get(Document, 1)
+        conversation = db.get(Conversation, 1)
+
+    assert document.file_size == 0
+    assert document.duplicate_uploads == 0
+    assert document.content_hash is None
+    assert conversation.summary is None
+    assert conversation.summarized_until_id is None
@@ -0,0 +1,43 @@
+"""
+Process pool document parsing tests
+"""
+import pytest
+
+pytest.importorskip("pypdf")
+
+from app.core.document_parser import DocumentParser
+from benchmarks.bench_parsing import synthetic_pdf
+
+
+def test_parallel_pdf_pages_in_order(tmp_path):
+    """Test pool mein parse hui PDF ke pages wahi text aur order dete hain jo ek process"""
+    path = str(tmp_path / "manual.pdf")
+    synthetic_pdf(path, pages=40, lines_per_page=3)
+
+    serial = DocumentParser(workers=1).load(path, "pdf")
+    parser = DocumentParser(workers=2, pages_per_task=4)
+    try:
+        parallel = parser.load(path, "pdf")
+    finally:
+        parser.shutdown()
+
+    assert [doc.metadata["page"] for doc in parallel] == list(range(40))
+    assert [doc.page_content for doc in parallel] == [doc.page_content for doc in serial]
+    assert parallel[7].page_content.startswith("Page 7 line 0")
+
+
+def test_load_many_keeps_file_order(tmp_path):
+    """Test batch ke results input files ke order mein"""
+    files = []
+    for i in range(3):
+        path = tmp_path / f"faq{i}.txt"
+        path.write_text(f"answer {i}")
+        files.append((str(path), "txt"))
+
+    parser = DocumentParser(workers=2)
+    try:
+        results = parser.load_many(files)
+    finally:
+        parser.shutdown()
+
+    assert [docs[0].page_content for docs in results] == ["answer 0", "answer 1", "answer 2"]
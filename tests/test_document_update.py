@@ -0,0 +1,128 @@
+"""
+Incremental re-ingestion tests - sirf badle hue chunks embed hote hain
+"""
+import json
+import pytest
+from unittest.mock import Mock, patch
+from sqlalchemy.exc import IntegrityError
+from sqlmodel import Session, SQLModel, create_engine
+
+from app.models.company import Company  # noqa: F401 - foreign key tables
+from app.models.user import User  # noqa: F401
+from app.models.documents import Document
+from app.services.document_service import chunk_hash, document_service
+
+
+@pytest.fixture
+def db():
+    engine = create_engine("sqlite://")
+    SQLModel.metadata.create_all(engine)
+    with Session(engine) as session:
+        yield session
+
+
+@pytest.fixture
+def vector_store():
+    store = Mock()
+    store.add_documents.side_effect = lambda company_id, texts, metadatas, progress=None: [f"new-{text}" for text in texts]
+    with patch("app.services.document_service.vector_store", store), \
+            patch("app.services.document_service.lexical_index"), \
+            patch("app.services.document_service.rag_service"):
+        yield store
+
+
+def make_document(db, texts):
+    document = Document(
+        company_id=1, filename="faq.txt", file_type="txt", file_path="old", uploaded_by=1,
+        vector_ids=json.dumps([f"old-{text}" for text in texts]),
+        chunk_hashes=json.dumps([chunk_hash(text) for text in texts]),
+        chunk_count=len(texts)
+    )
+    db.add(document)
+    db.commit()
+    db.refresh(document)
+    return document
+
+
+def test_only_changed_chunks_embedded(db, vector_store):
+    """Test unchanged chunks ke ids wahi, naya chunk embed, hataya gaya chunk delete"""
+    document = make_document(db, ["intro", "refunds 30 days", "shipping"])
+
+    updated = document_service.update_document(db, document, ["intro", "refunds 60 days", "shipping"], "new")
+
+    vector_store.add_documents.assert_called_once()
+    assert vector_store.add_documents.call_args.args[1] == ["refunds 60 days"]
+    assert json.loads(updated.vector_ids) == ["old-intro", "new-refunds 60 days", "old-shipping"]
+    assert updated.chunk_count == 3
+    assert updated.file_path == "new"
+    vector_store.delete_documents.assert_called_once_with(1, ["old-refunds 30 days"])
+    vector_store.update_metadata.assert_called_once_with(1, [], [])
+
+
+def test_shifted_chunks_keep_ids_with_new_index(db, vector_store):
+    """Test shuru mein naya chunk aaye to purane chunks dobara embed nahi, sirf chunk_index update"""
+    document = make_document(db, ["a", "b"])
+
+    updated = document_service.update_document(db, document, ["new", "a", "b"], "new")
+
+    assert json.loads(updated.vector_ids) == ["new-new", "old-a", "old-b"]
+    ids, metadatas = vector_store.update_metadata.call_args.args[1:]
+    assert ids == ["old-a", "old-b"]
+    assert [metadata["chunk_index"] for metadata in metadatas] == [1, 2]
+    vector_store.delete_documents.assert_called_once_with(1, [])
+
+
+def test_failed_commit_removes_new_vectors(db, vector_store):
+    """Test document row save na ho to naye vectors wapas nikalte hain aur purane rehte hain"""
+    document = make_document(db, ["a"])
+
+    with patch.object(db, "commit", side_effect=RuntimeError("db down")):
+        with pytest.raises(RuntimeError):
+            document_service.update_document(db, document, ["b"], "new")
+
+    vector_store.delete_documents.assert_called_once_with(1, ["new-b"])
+    assert json.loads(db.get(Document, document.id).vector_ids) == ["old-a"]
+
+
+def test_failed_commit_on_new_document_removes_vectors(db, vector_store):
+    """Test naye document ki row save na ho to vectors wapas nikalte hain aur lexical index mein kuch nahi jata"""
+    chunks = [Mock(page_content="refunds 30 days")]
+
+    with patch.object(document_service, "load_document", return_value=chunks), \
+            patch("app.services.document_service.lexical_index") as lexical_index, \
+            patch.object(db, "commit", side_effect=RuntimeError("db down")):
+        with pytest.raises(RuntimeError):
+            document_service.process_and_store(db, 1, 1, "new", "faq.txt", "txt")
+
+    vector_store.delete_documents.assert_called_once_with(1, ["new-refunds 30 days"])
+    lexical_index.add.assert_not_called()
+
+
+def test_one_active_document_per_filename(db):
+    """Test database ek company ke filename ke do active documents nahi banne deta"""
+    first = make_document(db, ["a"])
+    
+    with pytest.raises(IntegrityError):
+        make_document(db, ["b"])
+    db.rollback()
+    
+    first.is_active = False
+    db.add(first)
+    db.commit()
+    assert make_document(db, ["b"]).is_active
+
+
+def test_concurrent_create_becomes_update(db, vector_store):
+    """Test doosre worker ne same filename bana diya ho to naya document nahi, usi ka update"""
+    existing = make_document(db, ["refunds 30 days"])
+    chunks = [Mock(page_content="refunds 60 days")]
+    
+    with patch.object(document_service, "load_document", return_value=chunks), \
+            patch.object(document_service, "find_by_filename", side_effect=[None, existing]):
+        document = document_service.process_and_store(db, 1, 1, "new", "faq.txt", "txt")
+    
+    assert document.id == existing.id
+    assert json.loads(document.vector_ids) == ["new-refunds 60 days"]
+    # Insert ke liye likhe gaye vectors wapas nikle, phir update ne purana chunk hataya
+    assert vector_store.delete_documents.call_args_list[0].args == (1, ["new-refunds 60 days"])
+    assert document_service._document_locks == {}
@@ -0,0 +1,116 @@
+"""
+Content-hash embedding cache tests
+"""
+import asyncio
+import threading
+from app.core.embedding_cache import CachedEmbeddings, EmbeddingStore, QueryCachedEmbeddings, content_hash
+from app.core.llm import HashingEmbeddings
+
+
+class CountingEmbeddings(HashingEmbeddings):
+    """Provider tak pahunchne wale texts count karta hai"""
+    
+    def __init__(self):
+        super().__init__(dimensions=16)
+        self.embedded = []
+    
+    def embed_documents(self, texts):
+        self.embedded.extend(texts)
+        return super().embed_documents(texts)
+    
+    def embed_query(self, text):
+        self.embedded.append(text)
+        return super().embed_query(text)
+
+
+def test_repeated_chunks_not_re_embedded(tmp_path):
+    """Test re-upload aur same batch ke duplicates provider ko dobara nahi jaate"""
+    provider = CountingEmbeddings()
+    cached = CachedEmbeddings(provider, EmbeddingStore(str(tmp_path)), model="test")
+    
+    first = cached.embed_documents(["refund policy", "shipping policy", "refund policy"])
+    second = cached.embed_documents(["shipping policy", "refund policy"])
+    
+    assert provider.embedded == ["refund policy", "shipping policy"]
+    assert second == [first[1], first[0]]
+    stats = cached.stats()
+    assert stats["hits"] == 3
+    assert stats["misses"] == 2
+    assert stats["entries"] == 2
+
+
+def test_cache_survives_restart_and_is_per_model(tmp_path):
+    """Test cache disk par persist hai aur model badalne par reuse nahi hota"""
+    CachedEmbeddings(CountingEmbeddings(), EmbeddingStore(str(tmp_path)), model="a").embed_documents(["manual"])
+    
+    provider = CountingEmbeddings()
+    same_model = CachedEmbeddings(provider, EmbeddingStore(str(tmp_path)), model="a")
+    asyncio.run(same_model.aembed_documents(["manual"]))
+    assert provider.embedded == []
+    
+    other_model = CachedEmbeddings(provider, EmbeddingStore(str(tmp_path)), model="b")
+    other_model.embed_documents(["manual"])
+    assert provider.embedded == ["manual"]
+
+
+def test_query_cache_normalizes_and_shares_disk_tier(tmp_path):
+    """Test re-phrased query memory se, doosre worker ko disk se milti hai"""
+    provider = CountingEmbeddings()
+    store = EmbeddingStore(str(tmp_path))
+    cached = QueryCachedEmbeddings(provider, model="test", max_size=10, store=store)
+    
+    first = cached.embed_query("How do I reset my password?")
+    again = cached.embed_query("  how do i reset my   password ")
+    
+    assert again == first
+    assert provider.embedded == ["How do I reset my password?"]
+    
+    other_worker = QueryCachedEmbeddings(CountingEmbeddings(), model="test", max_size=10, store=store)
+    assert asyncio.run(other_worker.aembed_query("how do I reset my password")) == first
+    assert other_worker.embeddings.embedded == []
+    
+    stats = cached.stats()
+    assert stats["query_memory_hits"] == 1
+    assert stats["query_misses"] == 1
+    assert stats["query_hit_ratio"] == 0.5
+    assert other_worker.stats()["query_disk_hits"] == 1
+
+
+def test_async_query_keeps_sqlite_off_the_event_loop(tmp_path):
+    """Test aembed_query ka disk lookup aur write executor thread mein hota hai"""
+    store = EmbeddingStore(str(tmp_path))
+    threads = []
+    get_many, put_many = store.get_many, store.put_many
+    store.get_many = lambda *args: threads.append(threading.get_ident()) or get_many(*args)
+    store.put_many = lambda *args: threads.append(threading.get_ident()) or put_many(*args)
+    cached = QueryCachedEmbeddings(CountingEmbeddings(), model="test", max_size=10, store=store)
+    
+    async def run():
+        await cached.aembed_query("Refund policy?")
+        return threading.get_ident()
+    
+    loop_thread = asyncio.run(run())
+    
+    assert len(threads) == 2
+    assert loop_thread not in threads
+
+
+def test_query_disk_tier_is_bounded(tmp_path):
+    """Test disk par query rows cap aur TTL tak kat-ti hain, document rows ko haath nahi lagta"""
+    store = EmbeddingStore(str(tmp_path))
+    CachedEmbeddings(CountingEmbeddings(), store, model="test").embed_documents(["manual"])
+    cached = QueryCachedEmbeddings(CountingEmbeddings(), model="test", max_size=10, store=store, disk_max_rows=2)
+    
+    for question in ["refund policy", "shipping time", "reset password"]:
+        cached.embed_query(question)
+    # Purani row ko disk se dobara parha - taaza access, cap mein bachti hai
+    QueryCachedEmbeddings(CountingEmbeddings(), model="test", max_size=10, store=store).embed_query("refund policy")
+    
+    assert cached.prune() == 1
+    assert store.count() == 3
+    assert store.get_many("query:test", [content_hash("shipping time")]) == {}
+    assert store.get_many("query:test", [content_hash("refund policy")])
+    
+    expired = QueryCachedEmbeddings(CountingEmbeddings(), model="test", max_size=10, store=store, disk_ttl_seconds=1e-9)
+    assert expired.disk_pruned == 2
+    assert store.count() == 1
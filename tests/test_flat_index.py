@@ -0,0 +1,200 @@
+"""
+NumPy flat vector index tests
+"""
+import numpy as np
+from unittest.mock import patch
+from app.core import flat_index
+from app.core.flat_index import FlatIndex
+from app.core.llm import HashingEmbeddings
+from app.core.vectorestore import VectorStoreManager
+
+
+def unit(*values):
+    return list(np.asarray(values, dtype=np.float32) / np.linalg.norm(values))
+
+
+def test_search_returns_nearest_first(tmp_path):
+    """Test top-k cosine order aur distances"""
+    index = FlatIndex(str(tmp_path))
+    index.add(
+        ["a", "b", "c"],
+        [unit(1, 0, 0), unit(0, 1, 0), unit(1, 1, 0)],
+        ["alpha", "beta", "gamma"],
+        [{"n": 1}, {}, {"n": 3}]
+    )
+
+    results = index.search(unit(1, 0.1, 0), k=2)
+
+    assert [doc_id for doc_id, _, _ in results] == ["a", "c"]
+    assert results[0][1].page_content == "alpha"
+    assert results[0][1].metadata == {"n": 1}
+    assert results[0][2] < results[1][2]
+
+
+def test_delete_and_reload_from_disk(tmp_path):
+    """Test tombstoned rows search se bahar aur restart ke baad bhi delete rehti hain"""
+    index = FlatIndex(str(tmp_path))
+    index.add(["a", "b"], [unit(1, 0), unit(0, 1)], ["alpha", "beta"], [{}, {}])
+    assert index.delete(["a", "missing"]) == 1
+    index.close()
+
+    reloaded = FlatIndex(str(tmp_path))
+
+    assert len(reloaded) == 1
+    assert [doc_id for doc_id, _, _ in reloaded.search(unit(1, 0), k=2)] == ["b"]
+    assert reloaded.get(["a", "b"]).keys() == {"b"}
+
+
+def test_capacity_grows_past_first_allocation(tmp_path):
+    """Test matrix double hoti hai aur purane vectors bache rehte hain"""
+    index = FlatIndex(str(tmp_path))
+    rng = np.random.default_rng(0)
+    vectors = rng.standard_normal((1500, 8)).tolist()
+    for start in range(0, 1500, 500):
+        ids = [str(i) for i in range(start, start + 500)]
+        index.add(ids, vectors[start:start + 500], ids, [{}] * 500)
+
+    assert index.vectors.shape[0] >= 1500
+    assert index.search(vectors[10], k=1)[0][0] == "10"
+
+
+def test_manager_flat_backend(tmp_path, monkeypatch):
+    """Test manager flat backend par same add/search/delete API deta hai"""
+    monkeypatch.setattr("app.config.settings.VECTOR_BACKEND", "flat")
+    manager = VectorStoreManager()
+    manager.flat_directory = str(tmp_path)
+    manager.embeddings = HashingEmbeddings(dimensions=32)
+
+    ids = manager.add_documents(1, ["refund policy is 30 days", "shipping is free"], [{}, {"page": 2}])
+    results = manager.search(1, "refund policy", k=1)
+
+    assert results[0][0].page_content == "refund policy is 30 days"
+    assert manager.get_by_ids(1, [ids[1]])[ids[1]].metadata == {"page": 2}
+
+    assert manager.hottest_tenants(5) == [1]
+
+    manager.delete_documents(1, [ids[0]])
+    manager.compact()
+    manager.collections.evict(1)
+    stats = manager.stats(1)
+    assert not stats["company_loaded"]
+    assert stats["company_live_vectors"] == 1
+
+
+def test_ivf_partition_above_threshold(tmp_path):
+    """Test threshold ke baad IVF banta hai, naye inserts milte hain aur reload par bacha rehta hai"""
+    rng = np.random.default_rng(0)
+    centers = rng.standard_normal((8, 16))
+    vectors = (centers[rng.integers(0, 8, 600)] + 0.05 * rng.standard_normal((600, 16))).tolist()
+    index = FlatIndex(str(tmp_path), ann_threshold=400, nprobe=4)
+
+    for start in range(0, 600, 200):
+        ids = [str(i) for i in range(start, start + 200)]
+        index.add(ids, vectors[start:start + 200], ids, [{}] * 200)
+
+    assert index.ivf is not None
+    assert index.ivf.trained_rows == 600
+    assert index.search(vectors[550], k=1)[0][0] == "550"
+
+    query = vectors[7]
+    approximate = {doc_id for doc_id, _, _ in index.search(query, k=10)}
+    exact = {doc_id for doc_id, _, _ in index.search(query, k=10, exact=True)}
+    assert len(approximate & exact) >= 8
+
+    index.close()
+    assert FlatIndex(str(tmp_path)).ivf.trained_rows == 600
+
+
+def test_int8_quantization_with_rerank(tmp_path):
+    """Test int8 storage 4x chhoti, nearest result same aur reload par quantization bachi rehti hai"""
+    rng = np.random.default_rng(0)
+    vectors = rng.standard_normal((300, 64)).tolist()
+    ids = [str(i) for i in range(300)]
+    index = FlatIndex(str(tmp_path), quantization="int8", rerank_factor=4)
+    index.add(ids, vectors, ids, [{}] * 300)
+
+    assert index.vectors.dtype == np.int8
+    assert index.nbytes() == 300 * (64 + 4)
+
+    results = index.search(vectors[42], k=3)
+    assert results[0][0] == "42"
+    assert abs(results[0][2]) < 1e-5  # Rerank float32 copy se exact distance deta hai
+
+    index.close()
+    reloaded = FlatIndex(str(tmp_path))
+    assert reloaded.quantization == "int8"
+    assert reloaded.search(vectors[42], k=1)[0][0] == "42"
+
+
+def test_compact_rewrites_without_deleted_rows(tmp_path):
+    """Test compaction ke baad sirf live rows files mein aur search sahi"""
+    index = FlatIndex(str(tmp_path / "company_1"), quantization="int8")
+    index.add(["a", "b", "c"], [unit(1, 0), unit(0, 1), unit(1, 1)], ["alpha", "beta", "gamma"], [{}, {}, {}])
+    index.delete(["a", "c"])
+
+    assert index.dead_rows() == 2
+    assert index.compact() == 2
+
+    assert index.count == 1
+    assert index.search(unit(1, 0), k=3)[0][0] == "b"
+    assert not (tmp_path / "company_1.old").exists()
+    index.close()
+
+    reloaded = FlatIndex(str(tmp_path / "company_1"))
+    assert reloaded.count == 1 and reloaded.dead_rows() == 0
+    assert reloaded.get(["a", "b"]).keys() == {"b"}
+
+
+def test_update_metadata_survives_reload(tmp_path):
+    """Test metadata update vectors chhue baghair hota hai aur reload ke baad bhi rehta hai"""
+    index = FlatIndex(str(tmp_path))
+    index.add(["a", "b"], [unit(1, 0), unit(0, 1)], ["alpha", "beta"], [{"chunk_index": 0}, {"chunk_index": 1}])
+
+    assert index.update_metadata(["b", "missing"], [{"chunk_index": 5}, {}]) == 1
+    index.close()
+
+    reloaded = FlatIndex(str(tmp_path))
+    assert reloaded.get(["b"])["b"].metadata == {"chunk_index": 5}
+    assert reloaded.search(unit(0, 1), k=1)[0][0] == "b"
+
+
+def test_search_consistent_with_concurrent_compaction(tmp_path):
+    """Test search ke dauran compaction ho to bhi results sahi ids aur texts dete hain"""
+    index = FlatIndex(str(tmp_path))
+    index.add(["a", "b", "c"], [unit(1, 0), unit(0, 1), unit(1, 1)], ["alpha", "beta", "gamma"], [{}, {}, {}])
+    index.delete(["a"])
+    score_rows = flat_index.score_rows
+
+    def compact_midway(*args):
+        # Lock chhodne ke baad doosra thread rows renumber kar deta hai
+        if index.dead_rows():
+            index.compact()
+        return score_rows(*args)
+
+    with patch("app.core.flat_index.score_rows", side_effect=compact_midway):
+        results = index.search(unit(0, 1), k=2)
+
+    assert [(doc_id, doc.page_content) for doc_id, doc, _ in results] == [("b", "beta"), ("c", "gamma")]
+
+
+def test_evicted_tenant_released_after_last_user(tmp_path, monkeypatch):
+    """Test istemal ke dauran evict hua tenant checkin tak khula rehta hai aur wahi handle revive hota hai"""
+    monkeypatch.setattr("app.config.settings.VECTOR_BACKEND", "flat")
+    manager = VectorStoreManager()
+    manager.flat_directory = str(tmp_path)
+    manager.embeddings = HashingEmbeddings(dimensions=32)
+    manager.add_documents(1, ["refund policy is 30 days"], [{}])
+
+    with manager._checkout(1) as tenant:
+        assert manager.collections.evict(1)
+        assert tenant.index.vectors is not None
+        # Dobara maanga gaya to doosra FlatIndex nahi khulta
+        assert manager.search(1, "refund policy", k=1)[0][0].page_content == "refund policy is 30 days"
+        assert manager._tenant(1) is tenant
+
+        assert manager.collections.evict(1)
+        assert not tenant.closed.is_set()
+
+    assert tenant.closed.is_set() and tenant.index.vectors is None
+    assert manager._tenant(1) is not tenant
+    assert manager.search(1, "refund policy", k=1)[0][0].page_content == "refund policy is 30 days"
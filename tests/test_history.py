@@ -0,0 +1,49 @@
+"""
+Chat history manager tests
+"""
+import asyncio
+import pytest
+from unittest.mock import AsyncMock, Mock
+from app.models.conversation import Conversation
+from app.models.message import Message
+from app.services.history_service import HistoryManager, fit_to_token_budget
+
+
+def make_messages(*contents):
+    """User/assistant alternate messages banata hai"""
+    return [
+        Message(id=i + 1, conversation_id=1, role="user" if i % 2 == 0 else "assistant", content=content)
+        for i, content in enumerate(contents)
+    ]
+
+
+def test_fit_to_token_budget_keeps_newest_messages():
+    """Test budget mein sirf naye messages rehte hain"""
+    messages = make_messages("a" * 40, "b" * 40, "c" * 40)
+    
+    kept = fit_to_token_budget(messages, budget=20)
+    
+    assert [m.content[0] for m in kept] == ["b", "c"]
+
+
+def test_fit_to_token_budget_stops_at_first_overflow():
+    """Test beech ka bara message purane messages ko bhi bahar kar deta hai"""
+    messages = make_messages("short", "x" * 400, "short")
+    
+    kept = fit_to_token_budget(messages, budget=20)
+    
+    assert len(kept) == 1
+
+
+def test_get_history_prepends_summary():
+    """Test summary system message ki shakal mein pehle aati hai"""
+    manager = HistoryManager(max_turns=2, token_budget=100)
+    conversation = Conversation(id=1, company_id=1, summary="Customer asked about refunds", summarized_until_id=2)
+    db = Mock()
+    db.exec = AsyncMock(return_value=Mock(all=lambda: list(reversed(make_messages("Hi", "Hello")))))
+    
+    history = asyncio.run(manager.get_history(db, conversation))
+    
+    assert history[0].type == "system"
+    assert "refunds" in history[0].content
+    assert [m.type for m in history[1:]] == ["human", "ai"]
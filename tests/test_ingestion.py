@@ -0,0 +1,165 @@
+"""
+Document ingestion job queue tests
+"""
+import json
+import threading
+import time
+from datetime import datetime, timedelta
+import pytest
+from unittest.mock import Mock, patch
+from sqlmodel import Session, SQLModel, create_engine
+
+from app.models.company import Company  # noqa: F401 - foreign key tables
+from app.models.documents import Document  # noqa: F401
+from app.models.user import User  # noqa: F401
+from app.models.ingestion_job import IngestionJob
+from app.services.ingestion_service import IngestionQueue
+
+
+@pytest.fixture
+def engine(tmp_path):
+    """Workers ke threads ke liye file-based sqlite"""
+    engine = create_engine(f"sqlite:///{tmp_path / 'jobs.db'}", connect_args={"check_same_thread": False})
+    SQLModel.metadata.create_all(engine)
+    with patch("app.services.ingestion_service.engine", engine):
+        yield engine
+
+
+def make_queue(max_workers=4, max_per_company=1, max_attempts=2):
+    queue = IngestionQueue()
+    queue.max_workers = max_workers
+    queue.max_per_company = max_per_company
+    queue.max_attempts = max_attempts
+    queue.retry_backoff = 0
+    return queue
+
+
+def wait_for(engine, job_id, status, timeout=5):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        with Session(engine) as db:
+            job = db.get(IngestionJob, job_id)
+            if job.status == status:
+                return job
+        time.sleep(0.02)
+    raise AssertionError(f"job {job_id} never reached {status}")
+
+
+def submit(queue, engine, company_id, filename="faq.txt"):
+    with Session(engine) as db:
+        return queue.submit(db, company_id, 1, f"/tmp/{filename}", filename, "txt").id
+
+
+def test_job_succeeds_with_progress(engine):
+    """Test upload foran job id deta hai aur worker progress ke sath document banata hai"""
+    def process(db, company_id, user_id, file_path, filename, file_type, progress, **kwargs):
+        progress(5, 10)
+        progress(10, 10)
+        return Mock(id=42)
+
+    with patch("app.services.ingestion_service.document_service.process_and_store", side_effect=process):
+        job_id = submit(make_queue(), engine, company_id=1)
+        job = wait_for(engine, job_id, "succeeded")
+
+    assert job.document_id == 42
+    assert (job.chunks_done, job.chunks_total) == (10, 10)
+    assert job.attempts == 1
+
+
+def test_failed_job_retried_then_marked_failed(engine):
+    """Test fail hone par retry, attempts khatam hon to failed + error"""
+    with patch(
+        "app.services.ingestion_service.document_service.process_and_store",
+        side_effect=RuntimeError("embedding provider down")
+    ) as process:
+        job_id = submit(make_queue(max_attempts=2), engine, company_id=1)
+        job = wait_for(engine, job_id, "failed")
+
+    assert process.call_count == 2
+    assert job.attempts == 2
+    assert job.error == "embedding provider down"
+
+
+def test_per_company_cap_and_round_robin(engine):
+    """Test ek company ka sirf ek job chalta hai aur doosri company intezar nahi karti"""
+    release = threading.Event()
+    started = []
+
+    def process(db, company_id, user_id, file_path, filename, file_type, progress, **kwargs):
+        started.append((company_id, filename))
+        release.wait(5)
+        return Mock(id=1)
+
+    with patch("app.services.ingestion_service.document_service.process_and_store", side_effect=process):
+        queue = make_queue(max_workers=2, max_per_company=1)
+        first = submit(queue, engine, 1, "a1.txt")
+        second = submit(queue, engine, 1, "a2.txt")
+        submit(queue, engine, 2, "b1.txt")
+
+        wait_for(engine, first, "running")
+        time.sleep(0.1)
+        assert sorted(started) == [(1, "a1.txt"), (2, "b1.txt")]
+
+        release.set()
+        wait_for(engine, second, "succeeded")
+
+    assert started[-1] == (1, "a2.txt")
+
+
+def test_resume_skips_running_jobs_with_live_lease(engine):
+    """Test resume sirf lease khatam hue running jobs wapas leta hai - doosre worker ka job nahi"""
+    now = datetime.utcnow()
+    with Session(engine) as db:
+        jobs = [
+            IngestionJob(company_id=1, uploaded_by=1, filename=name, file_type="txt", file_path=f"/tmp/{name}",
+                         status="running", heartbeat_at=heartbeat)
+            for name, heartbeat in [("live.txt", now), ("stale.txt", now - timedelta(hours=1))]
+        ]
+        db.add_all(jobs)
+        db.commit()
+        live, stale = [job.id for job in jobs]
+
+    with patch("app.services.ingestion_service.document_service.process_and_store", return_value=Mock(id=7)) as process:
+        queue = make_queue()
+        assert queue.resume() == 1
+        wait_for(engine, stale, "succeeded")
+
+    assert process.call_count == 1
+    with Session(engine) as db:
+        assert db.get(IngestionJob, live).status == "running"
+
+
+def test_job_claimed_once(engine):
+    """Test ek job do dafa queue ho to bhi sirf ek worker chalata hai"""
+    with patch("app.services.ingestion_service.document_service.process_and_store", return_value=Mock(id=7)) as process:
+        queue = make_queue()
+        job_id = submit(queue, engine, company_id=1)
+        queue._process(job_id)
+        wait_for(engine, job_id, "succeeded")
+
+    assert process.call_count == 1
+
+
+def test_duplicate_lookup_failure_retries_job(engine):
+    """Test duplicate check fail ho to job running mein atakta nahi - retry/failed tak jata hai"""
+    with patch("app.services.ingestion_service.document_service.find_duplicate", side_effect=RuntimeError("db locked")):
+        with Session(engine) as db:
+            job_id = make_queue(max_attempts=1).submit(db, 1, 1, "/tmp/faq.txt", "faq.txt", "txt", content_hash="abc").id
+        job = wait_for(engine, job_id, "failed")
+
+    assert job.error == "db locked"
+
+
+def test_bulk_job_stores_report(engine):
+    """Test bulk upload ek job ban kar worker mein chalta hai aur report job mein save hoti hai"""
+    files = [{"filename": "faq.txt", "file_type": "txt", "file_path": "/tmp/faq.txt", "content_hash": "abc", "file_size": 3}]
+
+    with patch("app.services.ingestion_service.BulkIngestion") as bulk:
+        bulk.return_value.run.return_value = {"files": 1, "documents_created": 1}
+        with Session(engine) as db:
+            job_id = make_queue().submit_bulk(db, 1, 1, files).id
+        job = wait_for(engine, job_id, "succeeded")
+
+    bulk.return_value.run.assert_called_once_with(files)
+    assert job.kind == "bulk"
+    assert json.loads(job.report)["documents_created"] == 1
@@ -0,0 +1,115 @@
+"""
+BM25 lexical index aur hybrid fusion tests
+"""
+import os
+import pytest
+from concurrent.futures import ThreadPoolExecutor
+from app.core.lexical_index import BM25Index, LexicalIndexManager, tokenize
+from app.core.retriever import reciprocal_rank_fusion
+
+
+@pytest.fixture
+def index():
+    """Chhota BM25 index"""
+    bm25 = BM25Index()
+    bm25.add(
+        ["v1", "v2", "v3"],
+        [
+            "Error E_4021 means the payment gateway timed out",
+            "Model AB-1200 ships with a two year warranty",
+            "Refunds are processed within five business days"
+        ]
+    )
+    return bm25
+
+
+def test_tokenize_keeps_codes_and_parts():
+    """Test SKU poora token bhi hai aur parts bhi"""
+    terms = tokenize("Order AB-1200 failed")
+    
+    assert "ab-1200" in terms
+    assert "ab" in terms
+    assert "1200" in terms
+
+
+def test_search_matches_product_code(index):
+    """Test product code wala chunk top par aata hai"""
+    results = index.search("warranty for ab-1200?", k=2)
+    
+    assert results[0][0] == "v2"
+
+
+def test_search_matches_error_string(index):
+    """Test error code exact match hota hai"""
+    assert index.search("what is E_4021", k=1)[0][0] == "v1"
+
+
+def test_remove_drops_chunks(index):
+    """Test remove ke baad chunk search mein nahi aata"""
+    assert index.remove(["v2"]) == 1
+    
+    assert all(doc_id != "v2" for doc_id, _ in index.search("ab-1200 warranty"))
+    assert len(index) == 2
+
+
+def test_index_persists_across_restarts(tmp_path, index):
+    """Test disk se load hua index same results deta hai"""
+    manager = LexicalIndexManager(str(tmp_path))
+    manager.add(7, ["a", "b"], ["reset password link", "cancel subscription"])
+    manager.remove(7, ["b"])
+    
+    reloaded = LexicalIndexManager(str(tmp_path))
+    
+    assert reloaded.search(7, "password", k=1)[0][0] == "a"
+    assert reloaded.search(7, "subscription") == []
+
+
+def test_concurrent_adds_all_persisted(tmp_path):
+    """Test ek company ke concurrent uploads ki saves ek doosre ko overwrite nahi karti"""
+    manager = LexicalIndexManager(str(tmp_path))
+    
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        list(pool.map(lambda i: manager.add(7, [f"v{i}"], [f"manual{i} setup"]), range(16)))
+    
+    reloaded = LexicalIndexManager(str(tmp_path))
+    
+    assert len(reloaded.search(7, "setup", k=20)) == 16
+    assert [name for name in os.listdir(tmp_path) if name.endswith(".tmp")] == []
+
+
+def test_mutations_append_to_log_until_compaction(tmp_path):
+    """Test add/remove sirf delta log mein likhte hain, hadd par snapshot aur log khaali"""
+    manager = LexicalIndexManager(str(tmp_path / "lexical"), compact_every=3)
+    assert not os.path.exists(tmp_path / "lexical")
+    
+    manager.add(7, ["a"], ["reset password link"])
+    manager.add(7, ["b"], ["cancel subscription"])
+    
+    assert sorted(os.listdir(tmp_path / "lexical")) == ["company_7.log"]
+    
+    manager.remove(7, ["b"])
+    
+    assert sorted(os.listdir(tmp_path / "lexical")) == ["company_7.json.gz"]
+    manager.add(7, ["c"], ["subscription renewal"])
+    reloaded = LexicalIndexManager(str(tmp_path / "lexical"))
+    assert [doc_id for doc_id, _ in reloaded.search(7, "subscription")] == ["c"]
+
+
+def test_replay_skips_torn_log_line(tmp_path):
+    """Test crash mein adhoori likhi aakhri line load nahi rokti"""
+    manager = LexicalIndexManager(str(tmp_path))
+    manager.add(7, ["a"], ["reset password link"])
+    with open(tmp_path / "company_7.log", "a") as f:
+        f.write('{"op":"add","ids":["b"],"te')
+    
+    reloaded = LexicalIndexManager(str(tmp_path))
+    
+    assert reloaded.search(7, "password", k=1)[0][0] == "a"
+
+
+def test_reciprocal_rank_fusion_rewards_agreement():
+    """Test dono rankings mein aane wala id top par aata hai"""
+    fused = reciprocal_rank_fusion([["a", "b", "c"], ["d", "b", "e"]])
+    
+    assert fused[0][0] == "b"
+    assert {doc_id for doc_id, _ in fused} == {"a", "b", "c", "d", "e"}
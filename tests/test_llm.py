@@ -0,0 +1,77 @@
+"""
+Model provider tests
+"""
+import asyncio
+import pytest
+from unittest.mock import patch
+from langchain_openai import ChatOpenAI
+from app.core.llm import FakeChatModel, HashingEmbeddings, get_chat_model, get_embeddings
+
+
+def test_fake_chat_model_is_deterministic():
+    """Test same prompt par same answer aur stream tokens ka join invoke jaisa"""
+    model = FakeChatModel()
+
+    first = model.invoke("How do I reset my password?").content
+    second = model.invoke("How do I reset my password?").content
+    streamed = "".join(chunk.content for chunk in model.stream("How do I reset my password?"))
+
+    assert first == second
+    assert streamed == first
+    assert model.invoke("Where is my order?").content != first
+
+
+def test_fake_chat_model_async_stream():
+    """Test async streaming tokens ek ek karke aate hain"""
+    model = FakeChatModel(response="one two three", tokens_per_second=1000)
+
+    async def collect():
+        return [chunk.content async for chunk in model.astream("hi")]
+
+    assert asyncio.run(collect()) == ["one ", "two ", "three"]
+
+
+def test_hashing_embeddings_normalized_and_similar():
+    """Test vectors unit length hain aur milte julte texts qareeb hain"""
+    embeddings = HashingEmbeddings(dimensions=256)
+
+    base, close, far = embeddings.embed_documents([
+        "reset your account password",
+        "how to reset account password",
+        "shipping takes five business days"
+    ])
+
+    def dot(a, b):
+        return sum(x * y for x, y in zip(a, b))
+
+    assert len(base) == 256
+    assert dot(base, base) == pytest.approx(1.0)
+    assert dot(base, close) > dot(base, far)
+    assert embeddings.embed_query("reset your account password") == base
+
+
+def test_providers_selected_from_settings():
+    """Test settings se provider choose hota hai"""
+    with patch("app.core.llm.settings") as mock_settings:
+        mock_settings.LLM_PROVIDER = "fake"
+        mock_settings.FAKE_LLM_LATENCY = 0.0
+        mock_settings.FAKE_LLM_TOKENS_PER_SECOND = 0.0
+        mock_settings.EMBEDDING_PROVIDER = "hashing"
+        mock_settings.EMBEDDING_DIMENSIONS = 64
+        mock_settings.FAKE_EMBEDDING_LATENCY = 0.0
+
+        assert isinstance(get_chat_model(), FakeChatModel)
+        assert isinstance(get_embeddings(), HashingEmbeddings)
+
+        mock_settings.LLM_PROVIDER = "unknown"
+        with pytest.raises(ValueError):
+            get_chat_model()
+
+
+def test_openai_provider_uses_shared_clients():
+    """Test OpenAI chat model shared pooled client use karta hai"""
+    first = get_chat_model()
+    second = get_chat_model()
+
+    assert isinstance(first, ChatOpenAI)
+    assert first.async_client is second.async_client
@@ -0,0 +1,47 @@
+"""
+Chat pipeline parallelism tests
+"""
+import asyncio
+from datetime import datetime
+from unittest.mock import AsyncMock, MagicMock, patch
+from app.services.chat_service import chat_service
+
+
+def test_retrieval_runs_parallel_with_history_and_save():
+    """Test retrieval DB stages ke sath parallel chalti hai aur timings aati hain"""
+    db = MagicMock()
+    db.get = AsyncMock(return_value=MagicMock(id=1))
+    db.commit = AsyncMock()
+    db.refresh = AsyncMock(side_effect=lambda msg: setattr(msg, "created_at", datetime.utcnow()))
+    
+    async def slow_history(db, conversation):
+        await asyncio.sleep(0.2)
+        return []
+    
+    async def slow_retrieval():
+        await asyncio.sleep(0.2)
+        return []
+    
+    async def answer(**kwargs):
+        docs = await kwargs["prefetched"]
+        return {"answer": "ok", "sources": docs}
+    
+    with patch("app.services.chat_service.rag_service") as mock_rag, \
+         patch("app.services.chat_service.history_manager") as mock_history:
+        mock_rag.prefetch_documents.side_effect = lambda *args: asyncio.ensure_future(slow_retrieval())
+        mock_rag.get_answer.side_effect = answer
+        mock_history.get_history.side_effect = slow_history
+        
+        result = asyncio.run(chat_service.process_message(
+            db=db,
+            company_id=1,
+            conversation_id=1,
+            user_message="How do I reset my password?"
+        ))
+    
+    timings = result["timings"]
+    assert result["message"] == "ok"
+    assert timings["history"] >= 200
+    assert timings["retrieval"] >= 200
+    # Sequential hote to 400ms+ lagte
+    assert timings["total"] < 350
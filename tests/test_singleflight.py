@@ -0,0 +1,139 @@
+"""
+Single-flight coalescing tests
+"""
+import asyncio
+import pytest
+from unittest.mock import patch
+from app.core.singleflight import SingleFlight
+
+
+def test_identical_calls_share_one_computation():
+    """Test concurrent same-key calls ek hi dafa compute hoti hain"""
+    flight = SingleFlight()
+    calls = []
+    
+    async def compute():
+        calls.append(1)
+        await asyncio.sleep(0.01)
+        return {"answer": "42"}
+    
+    async def run():
+        return await asyncio.gather(*(flight.do("q", compute, company_id=1) for _ in range(5)))
+    
+    results = asyncio.run(run())
+    
+    assert len(calls) == 1
+    assert all(result is results[0] for result in results)
+    stats = flight.stats(1)
+    assert stats["executed"] == 1
+    assert stats["coalesced"] == 4
+    assert stats["in_flight"] == 0
+
+
+def test_different_keys_are_not_coalesced():
+    """Test alag keys alag compute hoti hain"""
+    flight = SingleFlight()
+    
+    async def run():
+        return await asyncio.gather(
+            flight.do("a", lambda: asyncio.sleep(0, result="A")),
+            flight.do("b", lambda: asyncio.sleep(0, result="B"))
+        )
+    
+    assert asyncio.run(run()) == ["A", "B"]
+
+
+def test_in_flight_counted_per_company():
+    """Test company ke stats mein sirf usi ki in-flight computations"""
+    flight = SingleFlight()
+    
+    async def run():
+        release = asyncio.Event()
+        
+        async def compute():
+            await release.wait()
+        
+        tasks = [
+            asyncio.ensure_future(flight.do(("a", 1), compute, company_id=1)),
+            asyncio.ensure_future(flight.do(("b", 2), compute, company_id=2)),
+            asyncio.ensure_future(flight.do(("c", 2), compute, company_id=2))
+        ]
+        await asyncio.sleep(0)
+        counts = (flight.stats(1)["in_flight"], flight.stats(2)["in_flight"], flight.stats()["in_flight"])
+        release.set()
+        await asyncio.gather(*tasks)
+        return counts
+    
+    assert asyncio.run(run()) == (1, 2, 3)
+    assert flight.stats(2)["in_flight"] == 0
+
+
+def test_errors_reach_every_waiter():
+    """Test failure sab waiters tak pohanchti hai"""
+    flight = SingleFlight()
+    
+    async def fail():
+        await asyncio.sleep(0.01)
+        raise RuntimeError("LLM down")
+    
+    async def run():
+        return await asyncio.gather(
+            *(flight.do("q", fail) for _ in range(3)),
+            return_exceptions=True
+        )
+    
+    results = asyncio.run(run())
+    
+    assert all(isinstance(result, RuntimeError) for result in results)
+
+
+def test_leader_cancellation_does_not_cancel_followers():
+    """Test leader ka client chala jaye to bhi followers ko result milta hai"""
+    flight = SingleFlight()
+    
+    async def compute():
+        await asyncio.sleep(0.02)
+        return "done"
+    
+    async def run():
+        leader = asyncio.ensure_future(flight.do("q", compute))
+        await asyncio.sleep(0)
+        follower = asyncio.ensure_future(flight.do("q", compute))
+        await asyncio.sleep(0)
+        leader.cancel()
+        return await follower
+    
+    assert asyncio.run(run()) == "done"
+
+
+def test_leader_cancellation_keeps_shared_prefetch():
+    """Test leader request cancel ho to uska prefetch shared computation ke liye chalta rehta hai"""
+    from app.services.reg_service import rag_service
+    
+    async def retrieval(delay):
+        await asyncio.sleep(delay)
+        return None, ["doc"]
+    
+    async def compute(company_id, question, chat_history, retrieval_mode, prefetched):
+        _, docs = await prefetched
+        return {"answer": "ok", "sources": docs}
+    
+    async def run():
+        leader_prefetch = asyncio.ensure_future(retrieval(0.02))
+        follower_prefetch = asyncio.ensure_future(retrieval(1))
+        leader = asyncio.ensure_future(rag_service.get_answer(1, "Refund policy?", [], "vector", leader_prefetch))
+        await asyncio.sleep(0)
+        follower = asyncio.ensure_future(rag_service.get_answer(1, "refund policy", [], "vector", follower_prefetch))
+        await asyncio.sleep(0)
+        leader.cancel()
+        result = await follower
+        return result, leader_prefetch, follower_prefetch
+    
+    with patch.object(rag_service, "_compute_answer", side_effect=compute), \
+            patch("app.services.reg_service.settings.COALESCE_ENABLED", True):
+        result, leader_prefetch, follower_prefetch = asyncio.run(run())
+    
+    assert result["sources"] == ["doc"]
+    assert not leader_prefetch.cancelled()
+    # Follower ka apna prefetch istemal nahi hua - cancel
+    assert follower_prefetch.cancelled()
@@ -0,0 +1,254 @@
+"""
+Vector store collection cache tests
+"""
+import chromadb
+import json
+import os
+import pytest
+import time
+from concurrent.futures import ThreadPoolExecutor
+from unittest.mock import Mock
+from chromadb.config import Settings as ChromaSettings
+from app.core.llm import HashingEmbeddings
+from app.core.vectorestore import VectorStoreManager
+
+
+@pytest.fixture
+def manager(tmp_path):
+    """Persistent chroma client aur local embeddings wala manager"""
+    manager = VectorStoreManager()
+    manager.directory = str(tmp_path)
+    manager.client = chromadb.PersistentClient(
+        path=str(tmp_path / "chroma"),
+        settings=ChromaSettings(anonymized_telemetry=False)
+    )
+    manager.embeddings = HashingEmbeddings(dimensions=32)
+    manager.dimensions = 32
+    return manager
+
+
+def test_handles_are_reused(manager):
+    """Test same company ka handle dobara nahi banta"""
+    first = manager.get_collection(1)
+    second = manager.get_collection(1)
+    
+    assert first is second
+    assert manager.stats()["hits"] == 1
+
+
+def test_memory_budget_evicts_and_data_survives(manager):
+    """Test budget se upar purana tenant evict hota hai lekin data disk par rehta hai"""
+    manager.add_documents(1, ["refund policy is 30 days", "shipping is free"], [{}, {}])
+    per_tenant = manager.stats(1)["company_estimated_bytes"]
+    manager.memory_budget = per_tenant
+    
+    manager.add_documents(2, ["password reset steps", "contact support"], [{}, {}])
+    
+    stats = manager.stats(1)
+    assert stats["memory_evictions"] == 1
+    assert not stats["company_loaded"]
+    
+    results = manager.search_with_ids(1, "refund policy", k=1)
+    assert results[0][1].page_content == "refund policy is 30 days"
+
+
+def test_idle_tenants_evicted(manager):
+    """Test idle tenant sweep mein evict hota hai"""
+    manager.get_collection(1)
+    manager.idle_seconds = 0
+    manager._last_sweep = 0
+    
+    manager.get_collection(2)
+    
+    assert 1 not in manager.collections
+    assert manager.stats()["idle_evictions"] == 1
+
+
+def test_warm_up_loads_hottest_tenants(manager):
+    """Test warm-up saved access counts se hottest tenants load karke ready set karta hai"""
+    manager.add_documents(1, ["refund policy"], [{}])
+    manager.add_documents(2, ["shipping policy"], [{}])
+    manager.get_collection(2)
+    manager.save_tenant_stats()
+    manager.collections.clear()
+    
+    manager.access_counts = manager._load_tenant_stats()
+    manager.ready.clear()
+    warmed = manager.warm_up(limit=1)
+    
+    assert warmed == 1
+    assert manager.ready.is_set()
+    assert 2 in manager.collections
+    assert 1 not in manager.collections
+
+
+class FlakyEmbeddings(HashingEmbeddings):
+    """Pehli calls fail karne wala provider"""
+    
+    def __init__(self, failures: int):
+        super().__init__(dimensions=32)
+        self.failures = failures
+        self.batches = []
+    
+    def embed_documents(self, texts):
+        if self.failures:
+            self.failures -= 1
+            raise RuntimeError("rate limited")
+        self.batches.append(len(texts))
+        return super().embed_documents(texts)
+
+
+def test_add_documents_in_batches_with_retry_and_progress(manager):
+    """Test chunks batches mein embed hote hain, fail batch retry hota hai aur progress aata hai"""
+    manager.embeddings = FlakyEmbeddings(failures=1)
+    manager.embedding_batch_size = 10
+    manager.embedding_concurrency = 2
+    manager.embedding_retry_backoff = 0
+    updates = []
+    
+    texts = [f"chunk number {i}" for i in range(25)]
+    ids = manager.add_documents(1, texts, [{"chunk_index": i} for i in range(25)],
+                                progress=lambda done, total: updates.append((done, total)))
+    
+    assert sorted(manager.embeddings.batches) == [5, 10, 10]
+    assert len(updates) == 3
+    assert updates[-1] == (25, 25)
+    assert manager.get_by_ids(1, [ids[24]])[ids[24]].page_content == "chunk number 24"
+
+
+def test_add_documents_failure_rolls_back_written_batches(manager):
+    """Test retries khatam hone par likhe gaye batches wapas nikal jaate hain"""
+    manager.embeddings = FlakyEmbeddings(failures=0)
+    manager.embedding_batch_size = 10
+    manager.embedding_concurrency = 1
+    manager.embedding_max_retries = 0
+    original = manager.embeddings.embed_documents
+    calls = []
+    
+    def fail_second(texts):
+        calls.append(texts)
+        if len(calls) == 2:
+            raise RuntimeError("provider down")
+        return original(texts)
+    
+    manager.embeddings.embed_documents = fail_second
+    
+    with pytest.raises(RuntimeError):
+        manager.add_documents(1, [f"chunk {i}" for i in range(20)], [{}] * 20)
+    
+    assert manager._tenant(1).collection.count() == 0
+
+
+def test_deleted_vectors_filtered_then_compacted(manager):
+    """Test delete foran retrieval se bahar, compaction index se nikalti hai"""
+    ids = manager.add_documents(1, ["refund policy is 30 days", "refund requests by email"], [{}, {}])
+    
+    manager.delete_documents(1, [ids[0]])
+    
+    results = manager.search_with_ids(1, "refund policy", k=2)
+    assert [doc_id for doc_id, _, _ in results] == [ids[1]]
+    assert manager.get_by_ids(1, ids).keys() == {ids[1]}
+    stats = manager.stats(1)
+    assert stats["company_live_vectors"] == 1
+    assert stats["company_dead_vectors"] == 1
+    
+    assert manager.compact() == 1
+    
+    stats = manager.stats(1)
+    assert stats["tombstoned_vectors"] == 0
+    assert stats["company_vectors"] == 1
+    assert manager._tenant(1).collection.count() == 1
+
+
+def test_tombstones_logged_per_tenant(manager, tmp_path):
+    """Test har company ka apna tombstone log, restart par replay, compaction ke baad file hatti hai"""
+    first = manager.add_documents(1, ["refund policy", "shipping policy"], [{}, {}])
+    second = manager.add_documents(2, ["password reset"], [{}])
+    
+    manager.delete_documents(1, [first[0]])
+    manager.delete_documents(2, second)
+    
+    assert sorted(os.listdir(tmp_path / "tombstones")) == ["company_1.log", "company_2.log"]
+    assert manager._load_tombstones() == {1: {first[0]}, 2: set(second)}
+    
+    manager.compact()
+    
+    assert os.listdir(tmp_path / "tombstones") == []
+    assert manager._load_tombstones() == {}
+
+
+def test_legacy_tombstones_file_migrated(manager, tmp_path):
+    """Test purani global tombstones.json per-tenant logs mein badalti hai"""
+    (tmp_path / "tombstones.json").write_text(json.dumps({"1": ["a"], "2": ["b", "c"]}))
+    
+    assert manager._load_tombstones() == {1: {"a"}, 2: {"b", "c"}}
+    assert not (tmp_path / "tombstones.json").exists()
+    assert manager._load_tombstones() == {1: {"a"}, 2: {"b", "c"}}
+
+
+def test_unloaded_tenant_stats_read_from_disk(manager):
+    """Test evict hue tenant ke live/dead counts disk se aate hain, tenant load nahi hota"""
+    ids = manager.add_documents(1, ["refund policy", "shipping policy", "password reset"], [{}, {}, {}])
+    manager.delete_documents(1, [ids[0]])
+    manager.collections.evict(1)
+    
+    stats = manager.stats(1)
+    
+    assert not stats["company_loaded"]
+    assert stats["company_vectors"] == 3
+    assert stats["company_live_vectors"] == 2
+    assert stats["company_dead_vectors"] == 1
+    assert 1 not in manager.collections
+    assert manager.stats(2)["company_vectors"] == 0
+
+
+def test_release_frees_chroma_segments(manager):
+    """Test eviction par chromadb ke segment instances aur file handles sach mein chhoot-te hain
+    
+    chromadb ke private segment manager par chalta hai - upgrade par yeh test
+    toote to ChromaTenant.release theek karo (requirements.txt mein version pinned).
+    """
+    manager.add_documents(1, ["refund policy is 30 days", "shipping is free"], [{}, {}])
+    tenant = manager._tenant(1)
+    segment_manager = manager.client._server._manager
+    collection_id = tenant.collection.id
+    segment_ids = [segment["id"] for segment in segment_manager._segment_cache[collection_id].values()]
+    assert all(segment_id in segment_manager._instances for segment_id in segment_ids)
+    assert collection_id in segment_manager._vector_instances_file_handle_cache.cache
+    
+    assert manager.collections.evict(1)
+    
+    assert tenant.closed.is_set()
+    assert collection_id not in segment_manager._segment_cache
+    assert not any(segment_id in segment_manager._instances for segment_id in segment_ids)
+    assert collection_id not in segment_manager._vector_instances_file_handle_cache.cache
+    # Flush ho chuka - dobara load par data milta hai
+    assert manager.search(1, "refund policy", k=1)[0][0].page_content == "refund policy is 30 days"
+
+
+def test_search_reuses_given_embedding(manager):
+    """Test answer cache lookup ki embedding di ho to query dobara embed nahi hoti"""
+    manager.add_documents(1, ["refund policy is 30 days", "shipping is free"], [{}, {}])
+    embedding = manager.embeddings.embed_query("refund policy")
+    manager.embeddings = Mock(wraps=manager.embeddings)
+    
+    results = manager.search(1, "refund policy", k=1, embedding=embedding)
+    
+    assert results[0][0].page_content == "refund policy is 30 days"
+    manager.embeddings.embed_query.assert_not_called()
+
+
+def test_concurrent_loads_build_one_handle(manager):
+    """Test ek company ke concurrent loads par factory ek hi dafa chalti hai"""
+    created = []
+    
+    def slow_factory():
+        created.append(1)
+        time.sleep(0.05)
+        return object()
+    
+    with ThreadPoolExecutor(max_workers=4) as pool:
+        handles = list(pool.map(lambda _: manager.collections.get_or_create(1, slow_factory), range(4)))
+    
+    assert len(created) == 1
+    assert all(handle is handles[0] for handle in handles)